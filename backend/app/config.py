@@ -7,11 +7,39 @@ from typing import List
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./carlota_mag.db"
+    DATABASE_READ_URL: str = ""  # Réplica de leitura opcional para os GETs
     UPLOAD_DIR: str = "uploads"
     MAX_PDF_SIZE_MB: int = 200
     MAX_IMAGE_SIZE_MB: int = 5
+    UPLOAD_CHUNK_SIZE_KB: int = 1024
     CORS_ORIGINS: str = "http://localhost:5173,http://127.0.0.1:5173,https://*.netlify.app"
     
+    # Perfil do banco: SQLite
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE_MB: int = 256
+    SQLITE_CACHE_SIZE_MB: int = 64
+    
+    # Perfil do banco: Postgres (pool de conexões por worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    
+    # Cache de respostas dos endpoints públicos
+    RESPONSE_CACHE_MAX_MB: int = 32
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    
+    # Compressão das respostas de texto (br/gzip): tamanho mínimo e níveis. As respostas em cache
+    # são comprimidas uma vez por versão dos dados, então podem usar níveis mais altos
+    COMPRESSION_MIN_BYTES: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_CACHED_GZIP_LEVEL: int = 9
+    COMPRESSION_CACHED_BROTLI_QUALITY: int = 9
+    
+    # Busca: quantos resultados (os mais recentes) entram na ordenação por relevância
+    SEARCH_MAX_CANDIDATES: int = 1000
+    
     # Cloudinary
     CLOUDINARY_CLOUD_NAME: str = ""
     CLOUDINARY_API_KEY: str = ""
@@ -22,6 +50,66 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_S3_BUCKET: str = ""
     AWS_S3_REGION: str = "eu-north-1"
+    AWS_S3_ENDPOINT_URL: str = ""  # Endpoint alternativo (ex.: MinIO ou moto server)
+    
+    # Upload multipart para o S3
+    S3_MULTIPART_THRESHOLD_MB: int = 16
+    S3_MULTIPART_PART_SIZE_MB: int = 8
+    S3_MULTIPART_CONCURRENCY: int = 4
+    S3_MULTIPART_MAX_RETRIES: int = 3
+    
+    # Upload retomável: sessões abandonadas expiram; a reserva cobre o envio de uma parte
+    RESUMABLE_UPLOAD_EXPIRES_HOURS: int = 24
+    RESUMABLE_UPLOAD_LOCK_SECONDS: int = 300
+    
+    # Upload direto do navegador ao S3 (URLs pré-assinadas)
+    S3_PRESIGN_EXPIRES_SECONDS: int = 3600
+    
+    # Limite de uploads simultâneos por backend (executores dedicados)
+    S3_MAX_CONCURRENCY: int = 4
+    CLOUDINARY_MAX_CONCURRENCY: int = 2
+    STORAGE_MAX_CONCURRENCY: int = 4
+    
+    # Arquivos sem referências são removidos só depois deste período desde o último upload
+    STORAGE_ORPHAN_GRACE_HOURS: int = 24
+    
+    # Cache em disco (LRU) dos PDFs e capas lidos do S3/Cloudinary; 0 desativa
+    STORAGE_CACHE_DIR: str = ""  # Padrão: <UPLOAD_DIR>/cache
+    STORAGE_CACHE_MAX_MB: int = 1024
+    
+    # Pool de processos para trabalho de CPU (extração de PDFs, derivados de imagens)
+    PROCESS_POOL_WORKERS: int = 2
+    
+    # Extração de texto dos PDFs (em lotes de páginas)
+    PDF_TEXT_BATCH_PAGES: int = 10
+    PDF_TEXT_LEASE_SECONDS: int = 120
+    
+    # Miniaturas das páginas e capa gerada a partir da primeira página do PDF
+    PDF_THUMB_WIDTH: int = 240
+    PDF_THUMB_QUALITY: int = 70
+    PDF_THUMB_BATCH_PAGES: int = 10
+    PDF_COVER_WIDTH: int = 1600
+    
+    # Fila de jobs: workers no processo da API ou dedicados (python -m app.worker)
+    JOB_WORKERS_IN_PROCESS: bool = True
+    JOB_CONCURRENCY: int = 2
+    JOB_POLL_SECONDS: int = 5
+    JOB_LEASE_SECONDS: int = 300
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: int = 30
+    JOB_RETRY_MAX_SECONDS: int = 3600
+    JOB_RETENTION_DAYS: int = 7
+    
+    # Importação em lote: registros por requisição e por transação do importador (python -m app.importer)
+    BULK_MAX_ROWS: int = 5000
+    BULK_BATCH_SIZE: int = 500
+    
+    # Exportação NDJSON/CSV: linhas por leitura do cursor e nível da compressão gzip
+    EXPORT_BATCH_ROWS: int = 1000
+    EXPORT_GZIP_LEVEL: int = 6
+    
+    # Intervalo da limpeza periódica (arquivos sem referências, uploads abandonados, jobs antigos)
+    MAINTENANCE_INTERVAL_MINUTES: int = 60
     
     @property
     def cors_origins_list(self) -> List[str]:
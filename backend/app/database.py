@@ -1,25 +1,127 @@
 """
 Configuração do banco de dados SQLAlchemy
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
+from app.services.metrics import instrument_engine
+
+
+def normalize_database_url(url: str) -> str:
+    """Aceita URLs no formato postgres:// (Heroku/Railway), que o SQLAlchemy não reconhece"""
+    if url.startswith("postgres://"):
+        return "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Ajustes de cada conexão SQLite: WAL permite leituras durante escritas de outro worker"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_MB * 1024}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def create_db_engine(url: str) -> Engine:
+    """Cria o engine com o perfil adequado ao banco (SQLite ou Postgres)"""
+    url = normalize_database_url(url)
+    
+    if url.startswith("sqlite"):
+        engine = create_engine(
+            url,
+            connect_args={
+                "check_same_thread": False,  # Necessário para SQLite
+                "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            }
+        )
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+    else:
+        engine = create_engine(
+            url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=True
+        )
+    instrument_engine(engine)
+    return engine
+
+
+def async_database_url(url: str) -> str:
+    """Converte a URL para o driver assíncrono (aiosqlite ou asyncpg)"""
+    url = normalize_database_url(url)
+    scheme, _, rest = url.partition("://")
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    if scheme.startswith("postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Necessário para SQLite
-)
 
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """Cria o engine assíncrono com o mesmo perfil do engine síncrono"""
+    url = async_database_url(url)
+    
+    if url.startswith("sqlite"):
+        # O aiosqlite usa NullPool por padrão: reaproveitar conexões evita reabrir o
+        # arquivo e reaplicar os PRAGMAs a cada requisição
+        pool_args = {} if ":memory:" in url else {
+            "poolclass": AsyncAdaptedQueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+        }
+        engine = create_async_engine(
+            url,
+            connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+            **pool_args
+        )
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    else:
+        engine = create_async_engine(
+            url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=True
+        )
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+# Sessões síncronas ficam para scripts de manutenção (ex.: benchmarks.query_plans)
+engine = create_db_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Acesso assíncrono usado pelas rotas (aiosqlite/asyncpg), sem passar pelo threadpool.
+# Réplica de leitura opcional para os GETs; sem ela, as leituras usam o banco principal
+async_engine = create_async_db_engine(settings.DATABASE_URL)
+async_read_engine = (
+    create_async_db_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else async_engine
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency para obter sessão do banco de dados"""
-    db = SessionLocal()
-    try:
+async def get_async_db():
+    """Dependency para obter sessão assíncrona do banco de dados"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """Dependency para obter sessão assíncrona somente leitura (réplica, se configurada)"""
+    async with AsyncReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
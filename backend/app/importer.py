@@ -0,0 +1,161 @@
+"""
+Importador do acervo em lote: python -m app.importer {magazines,articles} arquivo [--batch N] [--dry-run]
+
+Lê NDJSON (um registro por linha) ou um array JSON sem carregar o arquivo inteiro na memória
+e grava em transações de --batch registros, com os mesmos inserts em lote da API.
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+from itertools import islice
+from typing import IO, Iterator, Optional, Tuple
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.schemas import ArticleCreate, MagazineCreate
+from app.services.bulk import decode_lines, insert_articles, insert_magazines, parse_rows, save_rows
+
+READ_SIZE = 1 << 16
+
+# Fim de um token JSON: depois do ponto do erro, sem nenhum deles, o texto é um literal cortado
+TOKEN_END = re.compile(r'[\s,:"\[\]{}]')
+
+
+def _cut_off(buffer: str, error: json.JSONDecodeError) -> bool:
+    """Se o erro vem de um elemento cortado no fim da parte lida (e não de JSON inválido)"""
+    rest = buffer[error.pos:].rstrip()
+    return not rest or error.msg.startswith("Unterminated string") or not TOKEN_END.search(rest)
+
+
+def _element_end(text: str) -> Optional[int]:
+    """Posição da vírgula ou do ']' que encerra o primeiro elemento do texto (None se não chegou)"""
+    depth, in_string, escaped = 0, False, False
+    for pos, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "[{":
+            depth += 1
+        elif char in "]}":
+            if depth == 0:
+                return pos
+            depth -= 1
+        elif char == "," and depth == 0:
+            return pos
+    return None
+
+
+def iter_json_array(file: IO[str]) -> Iterator[Tuple[int, object]]:
+    """Percorre um array JSON elemento a elemento, lendo o arquivo em partes"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+
+    def fill() -> bool:
+        nonlocal buffer
+        chunk = file.read(READ_SIZE)
+        buffer += chunk
+        return bool(chunk)
+
+    while not buffer.strip() and fill():
+        pass
+    buffer = buffer.lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("O arquivo JSON deve conter um array de registros")
+    buffer = buffer[1:]
+    row = 0
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        if buffer.startswith("]"):
+            return
+        if not buffer:
+            if not fill():
+                raise ValueError("Array JSON incompleto")
+            continue
+        try:
+            value, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as e:
+            # Elemento cortado no fim da parte lida: lê mais e tenta de novo
+            if _cut_off(buffer, e) and fill():
+                continue
+            # JSON inválido: vira o erro da linha e a leitura segue no próximo elemento
+            end = _element_end(buffer)
+            while end is None and fill():
+                end = _element_end(buffer)
+            row += 1
+            yield row, e
+            if end is None:
+                return
+            buffer = buffer[end:]
+            continue
+        if end == len(buffer) and fill():
+            # Um número no fim da parte lida pode continuar na próxima
+            continue
+        row += 1
+        yield row, value
+        buffer = buffer[end:]
+
+
+def read_file(path: str) -> Iterator[Tuple[int, object]]:
+    """Registros do arquivo (linha/posição, dados), detectando NDJSON ou array JSON"""
+    with open(path, "rb") as file:
+        start = file.read(READ_SIZE).lstrip()
+    if start.startswith(b"["):
+        with open(path, encoding="utf-8") as file:
+            yield from iter_json_array(file)
+    else:
+        with open(path, "rb") as file:
+            yield from decode_lines(file)
+
+
+async def import_file(kind: str, path: str, batch_size: int, dry_run: bool) -> Tuple[int, int]:
+    """Importa o arquivo em transações de batch_size registros; retorna (gravados, com erro)"""
+    schema = MagazineCreate if kind == "magazines" else ArticleCreate
+    created = failed = 0
+    rows = read_file(path)
+    while batch := list(islice(rows, batch_size)):
+        valid, errors = parse_rows(batch, schema)
+        for error in errors:
+            print(f"linha {error['row']}: {error['error']}", file=sys.stderr)
+        failed += len(errors)
+        if dry_run:
+            created += len(valid)
+            continue
+        if not valid:
+            continue
+
+        # Como na API: se o banco recusar o lote, as linhas são regravadas uma a uma
+        async with AsyncSessionLocal() as db:
+            result = await save_rows(db, insert_magazines if kind == "magazines" else insert_articles,
+                                     valid, [], atomic=False)
+        for error in result["results"]:
+            if "error" in error:
+                print(f"linha {error['row']}: {error['error']}", file=sys.stderr)
+        created += result["created"]
+        failed += result["failed"]
+        print(f"{created} registros importados", file=sys.stderr)
+    return created, failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importa revistas ou artigos em lote (NDJSON ou array JSON)")
+    parser.add_argument("kind", choices=("magazines", "articles"))
+    parser.add_argument("path")
+    parser.add_argument("--batch", type=int, default=settings.BULK_BATCH_SIZE, help="Registros por transação")
+    parser.add_argument("--dry-run", action="store_true", help="Só valida o arquivo, sem gravar")
+    args = parser.parse_args()
+
+    created, failed = asyncio.run(import_file(args.kind, args.path, args.batch, args.dry_run))
+    print(f"{created} {'válidos' if args.dry_run else 'importados'}, {failed} com erro")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,18 @@ Carlota Mag - API Backend
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
 from app.config import settings
-from app.database import engine, Base
-from app.routers import magazines_router, upload_router, articles_router, services_router, contacts_router
+from app.routers import magazines_router, upload_router, articles_router, services_router, contacts_router, files_router, search_router, images_router, jobs_router
+from app.services.cache import response_cache
+from app.services.compression import CompressionMiddleware
+from app.services.executors import shutdown_process_pool, shutdown_storage_executors
+from app.services.jobs import start_workers, stop_workers
+from app.services.metrics import MetricsMiddleware, metrics_response
+from app.services.storage import current_backend, get_disk_cache
 
-# Criar tabelas no banco de dados
-Base.metadata.create_all(bind=engine)
+# As tabelas são criadas/atualizadas pelas migrações (alembic upgrade head), executadas no deploy
 
 # Criar pasta de uploads
 Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
@@ -24,6 +27,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Compressão br/gzip das respostas de texto (JSON, NDJSON/CSV, arquivos de texto em /uploads)
+app.add_middleware(CompressionMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -31,10 +37,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Accept-Ranges", "Content-Range", "Content-Length", "ETag", "Location", "Upload-Offset", "Upload-Length"],
 )
 
-# Montar pasta de uploads como arquivos estáticos
-app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+# Métricas por rota (a mais externa: mede também a compressão e o envio do corpo)
+app.add_middleware(MetricsMiddleware)
 
 # Rotas
 app.include_router(magazines_router)
@@ -42,6 +49,24 @@ app.include_router(upload_router)
 app.include_router(articles_router)
 app.include_router(services_router)
 app.include_router(contacts_router)
+app.include_router(search_router)
+app.include_router(images_router)
+app.include_router(jobs_router)
+app.include_router(files_router)  # /uploads com suporte a Range e cache
+
+
+@app.on_event("startup")
+async def startup():
+    # Workers da fila de jobs (extração dos PDFs, limpezas periódicas) no processo da API
+    if settings.JOB_WORKERS_IN_PROCESS:
+        start_workers(settings.JOB_CONCURRENCY)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await stop_workers()
+    shutdown_process_pool()
+    shutdown_storage_executors()
 
 
 @app.get("/")
@@ -54,9 +79,17 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
+
 @app.get("/debug/storage")
-def debug_storage():
+async def debug_storage():
+    cache = get_disk_cache()
     return {
+        "backend": current_backend(),
+        "disk_cache": await cache.stats() if cache else None,
         "use_s3": settings.use_s3,
         "use_cloudinary": settings.use_cloudinary,
         "s3_bucket": settings.AWS_S3_BUCKET or "not set",
@@ -64,3 +97,8 @@ def debug_storage():
         "has_aws_key": bool(settings.AWS_ACCESS_KEY_ID),
         "has_aws_secret": bool(settings.AWS_SECRET_ACCESS_KEY),
     }
+
+
+@app.get("/debug/cache")
+def debug_cache():
+    return response_cache.stats()
@@ -2,3 +2,10 @@ from app.models.magazine import Magazine
 from app.models.article import Article
 from app.models.service import Service
 from app.models.contact import Contact
+from app.models.cache_generation import CacheGeneration
+from app.models.search_document import SearchDocument
+from app.models.magazine_page import MagazinePage
+from app.models.image_asset import ImageAsset
+from app.models.stored_file import StoredFile
+from app.models.upload_session import UploadSession
+from app.models.job import Job
@@ -3,13 +3,19 @@ Modelo Article - Representa um artigo/notícia
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Date, Boolean, DateTime
+from sqlalchemy import Column, String, Text, Date, Boolean, DateTime, Index, JSON
 
 from app.database import Base
 
 
 class Article(Base):
     __tablename__ = "articles"
+    __table_args__ = (
+        # Listagens: filtro por is_published/is_featured e ordenação (publish_date, created_at, id)
+        Index("ix_articles_published_order", "is_published", "publish_date", "created_at", "id"),
+        Index("ix_articles_featured", "is_published", "is_featured", "publish_date"),
+        Index("ix_articles_order", "publish_date", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String(255), nullable=False)
@@ -17,6 +23,7 @@ class Article(Base):
     excerpt = Column(Text, nullable=True)
     content = Column(Text, nullable=True)
     cover_image = Column(String(500), nullable=True)
+    cover_variants = Column(JSON, nullable=True)  # derivados redimensionados da capa
     category = Column(String(100), nullable=True)
     author = Column(String(100), nullable=True)
     publish_date = Column(Date, nullable=True)
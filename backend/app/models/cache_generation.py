@@ -0,0 +1,13 @@
+"""
+Modelo CacheGeneration - Versão dos dados de cada recurso, usada para invalidar caches
+"""
+from sqlalchemy import Column, String, Integer
+
+from app.database import Base
+
+
+class CacheGeneration(Base):
+    __tablename__ = "cache_generations"
+    
+    namespace = Column(String(50), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
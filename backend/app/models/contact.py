@@ -3,13 +3,18 @@ Modelo Contact - Representa uma mensagem de contato
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Boolean, DateTime
+from sqlalchemy import Column, String, Text, Boolean, DateTime, Index
 
 from app.database import Base
 
 
 class Contact(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        # Listagens: filtro por is_read e ordenação (created_at, id)
+        Index("ix_contacts_unread_order", "is_read", "created_at", "id"),
+        Index("ix_contacts_order", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String(255), nullable=False)
@@ -0,0 +1,15 @@
+"""
+Modelo ImageAsset - Derivados redimensionados de uma imagem enviada
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, JSON
+
+from app.database import Base
+
+
+class ImageAsset(Base):
+    __tablename__ = "image_assets"
+    
+    url = Column(String(500), primary_key=True)
+    variants = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,35 @@
+"""
+Modelo Job - Trabalho em segundo plano persistido no banco (fila de jobs)
+"""
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Text, Integer, DateTime, Index, JSON
+
+from app.database import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Busca dos jobs prontos pelos workers: status e horário da próxima tentativa
+        Index("ix_jobs_ready", "status", "run_at"),
+        Index("ix_jobs_order", "created_at", "id"),
+    )
+    
+    id = Column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    # pending, running, done ou failed
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)  # Incrementado a cada reserva
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Próxima tentativa
+    # Reserva do worker em execução; vencida, o job volta a ser elegível
+    locked_by = Column(String(100), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    # Chave de jobs ainda não iniciados: um novo job com a mesma chave é descartado
+    dedupe_key = Column(String(100), nullable=True, unique=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
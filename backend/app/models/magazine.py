@@ -3,12 +3,17 @@ Modelo Magazine - Representa uma edição de revista
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Date, Boolean, DateTime
+from sqlalchemy import Column, String, Text, Date, Boolean, DateTime, Integer, Index, JSON
 from app.database import Base
 
 
 class Magazine(Base):
     __tablename__ = "magazines"
+    __table_args__ = (
+        # Listagens: filtro por is_published e ordenação (publish_date, created_at, id)
+        Index("ix_magazines_published_order", "is_published", "publish_date", "created_at", "id"),
+        Index("ix_magazines_order", "publish_date", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String(255), nullable=False)
@@ -16,7 +21,12 @@ class Magazine(Base):
     description = Column(Text, nullable=True)
     pdf_url = Column(String(500), nullable=True)
     cover_image = Column(String(500), nullable=True)
+    cover_variants = Column(JSON, nullable=True)  # derivados redimensionados da capa
     publish_date = Column(Date, nullable=True)
     is_published = Column(Boolean, default=True)
+    # Extração do texto do PDF: pending, processing, done ou failed (nulo sem PDF)
+    text_status = Column(String(20), nullable=True)
+    page_count = Column(Integer, nullable=True)
+    text_locked_until = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,19 @@
+"""
+Modelo MagazinePage - Texto extraído de uma página do PDF de uma revista
+"""
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, UniqueConstraint
+
+from app.database import Base
+
+
+class MagazinePage(Base):
+    __tablename__ = "magazine_pages"
+    __table_args__ = (
+        UniqueConstraint("magazine_id", "page_number", name="uq_magazine_pages_page"),
+    )
+    
+    # O índice de texto (FTS5 no SQLite, tsvector no Postgres) é criado pela migração 0004
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    magazine_id = Column(String(36), ForeignKey("magazines.id", ondelete="CASCADE"), nullable=False)
+    page_number = Column(Integer, nullable=False)
+    text = Column(Text, nullable=False, default="")
@@ -0,0 +1,21 @@
+"""
+Modelo SearchDocument - Texto indexado para a busca de artigos e revistas
+"""
+from sqlalchemy import Column, Integer, String, Text, Boolean, UniqueConstraint
+
+from app.database import Base
+
+
+class SearchDocument(Base):
+    __tablename__ = "search_documents"
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", name="uq_search_documents_entity"),
+    )
+    
+    # O índice de texto (FTS5 no SQLite, tsvector no Postgres) é criado pela migração 0003
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(String(36), nullable=False)
+    is_published = Column(Boolean, nullable=False, default=False)
+    title = Column(Text, nullable=False)
+    body = Column(Text, nullable=False, default="")
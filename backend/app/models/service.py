@@ -3,13 +3,18 @@ Modelo Service - Representa um serviço oferecido
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Boolean, DateTime, Integer
+from sqlalchemy import Column, String, Text, Boolean, DateTime, Integer, Index, JSON
 
 from app.database import Base
 
 
 class Service(Base):
     __tablename__ = "services"
+    __table_args__ = (
+        # Listagens: filtro por is_active e ordenação por order
+        Index("ix_services_active_order", "is_active", "order"),
+        Index("ix_services_order", "order"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String(255), nullable=False)
@@ -17,6 +22,7 @@ class Service(Base):
     description = Column(Text, nullable=True)
     icon = Column(String(100), nullable=True)
     image = Column(String(500), nullable=True)
+    image_variants = Column(JSON, nullable=True)  # derivados redimensionados da imagem
     order = Column(Integer, default=0)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
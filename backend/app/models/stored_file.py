@@ -0,0 +1,26 @@
+"""
+Modelo StoredFile - Arquivo enviado, endereçado pelo SHA-256 do conteúdo
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Index
+
+from app.database import Base
+
+
+class StoredFile(Base):
+    __tablename__ = "stored_files"
+    __table_args__ = (
+        Index("ix_stored_files_unreferenced", "ref_count", "last_uploaded_at"),
+    )
+    
+    backend = Column(String(20), primary_key=True)  # local, s3 ou cloudinary
+    key = Column(String(500), primary_key=True)  # Caminho no bucket/pasta ou public_id
+    url = Column(String(500), nullable=False, unique=True)
+    sha256 = Column(String(64), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String(100), nullable=False)
+    # Quantos registros (revistas, artigos, serviços) apontam para a URL
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Renovado a cada novo upload do mesmo conteúdo: protege arquivos recém-enviados da limpeza
+    last_uploaded_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,21 @@
+"""
+Modelo UploadSession - Upload retomável de um PDF, recebido em partes
+"""
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, BigInteger, DateTime
+
+from app.database import Base
+
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+    
+    id = Column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    filename = Column(String(255), nullable=False)
+    size = Column(BigInteger, nullable=False)  # Tamanho total declarado
+    received = Column(BigInteger, nullable=False, default=0)  # Bytes já gravados (offset atual)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    # Reserva do PATCH em andamento: impede dois envios simultâneos na mesma sessão
+    locked_until = Column(DateTime, nullable=True)
@@ -3,3 +3,7 @@ from app.routers.upload import router as upload_router
 from app.routers.articles import router as articles_router
 from app.routers.services import router as services_router
 from app.routers.contacts import router as contacts_router
+from app.routers.files import router as files_router
+from app.routers.search import router as search_router
+from app.routers.images import router as images_router
+from app.routers.jobs import router as jobs_router
@@ -1,70 +1,115 @@
 """
 Rotas para gerenciamento de artigos/notícias
 """
-import re
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models import Article
-from app.schemas import ArticleCreate, ArticleUpdate, ArticleResponse
+from app.schemas import ArticleCreate, ArticleUpdate, ArticleResponse, ArticleSummary, BulkResult, Page
+from app.services.bulk import insert_articles, parse_rows, read_rows, save_rows
+from app.services.cache import bump_generation, cached_response, get_generation
+from app.services.content_store import update_references
+from app.services.etag import check_etag, weak_etag
+from app.services.export import export_columns, export_response
+from app.services.fields import dump_fields, load_fields, select_fields
+from app.services.images import find_variants
+from app.services.pagination import MAX_PAGE_SIZE, keyset_ordering, page_or_list
+from app.services.search import index_article, remove_from_index
+from app.services.slugs import find_version, generate_slug, unique_slug
 
 router = APIRouter(prefix="/api/articles", tags=["articles"])
 
-
-def generate_slug(title: str) -> str:
-    """Gera um slug a partir do título"""
-    slug = title.lower()
-    slug = re.sub(r'[àáâãäå]', 'a', slug)
-    slug = re.sub(r'[èéêë]', 'e', slug)
-    slug = re.sub(r'[ìíîï]', 'i', slug)
-    slug = re.sub(r'[òóôõö]', 'o', slug)
-    slug = re.sub(r'[ùúûü]', 'u', slug)
-    slug = re.sub(r'[ç]', 'c', slug)
-    slug = re.sub(r'[^a-z0-9\s-]', '', slug)
-    slug = re.sub(r'[\s_]+', '-', slug)
-    slug = re.sub(r'-+', '-', slug)
-    return slug.strip('-')
-
-
-@router.get("", response_model=List[ArticleResponse])
-def list_articles(published_only: bool = True, db: Session = Depends(get_db)):
-    """Lista todos os artigos"""
-    query = db.query(Article)
+# Ordem das listagens (decrescente), também usada como chave do cursor
+ARTICLE_ORDER = (Article.publish_date, Article.created_at, Article.id)
+
+FIELDS_QUERY = Query(None, description="Campos do resumo a retornar, separados por vírgula (ex.: id,title,slug)")
+
+
+@router.get("", response_model=Union[Page[ArticleSummary], List[ArticleSummary]])
+async def list_articles(
+    request: Request,
+    response: Response,
+    published_only: bool = True,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Tamanho da página (sem limite retorna a lista completa)"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor"),
+    fields: Optional[str] = FIELDS_QUERY,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Lista os artigos (resumo, sem o conteúdo)"""
+    selected = select_fields(ArticleSummary, fields)
+    etag = weak_etag("articles", await get_generation(db, "articles"), published_only, limit, cursor, *selected)
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    stmt = select(Article).options(load_fields(Article, selected, ARTICLE_ORDER))
     if published_only:
-        query = query.filter(Article.is_published == True)
-    return query.order_by(Article.publish_date.desc()).all()
-
-
-@router.get("/featured", response_model=List[ArticleResponse])
-def list_featured_articles(db: Session = Depends(get_db)):
-    """Lista artigos em destaque"""
-    return db.query(Article).filter(
-        Article.is_published == True,
-        Article.is_featured == True
-    ).order_by(Article.publish_date.desc()).limit(5).all()
+        stmt = stmt.where(Article.is_published == True)
+    articles = await page_or_list(db, stmt, ARTICLE_ORDER, limit, cursor)
+    return Response(content=dump_fields(articles, selected), media_type="application/json", headers=dict(response.headers))
+
+
+@router.get("/export")
+async def export_articles(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    published_only: bool = False,
+    gzip: bool = Query(False, description="Comprime o arquivo (.gz)")
+):
+    """Exporta os artigos em NDJSON ou CSV, transmitidos em partes"""
+    stmt = select(*export_columns(Article, ArticleResponse))
+    if published_only:
+        stmt = stmt.where(Article.is_published == True)
+    return export_response(stmt.order_by(*keyset_ordering(ARTICLE_ORDER)), format, "articles", gzip)
+
+
+@router.get("/featured", response_model=List[ArticleSummary])
+async def list_featured_articles(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Lista artigos em destaque (resumo, sem o conteúdo)"""
+    selected = select_fields(ArticleSummary, fields)
+    generation = await get_generation(db, "articles")
+    not_modified = check_etag(request, response, weak_etag("articles", generation, "featured", *selected))
+    if not_modified:
+        return not_modified
+    
+    async def build():
+        articles = await db.scalars(select(Article).options(load_fields(Article, selected)).where(
+            Article.is_published == True,
+            Article.is_featured == True
+        ).order_by(Article.publish_date.desc()).limit(5))
+        return dump_fields(articles.all(), selected)
+    
+    return await cached_response("articles", generation, ("featured", *selected), build,
+                                 headers=dict(response.headers), request=request)
 
 
 @router.get("/{article_id}", response_model=ArticleResponse)
-def get_article(article_id: str, db: Session = Depends(get_db)):
+async def get_article(article_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
     """Busca um artigo por ID ou slug"""
-    article = db.query(Article).filter(
-        (Article.id == article_id) | (Article.slug == article_id)
-    ).first()
+    version = await find_version(db, Article, article_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Artigo não encontrado")
+    not_modified = check_etag(request, response, weak_etag("article", *version))
+    if not_modified:
+        return not_modified
+    
+    article = await db.get(Article, version.id)
     if not article:
         raise HTTPException(status_code=404, detail="Artigo não encontrado")
     return article
 
 
 @router.post("", response_model=ArticleResponse)
-def create_article(article: ArticleCreate, db: Session = Depends(get_db)):
+async def create_article(article: ArticleCreate, db: AsyncSession = Depends(get_async_db)):
     """Cria um novo artigo"""
-    slug = article.slug or generate_slug(article.title)
-    
-    existing = db.query(Article).filter(Article.slug == slug).first()
-    if existing:
-        slug = f"{slug}-{existing.id[:8]}"
+    slug = await unique_slug(db, Article, article.slug or generate_slug(article.title))
     
     db_article = Article(
         title=article.title,
@@ -78,39 +123,68 @@ def create_article(article: ArticleCreate, db: Session = Depends(get_db)):
         is_published=article.is_published,
         is_featured=article.is_featured
     )
+    db_article.cover_variants = await find_variants(db, db_article.cover_image)
     db.add(db_article)
-    db.commit()
-    db.refresh(db_article)
+    await update_references(db, [], [db_article.cover_image])
+    await index_article(db, db_article)
+    await bump_generation(db, "articles")
+    await db.commit()
+    await db.refresh(db_article)
     return db_article
 
 
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_articles(
+    request: Request,
+    atomic: bool = Query(False, description="Rejeita o lote inteiro se alguma linha for inválida"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Cria artigos em lote a partir de NDJSON ou de um array JSON, em uma única transação"""
+    rows, errors = parse_rows(await read_rows(request), ArticleCreate)
+    if atomic and errors:
+        raise HTTPException(status_code=422, detail=errors)
+    # Um slug gravado por outra requisição após a consulta é realocado na regravação por linha
+    return await save_rows(db, insert_articles, rows, errors, atomic)
+
+
 @router.put("/{article_id}", response_model=ArticleResponse)
-def update_article(article_id: str, article: ArticleUpdate, db: Session = Depends(get_db)):
+async def update_article(article_id: str, article: ArticleUpdate, db: AsyncSession = Depends(get_async_db)):
     """Atualiza um artigo"""
-    db_article = db.query(Article).filter(Article.id == article_id).first()
+    db_article = await db.get(Article, article_id)
     if not db_article:
         raise HTTPException(status_code=404, detail="Artigo não encontrado")
     
     update_data = article.model_dump(exclude_unset=True)
+    old_files = [db_article.cover_image]
     
-    if 'title' in update_data and not update_data.get('slug'):
-        update_data['slug'] = generate_slug(update_data['title'])
+    if 'title' in update_data or 'slug' in update_data:
+        # Slug vazio (enviado ou gerado de um título sem letras) vira EMPTY_SLUG em unique_slug
+        base = update_data.get('slug') or generate_slug(update_data.get('title') or db_article.title)
+        update_data['slug'] = await unique_slug(db, Article, base, exclude_id=db_article.id)
     
     for key, value in update_data.items():
         setattr(db_article, key, value)
+    if "cover_image" in update_data:
+        db_article.cover_variants = await find_variants(db, db_article.cover_image)
     
-    db.commit()
-    db.refresh(db_article)
+    await update_references(db, old_files, [db_article.cover_image])
+    await index_article(db, db_article)
+    await bump_generation(db, "articles")
+    await db.commit()
+    await db.refresh(db_article)
     return db_article
 
 
 @router.delete("/{article_id}")
-def delete_article(article_id: str, db: Session = Depends(get_db)):
+async def delete_article(article_id: str, db: AsyncSession = Depends(get_async_db)):
     """Remove um artigo"""
-    db_article = db.query(Article).filter(Article.id == article_id).first()
+    db_article = await db.get(Article, article_id)
     if not db_article:
         raise HTTPException(status_code=404, detail="Artigo não encontrado")
     
-    db.delete(db_article)
-    db.commit()
+    await update_references(db, [db_article.cover_image], [])
+    await db.delete(db_article)
+    await remove_from_index(db, "article", db_article.id)
+    await bump_generation(db, "articles")
+    await db.commit()
     return {"message": "Artigo removido com sucesso"}
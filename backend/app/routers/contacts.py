@@ -1,37 +1,76 @@
 """
 Rotas para gerenciamento de contatos
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models import Contact
-from app.schemas import ContactCreate, ContactUpdate, ContactResponse
+from app.schemas import ContactCreate, ContactUpdate, ContactResponse, Page
+from app.services.cache import bump_generation, get_generation
+from app.services.etag import check_etag, weak_etag
+from app.services.export import export_columns, export_response
+from app.services.pagination import MAX_PAGE_SIZE, keyset_ordering, page_or_list
 
 router = APIRouter(prefix="/api/contacts", tags=["contacts"])
 
+# Ordem das listagens (decrescente), também usada como chave do cursor
+CONTACT_ORDER = (Contact.created_at, Contact.id)
 
-@router.get("", response_model=List[ContactResponse])
-def list_contacts(unread_only: bool = False, db: Session = Depends(get_db)):
+
+@router.get("", response_model=Union[Page[ContactResponse], List[ContactResponse]])
+async def list_contacts(
+    request: Request,
+    response: Response,
+    unread_only: bool = False,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Tamanho da página (sem limite retorna a lista completa)"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """Lista todas as mensagens de contato"""
-    query = db.query(Contact)
+    etag = weak_etag("contacts", await get_generation(db, "contacts"), unread_only, limit, cursor)
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    stmt = select(Contact)
+    if unread_only:
+        stmt = stmt.where(Contact.is_read == False)
+    return await page_or_list(db, stmt, CONTACT_ORDER, limit, cursor)
+
+
+@router.get("/export")
+async def export_contacts(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    unread_only: bool = False,
+    gzip: bool = Query(False, description="Comprime o arquivo (.gz)")
+):
+    """Exporta as mensagens de contato em NDJSON ou CSV, transmitidos em partes"""
+    stmt = select(*export_columns(Contact, ContactResponse))
     if unread_only:
-        query = query.filter(Contact.is_read == False)
-    return query.order_by(Contact.created_at.desc()).all()
+        stmt = stmt.where(Contact.is_read == False)
+    return export_response(stmt.order_by(*keyset_ordering(CONTACT_ORDER)), format, "contacts", gzip)
 
 
 @router.get("/{contact_id}", response_model=ContactResponse)
-def get_contact(contact_id: str, db: Session = Depends(get_db)):
+async def get_contact(contact_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
     """Busca uma mensagem de contato por ID"""
-    contact = db.query(Contact).filter(Contact.id == contact_id).first()
+    # Contatos não têm updated_at: a versão é a geração do recurso
+    etag = weak_etag("contact", contact_id, await get_generation(db, "contacts"))
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    contact = await db.get(Contact, contact_id)
     if not contact:
         raise HTTPException(status_code=404, detail="Mensagem não encontrada")
     return contact
 
 
 @router.post("", response_model=ContactResponse)
-def create_contact(contact: ContactCreate, db: Session = Depends(get_db)):
+async def create_contact(contact: ContactCreate, db: AsyncSession = Depends(get_async_db)):
     """Cria uma nova mensagem de contato"""
     db_contact = Contact(
         name=contact.name,
@@ -41,15 +80,16 @@ def create_contact(contact: ContactCreate, db: Session = Depends(get_db)):
         message=contact.message
     )
     db.add(db_contact)
-    db.commit()
-    db.refresh(db_contact)
+    await bump_generation(db, "contacts")
+    await db.commit()
+    await db.refresh(db_contact)
     return db_contact
 
 
 @router.put("/{contact_id}", response_model=ContactResponse)
-def update_contact(contact_id: str, contact: ContactUpdate, db: Session = Depends(get_db)):
+async def update_contact(contact_id: str, contact: ContactUpdate, db: AsyncSession = Depends(get_async_db)):
     """Atualiza uma mensagem de contato (marcar como lida)"""
-    db_contact = db.query(Contact).filter(Contact.id == contact_id).first()
+    db_contact = await db.get(Contact, contact_id)
     if not db_contact:
         raise HTTPException(status_code=404, detail="Mensagem não encontrada")
     
@@ -57,18 +97,20 @@ def update_contact(contact_id: str, contact: ContactUpdate, db: Session = Depend
     for key, value in update_data.items():
         setattr(db_contact, key, value)
     
-    db.commit()
-    db.refresh(db_contact)
+    await bump_generation(db, "contacts")
+    await db.commit()
+    await db.refresh(db_contact)
     return db_contact
 
 
 @router.delete("/{contact_id}")
-def delete_contact(contact_id: str, db: Session = Depends(get_db)):
+async def delete_contact(contact_id: str, db: AsyncSession = Depends(get_async_db)):
     """Remove uma mensagem de contato"""
-    db_contact = db.query(Contact).filter(Contact.id == contact_id).first()
+    db_contact = await db.get(Contact, contact_id)
     if not db_contact:
         raise HTTPException(status_code=404, detail="Mensagem não encontrada")
     
-    db.delete(db_contact)
-    db.commit()
+    await db.delete(db_contact)
+    await bump_generation(db, "contacts")
+    await db.commit()
     return {"message": "Mensagem removida com sucesso"}
@@ -0,0 +1,37 @@
+"""
+Rotas para servir os arquivos enviados (PDFs e capas)
+"""
+import os
+import stat
+from pathlib import Path
+
+import anyio
+from fastapi import APIRouter, HTTPException, Request
+
+from app.config import settings
+from app.services.file_response import build_file_response
+
+router = APIRouter(prefix="/uploads", tags=["files"])
+
+SERVED_FOLDERS = {"pdfs", "covers"}
+
+
+@router.api_route("/{folder}/{file_path:path}", methods=["GET", "HEAD"])
+async def serve_upload(folder: str, file_path: str, request: Request):
+    """Serve um arquivo enviado com suporte a Range, ETag e GET condicional"""
+    if folder not in SERVED_FOLDERS:
+        raise HTTPException(status_code=404, detail="Arquivo não encontrado")
+
+    base_path = (Path(settings.UPLOAD_DIR) / folder).resolve()
+    path = (base_path / file_path).resolve()
+    if base_path not in path.parents:
+        raise HTTPException(status_code=404, detail="Arquivo não encontrado")
+
+    try:
+        stat_result = await anyio.to_thread.run_sync(os.stat, path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="Arquivo não encontrado")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="Arquivo não encontrado")
+
+    return build_file_response(request, path, stat_result)
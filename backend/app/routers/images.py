@@ -0,0 +1,70 @@
+"""
+Rota que entrega o derivado de imagem mais adequado ao cliente
+"""
+import logging
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import RedirectResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_read_db
+from app.models import Article, Magazine, Service
+from app.services.file_response import build_file_response, stat_file
+from app.services.images import IMAGE_WIDTHS, best_variant
+from app.services.storage import locate
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/images", tags=["images"])
+
+# Recurso: (imagem original, derivados)
+IMAGE_COLUMNS = {
+    "magazines": (Magazine.id, Magazine.cover_image, Magazine.cover_variants),
+    "articles": (Article.id, Article.cover_image, Article.cover_variants),
+    "services": (Service.id, Service.image, Service.image_variants),
+}
+
+# O conteúdo muda quando a imagem é trocada: cache curto, variando pelo formato aceito
+REDIRECT_CACHE_CONTROL = "public, max-age=300"
+
+
+@router.get("/{kind}/{entity_id}")
+async def get_image(
+    kind: Literal["magazines", "articles", "services"],
+    entity_id: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=IMAGE_WIDTHS[-1] * 2, description="Largura de exibição em pixels"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Entrega o derivado WebP/JPEG mais próximo da largura pedida: do cache local, se o
+    arquivo estiver em um backend remoto, ou por redirecionamento"""
+    id_column, image_column, variants_column = IMAGE_COLUMNS[kind]
+    row = (await db.execute(select(image_column, variants_column).where(id_column == entity_id))).first()
+    if row is None or not row[0]:
+        raise HTTPException(status_code=404, detail="Imagem não encontrada")
+    
+    image, variants = row
+    variant = best_variant(variants or [], w, request.headers.get("accept", ""))
+    target = variant["url"] if variant else image
+    
+    # Imagens remotas populares saem do disco local em vez de ir à origem a cada acesso
+    location = locate(target)
+    if location and location[0].name != "local":
+        try:
+            path = await location[0].local_path(location[1])
+        except Exception:
+            logger.warning("Falha ao obter a imagem %s do armazenamento", target, exc_info=True)
+            path = None
+        # Cópia removida do cache entre a busca e o stat: segue para o redirecionamento
+        stat_result = await stat_file(path) if path is not None else None
+        if stat_result is not None:
+            response = build_file_response(request, path, stat_result, cache_control=REDIRECT_CACHE_CONTROL)
+            response.headers["Vary"] = "Accept"
+            return response
+    
+    return RedirectResponse(
+        target,
+        status_code=307,
+        headers={"Vary": "Accept", "Cache-Control": REDIRECT_CACHE_CONTROL}
+    )
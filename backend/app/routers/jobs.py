@@ -0,0 +1,55 @@
+"""
+Rotas para acompanhar a fila de jobs em segundo plano
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models import Job
+from app.schemas import JobResponse, Page
+from app.services.pagination import MAX_PAGE_SIZE, keyset_page
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+# Ordem das listagens (decrescente), também usada como chave do cursor
+JOB_ORDER = (Job.created_at, Job.id)
+
+
+@router.get("", response_model=Page[JobResponse])
+async def list_jobs(
+    status: Optional[str] = Query(None, description="pending, running, done ou failed"),
+    kind: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Lista os jobs, dos mais recentes para os mais antigos"""
+    # Sem cache nem réplica: o status muda a cada execução dos workers
+    stmt = select(Job)
+    if status:
+        stmt = stmt.where(Job.status == status)
+    if kind:
+        stmt = stmt.where(Job.kind == kind)
+    items, next_cursor = await keyset_page(db, stmt, JOB_ORDER, limit, cursor)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/stats")
+async def job_stats(db: AsyncSession = Depends(get_async_db)):
+    """Quantidade de jobs por tipo e status"""
+    rows = await db.execute(select(Job.kind, Job.status, func.count()).group_by(Job.kind, Job.status))
+    stats: dict = {}
+    for kind, status, count in rows:
+        stats.setdefault(kind, {})[status] = count
+    return stats
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Busca um job por ID"""
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
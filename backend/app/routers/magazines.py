@@ -1,76 +1,270 @@
 """
 Rotas para gerenciamento de revistas
 """
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+import logging
+from typing import List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.responses import RedirectResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models.magazine import Magazine
-from app.schemas.magazine import MagazineCreate, MagazineUpdate, MagazineResponse
+from app.models.magazine_page import MagazinePage
+from app.schemas.bulk import BulkResult
+from app.schemas.magazine import MagazineCreate, MagazineUpdate, MagazineResponse, PageHit
+from app.schemas.pagination import Page
+from app.services.bulk import insert_magazines, parse_rows, read_rows, save_rows
+from app.services.cache import bump_generation, cached_response, get_generation, serialize
+from app.services.content_store import update_references
+from app.services.etag import check_etag, weak_etag
+from app.services.export import export_columns, export_response
+from app.services.images import find_variants
+from app.services.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, keyset_ordering, page_or_list
+from app.services.file_response import REVALIDATE_CACHE_CONTROL, build_file_response, stat_file
+from app.services.pdf_render import render_thumbnails, thumb_path
+from app.services.pdf_text import local_pdf, queue_extraction, reset_pages
+from app.services.search import index_magazine, remove_from_index, search_pages
+from app.services.storage import locate
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/magazines", tags=["magazines"])
 
+# Ordem das listagens (decrescente), também usada como chave do cursor
+MAGAZINE_ORDER = (Magazine.publish_date, Magazine.created_at, Magazine.id)
+
+MAGAZINE_LIST_ADAPTER = TypeAdapter(List[MagazineResponse])
+MAGAZINE_PAGE_ADAPTER = TypeAdapter(Page[MagazineResponse])
 
-@router.get("", response_model=List[MagazineResponse])
-def list_magazines(
+
+@router.get("", response_model=Union[Page[MagazineResponse], List[MagazineResponse]])
+async def list_magazines(
+    request: Request,
+    response: Response,
     published_only: bool = Query(False, description="Filtrar apenas publicadas"),
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Tamanho da página (sem limite retorna a lista completa)"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Lista todas as revistas"""
-    query = db.query(Magazine)
+    # A versão dos dados vem da geração do recurso: 304 sem carregar as linhas
+    generation = await get_generation(db, "magazines")
+    etag = weak_etag("magazines", generation, published_only, limit, cursor)
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    stmt = select(Magazine)
+    if published_only:
+        # Listagem pública: serializada uma vez e servida do cache até a próxima alteração
+        stmt = stmt.where(Magazine.is_published == True)
+        adapter = MAGAZINE_LIST_ADAPTER if limit is None else MAGAZINE_PAGE_ADAPTER
+        
+        async def build():
+            return serialize(adapter, await page_or_list(db, stmt, MAGAZINE_ORDER, limit, cursor))
+        
+        return await cached_response(
+            "magazines", generation, ("published", limit, cursor), build,
+            headers=dict(response.headers), request=request
+        )
+    return await page_or_list(db, stmt, MAGAZINE_ORDER, limit, cursor)
+
+
+@router.get("/export")
+async def export_magazines(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    published_only: bool = False,
+    gzip: bool = Query(False, description="Comprime o arquivo (.gz)")
+):
+    """Exporta as revistas em NDJSON ou CSV, transmitidos em partes"""
+    stmt = select(*export_columns(Magazine, MagazineResponse))
     if published_only:
-        query = query.filter(Magazine.is_published == True)
-    return query.order_by(desc(Magazine.publish_date), desc(Magazine.created_at)).all()
+        stmt = stmt.where(Magazine.is_published == True)
+    return export_response(stmt.order_by(*keyset_ordering(MAGAZINE_ORDER)), format, "magazines", gzip)
 
 
 @router.get("/{magazine_id}", response_model=MagazineResponse)
-def get_magazine(magazine_id: str, db: Session = Depends(get_db)):
+async def get_magazine(magazine_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
     """Busca uma revista pelo ID"""
-    magazine = db.query(Magazine).filter(Magazine.id == magazine_id).first()
+    updated_at = await db.scalar(select(Magazine.updated_at).where(Magazine.id == magazine_id))
+    if updated_at is not None:
+        not_modified = check_etag(request, response, weak_etag("magazine", magazine_id, updated_at))
+        if not_modified:
+            return not_modified
+    
+    magazine = await db.get(Magazine, magazine_id)
     if not magazine:
         raise HTTPException(status_code=404, detail="Revista não encontrada")
     return magazine
 
 
+@router.get("/{magazine_id}/search", response_model=Page[PageHit])
+async def search_magazine_pages(
+    magazine_id: str,
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Termos da busca"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Busca no texto das páginas do PDF da revista, retornando páginas e trechos"""
+    version = (await db.execute(select(Magazine.updated_at, Magazine.text_status).where(
+        Magazine.id == magazine_id
+    ))).first()
+    if version is None:
+        raise HTTPException(status_code=404, detail="Revista não encontrada")
+    
+    # Enquanto a extração não termina, novas páginas podem entrar no resultado
+    if version.text_status == "done":
+        etag = weak_etag("magazine-pages", magazine_id, version.updated_at, q, limit, cursor)
+        not_modified = check_etag(request, response, etag)
+        if not_modified:
+            return not_modified
+    
+    # O cursor guarda o número da última página retornada
+    after_page = decode_cursor(cursor, [MagazinePage.page_number])[0] if cursor else 0
+    if not isinstance(after_page, int):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    
+    hits = await search_pages(db, magazine_id, q, limit + 1, after_page)
+    next_cursor = encode_cursor([hits[limit - 1][0]]) if len(hits) > limit else None
+    return {
+        "items": [{"page": page, "snippet": snippet} for page, snippet in hits[:limit]],
+        "next_cursor": next_cursor
+    }
+
+
+@router.api_route("/{magazine_id}/pages/{page_number}/thumb", methods=["GET", "HEAD"])
+async def get_page_thumbnail(
+    magazine_id: str,
+    request: Request,
+    page_number: int = Path(..., ge=1),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Serve a miniatura WebP de uma página do PDF, renderizando-a se não estiver em cache"""
+    magazine = (await db.execute(select(Magazine.pdf_url, Magazine.page_count).where(
+        Magazine.id == magazine_id
+    ))).first()
+    if magazine is None or not magazine.pdf_url:
+        raise HTTPException(status_code=404, detail="Revista não encontrada")
+    if magazine.page_count is not None and page_number > magazine.page_count:
+        raise HTTPException(status_code=404, detail="Página não encontrada")
+    
+    path = thumb_path(magazine_id, page_number)
+    stat_result = await stat_file(path)
+    if stat_result is None:
+        # Cache vazio (edição ainda em processamento ou pasta apagada): renderiza só esta página
+        try:
+            async with local_pdf(magazine.pdf_url) as pdf_path:
+                await render_thumbnails(pdf_path, magazine_id, page_number, range(page_number, page_number + 1))
+        except (OSError, RuntimeError):
+            # PDF ausente, inacessível ou ilegível (PdfiumError é um RuntimeError)
+            raise HTTPException(status_code=404, detail="Miniatura indisponível")
+        stat_result = await stat_file(path)
+        if stat_result is None:
+            raise HTTPException(status_code=404, detail="Página não encontrada")
+    return build_file_response(request, path, stat_result)
+
+
+@router.api_route("/{magazine_id}/pdf", methods=["GET", "HEAD"])
+async def get_magazine_pdf(magazine_id: str, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """Serve o PDF da revista com suporte a Range, a partir do disco local ou do cache dos
+    backends remotos; links externos são redirecionados"""
+    pdf_url = await db.scalar(select(Magazine.pdf_url).where(Magazine.id == magazine_id))
+    if not pdf_url:
+        raise HTTPException(status_code=404, detail="PDF não encontrado")
+    
+    location = locate(pdf_url)
+    try:
+        path = await location[0].local_path(location[1]) if location else None
+    except Exception:
+        # Origem indisponível: o cliente tenta direto na URL pública
+        logger.warning("Falha ao obter o PDF %s do armazenamento", pdf_url, exc_info=True)
+        path = None
+    # Um único stat fora do event loop; a cópia do cache pode ter sido removida nesse meio-tempo
+    stat_result = await stat_file(path) if path is not None else None
+    if stat_result is None:
+        return RedirectResponse(pdf_url, status_code=307)
+    # A URL é da revista, não do arquivo: o PDF pode ser trocado, então o cache é revalidado
+    return build_file_response(request, path, stat_result, cache_control=REVALIDATE_CACHE_CONTROL)
+
+
 @router.post("", response_model=MagazineResponse, status_code=201)
-def create_magazine(magazine: MagazineCreate, db: Session = Depends(get_db)):
+async def create_magazine(magazine: MagazineCreate, db: AsyncSession = Depends(get_async_db)):
     """Cria uma nova revista"""
     db_magazine = Magazine(**magazine.model_dump())
+    db_magazine.text_status = "pending" if db_magazine.pdf_url else None
+    db_magazine.cover_variants = await find_variants(db, db_magazine.cover_image)
     db.add(db_magazine)
-    db.commit()
-    db.refresh(db_magazine)
+    await update_references(db, [], [db_magazine.pdf_url, db_magazine.cover_image])
+    await index_magazine(db, db_magazine)
+    if db_magazine.pdf_url:
+        await queue_extraction(db, db_magazine.id)
+    await bump_generation(db, "magazines")
+    await db.commit()
+    await db.refresh(db_magazine)
     return db_magazine
 
 
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_magazines(
+    request: Request,
+    atomic: bool = Query(False, description="Rejeita o lote inteiro se alguma linha for inválida"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Cria revistas em lote a partir de NDJSON ou de um array JSON, em uma única transação"""
+    rows, errors = parse_rows(await read_rows(request), MagazineCreate)
+    if atomic and errors:
+        raise HTTPException(status_code=422, detail=errors)
+    return await save_rows(db, insert_magazines, rows, errors, atomic)
+
+
 @router.put("/{magazine_id}", response_model=MagazineResponse)
-def update_magazine(
+async def update_magazine(
     magazine_id: str,
     magazine: MagazineUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Atualiza uma revista existente"""
-    db_magazine = db.query(Magazine).filter(Magazine.id == magazine_id).first()
+    db_magazine = await db.get(Magazine, magazine_id)
     if not db_magazine:
         raise HTTPException(status_code=404, detail="Revista não encontrada")
     
     update_data = magazine.model_dump(exclude_unset=True)
+    pdf_changed = "pdf_url" in update_data and update_data["pdf_url"] != db_magazine.pdf_url
+    old_files = [db_magazine.pdf_url, db_magazine.cover_image]
     for field, value in update_data.items():
         setattr(db_magazine, field, value)
+    if "cover_image" in update_data:
+        db_magazine.cover_variants = await find_variants(db, db_magazine.cover_image)
     
-    db.commit()
-    db.refresh(db_magazine)
+    # Novo PDF: o texto antigo é descartado e a extração recomeça
+    if pdf_changed:
+        await reset_pages(db, db_magazine)
+    await update_references(db, old_files, [db_magazine.pdf_url, db_magazine.cover_image])
+    await index_magazine(db, db_magazine)
+    if pdf_changed and db_magazine.pdf_url:
+        await queue_extraction(db, db_magazine.id)
+    await bump_generation(db, "magazines")
+    await db.commit()
+    await db.refresh(db_magazine)
     return db_magazine
 
 
 @router.delete("/{magazine_id}", status_code=204)
-def delete_magazine(magazine_id: str, db: Session = Depends(get_db)):
+async def delete_magazine(magazine_id: str, db: AsyncSession = Depends(get_async_db)):
     """Exclui uma revista"""
-    db_magazine = db.query(Magazine).filter(Magazine.id == magazine_id).first()
+    db_magazine = await db.get(Magazine, magazine_id)
     if not db_magazine:
         raise HTTPException(status_code=404, detail="Revista não encontrada")
     
-    db.delete(db_magazine)
-    db.commit()
+    await reset_pages(db, db_magazine)
+    await update_references(db, [db_magazine.pdf_url, db_magazine.cover_image], [])
+    await db.delete(db_magazine)
+    await remove_from_index(db, "magazine", db_magazine.id)
+    await bump_generation(db, "magazines")
+    await db.commit()
     return None
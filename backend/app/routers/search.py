@@ -0,0 +1,52 @@
+"""
+Rota de busca textual em artigos e revistas
+"""
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_read_db
+from app.models import SearchDocument
+from app.schemas import Page, SearchResult
+from app.services.cache import get_generation
+from app.services.etag import check_etag, weak_etag
+from app.services.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from app.services.search import search
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+MAX_OFFSET = 1000
+
+
+@router.get("", response_model=Page[SearchResult])
+async def search_content(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Termos da busca"),
+    type: Optional[Literal["article", "magazine"]] = Query(None, description="Restringe a um tipo de conteúdo"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Busca artigos e revistas publicados, ordenados por relevância"""
+    # Os resultados são ordenados por relevância, então o cursor guarda o deslocamento
+    offset = decode_cursor(cursor, [SearchDocument.id])[0] if cursor else 0
+    if not isinstance(offset, int) or not 0 <= offset <= MAX_OFFSET:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    
+    etag = weak_etag(
+        "search", await get_generation(db, "articles"), await get_generation(db, "magazines"),
+        q, type, limit, offset
+    )
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    rows = await search(db, q, type, limit + 1, offset)
+    items = [
+        SearchResult(type=entity_type, id=entity_id, title=title, snippet=snippet, score=score)
+        for entity_type, entity_id, title, snippet, score in rows[:limit]
+    ]
+    next_offset = offset + limit
+    next_cursor = encode_cursor([next_offset]) if len(rows) > limit and next_offset <= MAX_OFFSET else None
+    return {"items": items, "next_cursor": next_cursor}
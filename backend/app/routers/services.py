@@ -1,57 +1,68 @@
 """
 Rotas para gerenciamento de serviços
 """
-import re
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models import Service
 from app.schemas import ServiceCreate, ServiceUpdate, ServiceResponse
+from app.services.cache import bump_generation, cached_response, get_generation, serialize
+from app.services.etag import check_etag, weak_etag
+from app.services.content_store import update_references
+from app.services.images import find_variants
+from app.services.slugs import find_version, generate_slug, unique_slug
 
 router = APIRouter(prefix="/api/services", tags=["services"])
 
-
-def generate_slug(title: str) -> str:
-    """Gera um slug a partir do título"""
-    slug = title.lower()
-    slug = re.sub(r'[àáâãäå]', 'a', slug)
-    slug = re.sub(r'[èéêë]', 'e', slug)
-    slug = re.sub(r'[ìíîï]', 'i', slug)
-    slug = re.sub(r'[òóôõö]', 'o', slug)
-    slug = re.sub(r'[ùúûü]', 'u', slug)
-    slug = re.sub(r'[ç]', 'c', slug)
-    slug = re.sub(r'[^a-z0-9\s-]', '', slug)
-    slug = re.sub(r'[\s_]+', '-', slug)
-    slug = re.sub(r'-+', '-', slug)
-    return slug.strip('-')
+SERVICE_LIST_ADAPTER = TypeAdapter(List[ServiceResponse])
 
 
 @router.get("", response_model=List[ServiceResponse])
-def list_services(active_only: bool = True, db: Session = Depends(get_db)):
+async def list_services(request: Request, response: Response, active_only: bool = True, db: AsyncSession = Depends(get_async_read_db)):
     """Lista todos os serviços"""
-    query = db.query(Service)
+    generation = await get_generation(db, "services")
+    not_modified = check_etag(request, response, weak_etag("services", generation, active_only))
+    if not_modified:
+        return not_modified
+    
+    stmt = select(Service)
     if active_only:
-        query = query.filter(Service.is_active == True)
-    return query.order_by(Service.order.asc()).all()
+        # Listagem pública: serializada uma vez e servida do cache até a próxima alteração
+        stmt = stmt.where(Service.is_active == True)
+        
+        async def build():
+            services = await db.scalars(stmt.order_by(Service.order.asc()))
+            return serialize(SERVICE_LIST_ADAPTER, services.all())
+        
+        return await cached_response("services", generation, ("active",), build,
+                                     headers=dict(response.headers), request=request)
+    return (await db.scalars(stmt.order_by(Service.order.asc()))).all()
 
 
 @router.get("/{service_id}", response_model=ServiceResponse)
-def get_service(service_id: str, db: Session = Depends(get_db)):
+async def get_service(service_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
     """Busca um serviço por ID ou slug"""
-    service = db.query(Service).filter(
-        (Service.id == service_id) | (Service.slug == service_id)
-    ).first()
+    version = await find_version(db, Service, service_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Serviço não encontrado")
+    not_modified = check_etag(request, response, weak_etag("service", *version))
+    if not_modified:
+        return not_modified
+    
+    service = await db.get(Service, version.id)
     if not service:
         raise HTTPException(status_code=404, detail="Serviço não encontrado")
     return service
 
 
 @router.post("", response_model=ServiceResponse)
-def create_service(service: ServiceCreate, db: Session = Depends(get_db)):
+async def create_service(service: ServiceCreate, db: AsyncSession = Depends(get_async_db)):
     """Cria um novo serviço"""
-    slug = service.slug or generate_slug(service.title)
+    slug = await unique_slug(db, Service, service.slug or generate_slug(service.title))
     
     db_service = Service(
         title=service.title,
@@ -62,39 +73,51 @@ def create_service(service: ServiceCreate, db: Session = Depends(get_db)):
         order=service.order,
         is_active=service.is_active
     )
+    db_service.image_variants = await find_variants(db, db_service.image)
     db.add(db_service)
-    db.commit()
-    db.refresh(db_service)
+    await update_references(db, [], [db_service.image])
+    await bump_generation(db, "services")
+    await db.commit()
+    await db.refresh(db_service)
     return db_service
 
 
 @router.put("/{service_id}", response_model=ServiceResponse)
-def update_service(service_id: str, service: ServiceUpdate, db: Session = Depends(get_db)):
+async def update_service(service_id: str, service: ServiceUpdate, db: AsyncSession = Depends(get_async_db)):
     """Atualiza um serviço"""
-    db_service = db.query(Service).filter(Service.id == service_id).first()
+    db_service = await db.get(Service, service_id)
     if not db_service:
         raise HTTPException(status_code=404, detail="Serviço não encontrado")
     
     update_data = service.model_dump(exclude_unset=True)
+    old_files = [db_service.image]
     
-    if 'title' in update_data and not update_data.get('slug'):
-        update_data['slug'] = generate_slug(update_data['title'])
+    if 'title' in update_data or 'slug' in update_data:
+        # Slug vazio (enviado ou gerado de um título sem letras) vira EMPTY_SLUG em unique_slug
+        base = update_data.get('slug') or generate_slug(update_data.get('title') or db_service.title)
+        update_data['slug'] = await unique_slug(db, Service, base, exclude_id=db_service.id)
     
     for key, value in update_data.items():
         setattr(db_service, key, value)
+    if "image" in update_data:
+        db_service.image_variants = await find_variants(db, db_service.image)
     
-    db.commit()
-    db.refresh(db_service)
+    await update_references(db, old_files, [db_service.image])
+    await bump_generation(db, "services")
+    await db.commit()
+    await db.refresh(db_service)
     return db_service
 
 
 @router.delete("/{service_id}")
-def delete_service(service_id: str, db: Session = Depends(get_db)):
+async def delete_service(service_id: str, db: AsyncSession = Depends(get_async_db)):
     """Remove um serviço"""
-    db_service = db.query(Service).filter(Service.id == service_id).first()
+    db_service = await db.get(Service, service_id)
     if not db_service:
         raise HTTPException(status_code=404, detail="Serviço não encontrado")
     
-    db.delete(db_service)
-    db.commit()
+    await update_references(db, [db_service.image], [])
+    await db.delete(db_service)
+    await bump_generation(db, "services")
+    await db.commit()
     return {"message": "Serviço removido com sucesso"}
@@ -1,145 +1,227 @@
 """
 Rotas para upload de arquivos
 """
-import uuid
+import base64
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException
-import cloudinary
-import cloudinary.uploader
-import boto3
-from botocore.exceptions import ClientError
+from fastapi import APIRouter, Depends, UploadFile, File, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from botocore.exceptions import BotoCoreError, ClientError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
+from app.database import get_async_db
+from app.models import StoredFile
+from app.schemas.upload import AbortUploadRequest, CompleteUploadRequest, PresignRequest, ResumableUploadCreate
+from app.services.content_store import content_key, find_existing, register, store_file, store_image
+from app.services.executors import run_storage_io
+from app.services.resumable import cancel_session, create_session, finish_session, get_session, receive_chunk
+from app.services.s3_presign import (
+    abort_multipart, complete_multipart, incoming_key, inspect_object, object_sha256, presign_multipart, presign_put,
+    promote_object,
+)
+from app.services.storage import get_backend, get_s3_url, s3_client
+from app.services.upload import spooled_upload
 
 router = APIRouter(prefix="/api/upload", tags=["upload"])
 
 ALLOWED_PDF_EXTENSIONS = {".pdf"}
 ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+RESUMABLE_CONTENT_TYPE = "application/offset+octet-stream"
 
-# Configurar Cloudinary
-if settings.use_cloudinary:
-    cloudinary.config(
-        cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-        api_key=settings.CLOUDINARY_API_KEY,
-        api_secret=settings.CLOUDINARY_API_SECRET
-    )
-
-# Configurar AWS S3
-s3_client = None
-if settings.use_s3:
-    s3_client = boto3.client(
-        's3',
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_S3_REGION
-    )
-
-
-def get_upload_path(subfolder: str) -> Path:
-    """Retorna o caminho da pasta de upload"""
-    path = Path(settings.UPLOAD_DIR) / subfolder
-    path.mkdir(parents=True, exist_ok=True)
-    return path
-
-
-def validate_file_size(file: UploadFile, max_size_mb: int):
-    """Valida o tamanho do arquivo"""
-    file.file.seek(0, 2)
-    size = file.file.tell()
-    file.file.seek(0)
+
+def get_content_type(filename: str) -> str:
+    """Content-Type de um arquivo enviado, pela extensão"""
+    if filename.endswith(".pdf"):
+        return "application/pdf"
+    if filename.endswith(".png"):
+        return "image/png"
+    if filename.endswith(".webp"):
+        return "image/webp"
+    return "image/jpeg"
+
+
+@router.post("/pdf")
+async def upload_pdf(file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
+    """Upload de arquivo PDF (o mesmo conteúdo é armazenado uma única vez)"""
+    ext = Path(file.filename).suffix.lower()
+    if ext not in ALLOWED_PDF_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail="Tipo de arquivo não permitido. Apenas PDF é aceito."
+        )
     
-    max_size_bytes = max_size_mb * 1024 * 1024
-    if size > max_size_bytes:
+    async with spooled_upload(file, settings.MAX_PDF_SIZE_MB) as stored:
+        file_url = await store_file(db, stored, "pdfs", ext, get_content_type(ext))
+    return {"file_url": file_url}
+
+
+def validate_pdf(filename: str, size: int) -> None:
+    """Valida a extensão e o tamanho declarado de um PDF enviado fora do multipart/form-data"""
+    if Path(filename).suffix.lower() not in ALLOWED_PDF_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail="Tipo de arquivo não permitido. Apenas PDF é aceito."
+        )
+    if size > settings.MAX_PDF_SIZE_MB * 1024 * 1024:
         raise HTTPException(
             status_code=413,
-            detail=f"Arquivo muito grande. Máximo permitido: {max_size_mb}MB"
+            detail=f"Arquivo muito grande. Máximo permitido: {settings.MAX_PDF_SIZE_MB}MB"
         )
 
 
-def get_safe_filename(original_filename: str) -> str:
-    """Gera um nome de arquivo seguro com UUID"""
-    ext = Path(original_filename).suffix.lower()
-    unique_id = str(uuid.uuid4())[:8]
-    safe_name = "".join(c for c in Path(original_filename).stem if c.isalnum() or c in "-_")
-    return f"{unique_id}_{safe_name}{ext}"
+def require_s3() -> None:
+    """O upload direto só existe quando o armazenamento é o S3"""
+    if not settings.use_s3:
+        raise HTTPException(status_code=501, detail="Upload direto disponível apenas com armazenamento S3")
 
 
-async def upload_to_cloudinary(file: UploadFile, resource_type: str = "auto", folder: str = "carlota-mag"):
-    """Upload arquivo para Cloudinary"""
+@router.post("/pdf/presign")
+async def presign_pdf_upload(data: PresignRequest, db: AsyncSession = Depends(get_async_db)):
+    """Gera URLs pré-assinadas para o navegador enviar o PDF direto ao S3, sem passar pela API"""
+    require_s3()
+    validate_pdf(data.filename, data.size)
+    
+    sha256 = data.sha256.lower()
+    key = content_key("s3", "pdfs", sha256, ".pdf")
+    existing = await find_existing(db, get_backend("s3"), key)
+    if existing:
+        # Conteúdo já armazenado: nada a enviar
+        return {"exists": True, "file_url": existing.url}
+    
+    content_type = get_content_type(".pdf")
+    checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
     try:
-        content = await file.read()
-        result = cloudinary.uploader.upload(
-            content,
-            resource_type=resource_type,
-            folder=folder,
-            public_id=get_safe_filename(file.filename).rsplit('.', 1)[0]
-        )
-        return result["secure_url"]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro no upload: {str(e)}")
+        if data.size < settings.S3_MULTIPART_THRESHOLD_MB * 1024 * 1024:
+            target = await run_storage_io(
+                "s3", presign_put, s3_client, settings.AWS_S3_BUCKET, key, content_type, checksum,
+                settings.S3_PRESIGN_EXPIRES_SECONDS
+            )
+        else:
+            target = await run_storage_io(
+                "s3", presign_multipart, s3_client, settings.AWS_S3_BUCKET, incoming_key(key), content_type, data.size,
+                settings.S3_MULTIPART_PART_SIZE_MB * 1024 * 1024, settings.S3_PRESIGN_EXPIRES_SECONDS
+            )
+    except (ClientError, BotoCoreError) as e:
+        raise HTTPException(status_code=500, detail=f"Erro no upload S3: {str(e)}")
+    return {"exists": False, **target}
 
 
-async def upload_to_s3(file: UploadFile, folder: str = "uploads"):
-    """Upload arquivo para AWS S3"""
+@router.post("/pdf/complete")
+async def complete_pdf_upload(data: CompleteUploadRequest, db: AsyncSession = Depends(get_async_db)):
+    """Confere o PDF enviado direto ao S3 (tamanho, tipo e SHA-256) e retorna a URL final"""
+    require_s3()
+    sha256 = data.sha256.lower()
+    key = content_key("s3", "pdfs", sha256, ".pdf")
+    # O multipart é concluído na chave temporária; o PUT simples grava direto na chave final
+    source = incoming_key(key) if data.upload_id else key
     try:
-        content = await file.read()
-        filename = get_safe_filename(file.filename)
-        key = f"{folder}/{filename}"
-        
-        content_type = "application/pdf" if filename.endswith(".pdf") else "image/jpeg"
-        if filename.endswith(".png"):
-            content_type = "image/png"
-        elif filename.endswith(".webp"):
-            content_type = "image/webp"
-        
-        s3_client.put_object(
-            Bucket=settings.AWS_S3_BUCKET,
-            Key=key,
-            Body=content,
-            ContentType=content_type
+        if data.upload_id:
+            await run_storage_io("s3", complete_multipart, s3_client, settings.AWS_S3_BUCKET, source, data.upload_id)
+        info = await run_storage_io("s3", inspect_object, s3_client, settings.AWS_S3_BUCKET, source)
+        valid = (
+            info["size"] == data.size
+            and info["content_type"] == "application/pdf"
+            and info["start"].startswith(b"%PDF-")
         )
-        
-        url = f"https://{settings.AWS_S3_BUCKET}.s3.{settings.AWS_S3_REGION}.amazonaws.com/{key}"
-        return url
-    except ClientError as e:
+        if valid and (data.upload_id or info["checksum"] != base64.b64encode(bytes.fromhex(sha256)).decode()):
+            # O S3 só confere o SHA-256 do PUT simples (e nem todo compatível o informa): o conteúdo
+            # é relido e conferido aqui, já que a chave endereça o arquivo pelo hash
+            valid = await run_storage_io("s3", object_sha256, s3_client, settings.AWS_S3_BUCKET, source) == sha256
+    except ClientError:
+        raise HTTPException(status_code=400, detail="Upload não encontrado ou incompleto")
+    except BotoCoreError as e:
         raise HTTPException(status_code=500, detail=f"Erro no upload S3: {str(e)}")
-
-
-@router.post("/pdf")
-async def upload_pdf(file: UploadFile = File(...)):
-    """Upload de arquivo PDF"""
-    ext = Path(file.filename).suffix.lower()
-    if ext not in ALLOWED_PDF_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail="Tipo de arquivo não permitido. Apenas PDF é aceito."
-        )
-    
-    validate_file_size(file, settings.MAX_PDF_SIZE_MB)
     
-    # Prioridade: S3 > Cloudinary > Local
-    if settings.use_s3:
-        file_url = await upload_to_s3(file, folder="pdfs")
-        return {"file_url": file_url}
+    if not valid:
+        # A chave vem do hash informado pelo cliente: um objeto já registrado é de outro upload
+        # (possivelmente referenciado por revistas) e não pode ser apagado aqui
+        if source != key or await db.get(StoredFile, ("s3", key)) is None:
+            await get_backend("s3").delete([source])
+        raise HTTPException(status_code=400, detail="O arquivo enviado não confere com o informado (tamanho, tipo ou conteúdo)")
     
-    if settings.use_cloudinary:
-        file_url = await upload_to_cloudinary(file, resource_type="raw", folder="carlota-mag/pdfs")
-        return {"file_url": file_url}
-    
-    # Fallback para upload local
-    upload_path = get_upload_path("pdfs")
-    filename = get_safe_filename(file.filename)
-    file_path = upload_path / filename
+    if source != key:
+        try:
+            await run_storage_io("s3", promote_object, s3_client, settings.AWS_S3_BUCKET, source, key, info["content_type"])
+        except (ClientError, BotoCoreError) as e:
+            raise HTTPException(status_code=500, detail=f"Erro no upload S3: {str(e)}")
+    file_url = get_s3_url(key)
+    await register(db, "s3", key, file_url, sha256, info["size"], info["content_type"])
+    return {"file_url": file_url}
+
+
+@router.post("/pdf/abort", status_code=204)
+async def abort_pdf_upload(data: AbortUploadRequest):
+    """Descarta as partes de um upload multipart interrompido"""
+    require_s3()
+    key = incoming_key(content_key("s3", "pdfs", data.sha256.lower(), ".pdf"))
+    try:
+        await run_storage_io("s3", abort_multipart, s3_client, settings.AWS_S3_BUCKET, key, data.upload_id)
+    except (ClientError, BotoCoreError) as e:
+        raise HTTPException(status_code=500, detail=f"Erro no upload S3: {str(e)}")
+    return None
+
+
+@router.post("/pdf/resumable", status_code=201)
+async def create_resumable_upload(data: ResumableUploadCreate, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Abre um upload retomável de PDF; as partes são enviadas por PATCH no offset atual"""
+    validate_pdf(data.filename, data.size)
+    session = await create_session(db, data.filename, data.size)
+    response.headers["Location"] = f"{router.prefix}/pdf/resumable/{session.id}"
+    response.headers["Upload-Offset"] = "0"
+    return {"id": session.id, "offset": 0, "size": session.size, "expires_at": session.expires_at}
+
+
+async def get_resumable_session(upload_id: str, db: AsyncSession):
+    """Busca a sessão de upload (404 se inexistente ou expirada)"""
+    session = await get_session(db, upload_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload não encontrado ou expirado")
+    return session
+
+
+@router.head("/pdf/resumable/{upload_id}")
+async def get_resumable_offset(upload_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Informa quantos bytes do upload já foram recebidos (cabeçalho Upload-Offset)"""
+    session = await get_resumable_session(upload_id, db)
+    return Response(status_code=200, headers={
+        "Upload-Offset": str(session.received),
+        "Upload-Length": str(session.size),
+        "Cache-Control": "no-store",
+    })
+
+
+@router.patch("/pdf/resumable/{upload_id}")
+async def append_resumable_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., ge=0),
+    content_type: str = Header(""),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Recebe uma parte no offset informado; a última parte conclui o upload e retorna a URL"""
+    if content_type != RESUMABLE_CONTENT_TYPE:
+        raise HTTPException(status_code=415, detail=f"Content-Type deve ser {RESUMABLE_CONTENT_TYPE}")
+    session = await get_resumable_session(upload_id, db)
     
-    content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+    received = await receive_chunk(db, session, upload_offset, request.stream())
+    if received < session.size:
+        return Response(status_code=204, headers={"Upload-Offset": str(received)})
     
-    return {"file_url": f"/uploads/pdfs/{filename}"}
+    # Completo: um PATCH vazio no offset final repete a conclusão se ela tiver falhado
+    file_url = await finish_session(db, session, "pdfs", Path(session.filename).suffix.lower(), get_content_type(".pdf"))
+    return JSONResponse({"file_url": file_url}, headers={"Upload-Offset": str(received)})
+
+
+@router.delete("/pdf/resumable/{upload_id}", status_code=204)
+async def cancel_resumable_upload(upload_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Cancela o upload e descarta as partes recebidas"""
+    session = await get_resumable_session(upload_id, db)
+    await cancel_session(db, session)
+    return None
 
 
 @router.post("/cover")
-async def upload_cover(file: UploadFile = File(...)):
-    """Upload de imagem de capa"""
+async def upload_cover(file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
+    """Upload de imagem de capa, com derivados redimensionados em WebP e JPEG"""
     ext = Path(file.filename).suffix.lower()
     if ext not in ALLOWED_IMAGE_EXTENSIONS:
         raise HTTPException(
@@ -147,24 +229,6 @@ async def upload_cover(file: UploadFile = File(...)):
             detail="Tipo de arquivo não permitido. Apenas JPG, PNG e WebP são aceitos."
         )
     
-    validate_file_size(file, settings.MAX_IMAGE_SIZE_MB)
-    
-    # Prioridade: S3 > Cloudinary > Local
-    if settings.use_s3:
-        file_url = await upload_to_s3(file, folder="covers")
-        return {"file_url": file_url}
-    
-    if settings.use_cloudinary:
-        file_url = await upload_to_cloudinary(file, resource_type="image", folder="carlota-mag/covers")
-        return {"file_url": file_url}
-    
-    # Fallback para upload local
-    upload_path = get_upload_path("covers")
-    filename = get_safe_filename(file.filename)
-    file_path = upload_path / filename
-    
-    content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
-    
-    return {"file_url": f"/uploads/covers/{filename}"}
+    async with spooled_upload(file, settings.MAX_IMAGE_SIZE_MB) as stored:
+        file_url, variants = await store_image(db, stored, "covers", ext, get_content_type(ext))
+    return {"file_url": file_url, "variants": variants}
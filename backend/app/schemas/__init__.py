@@ -1,4 +1,10 @@
-from app.schemas.magazine import MagazineCreate, MagazineUpdate, MagazineResponse
-from app.schemas.article import ArticleCreate, ArticleUpdate, ArticleResponse
+from app.schemas.magazine import MagazineCreate, MagazineUpdate, MagazineResponse, PageHit
+from app.schemas.article import ArticleCreate, ArticleUpdate, ArticleResponse, ArticleSummary
 from app.schemas.service import ServiceCreate, ServiceUpdate, ServiceResponse
 from app.schemas.contact import ContactCreate, ContactUpdate, ContactResponse
+from app.schemas.pagination import Page
+from app.schemas.search import SearchResult
+from app.schemas.image import ImageVariant
+from app.schemas.upload import PresignRequest, CompleteUploadRequest, AbortUploadRequest, ResumableUploadCreate
+from app.schemas.job import JobResponse
+from app.schemas.bulk import BulkResult, BulkRowResult
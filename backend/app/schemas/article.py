@@ -2,9 +2,11 @@
 Schemas Pydantic para Article
 """
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
+from app.schemas.image import ImageVariant
+
 
 class ArticleBase(BaseModel):
     title: str
@@ -38,8 +40,29 @@ class ArticleUpdate(BaseModel):
 
 class ArticleResponse(ArticleBase):
     id: str
+    cover_variants: Optional[List[ImageVariant]] = None
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
+
+
+class ArticleSummary(BaseModel):
+    """Artigo nas listagens: sem o conteúdo, que só vem na busca por id ou slug"""
+    id: str
+    title: str
+    slug: str
+    excerpt: Optional[str] = None
+    cover_image: Optional[str] = None
+    cover_variants: Optional[List[ImageVariant]] = None
+    category: Optional[str] = None
+    author: Optional[str] = None
+    publish_date: Optional[date] = None
+    is_published: bool = False
+    is_featured: bool = False
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,17 @@
+"""
+Schemas Pydantic para importação em lote
+"""
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class BulkRowResult(BaseModel):
+    row: int  # Linha do NDJSON ou posição no array, a partir de 1
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkRowResult]
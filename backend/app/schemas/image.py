@@ -0,0 +1,11 @@
+"""
+Schemas Pydantic para os derivados de imagens
+"""
+from typing import Literal
+from pydantic import BaseModel
+
+
+class ImageVariant(BaseModel):
+    url: str
+    width: int
+    format: Literal["webp", "jpeg"]
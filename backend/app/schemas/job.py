@@ -0,0 +1,23 @@
+"""
+Schemas Pydantic para Job
+"""
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    payload: dict
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -2,9 +2,11 @@
 Schemas Pydantic para Magazine
 """
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
+from app.schemas.image import ImageVariant
+
 
 class MagazineBase(BaseModel):
     title: str
@@ -32,8 +34,16 @@ class MagazineUpdate(BaseModel):
 
 class MagazineResponse(MagazineBase):
     id: str
+    cover_variants: Optional[List[ImageVariant]] = None
+    text_status: Optional[str] = None
+    page_count: Optional[int] = None
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
+
+
+class PageHit(BaseModel):
+    page: int
+    snippet: str
@@ -0,0 +1,12 @@
+"""
+Schemas Pydantic para respostas paginadas
+"""
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
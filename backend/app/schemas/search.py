@@ -0,0 +1,13 @@
+"""
+Schemas Pydantic para a busca
+"""
+from typing import Literal
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    type: Literal["article", "magazine"]
+    id: str
+    title: str
+    snippet: str
+    score: float
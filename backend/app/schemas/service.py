@@ -2,9 +2,11 @@
 Schemas Pydantic para Service
 """
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
+from app.schemas.image import ImageVariant
+
 
 class ServiceBase(BaseModel):
     title: str
@@ -32,6 +34,7 @@ class ServiceUpdate(BaseModel):
 
 class ServiceResponse(ServiceBase):
     id: str
+    image_variants: Optional[List[ImageVariant]] = None
     created_at: datetime
     updated_at: datetime
     
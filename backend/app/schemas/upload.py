@@ -0,0 +1,29 @@
+"""
+Schemas Pydantic para o upload direto ao S3
+"""
+from typing import Optional
+from pydantic import BaseModel, Field
+
+SHA256_PATTERN = "^[0-9a-fA-F]{64}$"
+
+
+class PresignRequest(BaseModel):
+    filename: str
+    size: int = Field(..., gt=0)
+    sha256: str = Field(..., pattern=SHA256_PATTERN)
+
+
+class ResumableUploadCreate(BaseModel):
+    filename: str
+    size: int = Field(..., gt=0)
+
+
+class CompleteUploadRequest(BaseModel):
+    sha256: str = Field(..., pattern=SHA256_PATTERN)
+    size: int = Field(..., gt=0)
+    upload_id: Optional[str] = None  # Presente quando o envio foi multipart
+
+
+class AbortUploadRequest(BaseModel):
+    sha256: str = Field(..., pattern=SHA256_PATTERN)
+    upload_id: str
@@ -0,0 +1,216 @@
+"""
+Importação em lote de revistas e artigos: validação linha a linha e gravação de todas as
+linhas válidas em uma única transação, com inserts em lote (executemany)
+"""
+import json
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Tuple, Type
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Article, Magazine, SearchDocument
+from app.schemas import ArticleCreate, MagazineCreate
+from app.services.cache import bump_generation
+from app.services.content_store import update_references
+from app.services.images import find_variants_many
+from app.services.pdf_text import queue_extraction
+from app.services.slugs import allocate_slugs, generate_slug
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def row_error(row: int, error: Exception) -> dict:
+    """Erro de uma linha no formato devolvido pela API e pelo importador"""
+    if isinstance(error, ValidationError):
+        detail = "; ".join(
+            f"{'.'.join(str(part) for part in e['loc']) or 'linha'}: {e['msg']}" for e in error.errors()
+        )
+    elif isinstance(error, json.JSONDecodeError):
+        detail = f"JSON inválido: {error.msg}"
+    else:
+        detail = str(error)
+    return {"row": row, "error": detail}
+
+
+def parse_rows(rows: Iterable[Tuple[int, object]], schema: Type[BaseModel]) -> Tuple[List[Tuple[int, BaseModel]], List[dict]]:
+    """Valida as linhas já decodificadas, separando as válidas dos erros (linha, erro)"""
+    valid, errors = [], []
+    for row, data in rows:
+        try:
+            if isinstance(data, Exception):
+                raise data
+            valid.append((row, schema.model_validate(data)))
+        except (ValidationError, ValueError) as e:
+            errors.append(row_error(row, e))
+    return valid, errors
+
+
+def decode_line(line: bytes) -> object:
+    """Registro de uma linha NDJSON; JSON inválido vira o erro da linha"""
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        return e
+
+
+def decode_lines(lines: Iterable[bytes]) -> Iterable[Tuple[int, object]]:
+    """Decodifica NDJSON linha a linha (numeradas a partir de 1); linhas em branco são ignoradas"""
+    for row, line in enumerate(lines, 1):
+        if line.strip():
+            yield row, decode_line(line)
+
+
+async def _ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    """Linhas do corpo NDJSON, lidas em partes conforme chegam"""
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+def _too_many_rows() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Lote muito grande. Máximo: {settings.BULK_MAX_ROWS} registros por requisição"
+    )
+
+
+async def read_rows(request: Request) -> List[Tuple[int, object]]:
+    """Lê o corpo em NDJSON (uma linha por registro) ou como array JSON, limitado a BULK_MAX_ROWS.
+
+    O NDJSON é decodificado conforme chega e a leitura para no primeiro registro além do limite;
+    o array JSON só pode ser contado depois de lido por inteiro.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    rows = []
+    if content_type in NDJSON_TYPES:
+        row = 0
+        async for line in _ndjson_lines(request):
+            row += 1
+            if not line.strip():
+                continue
+            if len(rows) == settings.BULK_MAX_ROWS:
+                raise _too_many_rows()
+            rows.append((row, decode_line(line)))
+    else:
+        try:
+            data = json.loads(await request.body())
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Corpo inválido: envie um array JSON ou NDJSON")
+        if not isinstance(data, list):
+            raise HTTPException(status_code=400, detail="Corpo inválido: envie um array JSON ou NDJSON")
+        if len(data) > settings.BULK_MAX_ROWS:
+            raise _too_many_rows()
+        rows = list(enumerate(data, 1))
+    return rows
+
+
+async def insert_magazines(db: AsyncSession, items: List[MagazineCreate]) -> List[str]:
+    """Insere as revistas em lote, com índice de busca, referências e extração dos PDFs
+    (chamar antes do commit); retorna os ids na ordem dos itens"""
+    if not items:
+        return []
+    now = datetime.utcnow()
+    variants = await find_variants_many(db, (item.cover_image for item in items))
+    rows = [
+        {
+            **item.model_dump(),
+            "id": str(uuid.uuid4()),
+            "cover_variants": variants.get(item.cover_image),
+            "text_status": "pending" if item.pdf_url else None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for item in items
+    ]
+    await db.execute(insert(Magazine), rows)
+    await db.execute(insert(SearchDocument), [
+        {
+            "entity_type": "magazine", "entity_id": row["id"], "is_published": bool(row["is_published"]),
+            "title": row["title"], "body": f"{row['edition'] or ''} {row['description'] or ''}",
+        }
+        for row in rows
+    ])
+    await update_references(db, [], [url for row in rows for url in (row["pdf_url"], row["cover_image"])])
+    await queue_extraction(db, *(row["id"] for row in rows if row["pdf_url"]))
+    await bump_generation(db, "magazines")
+    return [row["id"] for row in rows]
+
+
+async def insert_articles(db: AsyncSession, items: List[ArticleCreate]) -> List[str]:
+    """Insere os artigos em lote, com slugs livres, índice de busca e referências (chamar antes
+    do commit); retorna os ids na ordem dos itens"""
+    if not items:
+        return []
+    now = datetime.utcnow()
+    ids = [str(uuid.uuid4()) for _ in items]
+    slugs = await allocate_slugs(db, Article, (item.slug or generate_slug(item.title) for item in items))
+    variants = await find_variants_many(db, (item.cover_image for item in items))
+    rows = [
+        {
+            **item.model_dump(),
+            "id": article_id,
+            "slug": slug,
+            "cover_variants": variants.get(item.cover_image),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for item, article_id, slug in zip(items, ids, slugs)
+    ]
+    await db.execute(insert(Article), rows)
+    await db.execute(insert(SearchDocument), [
+        {
+            "entity_type": "article", "entity_id": row["id"], "is_published": bool(row["is_published"]),
+            "title": row["title"], "body": f"{row['excerpt'] or ''} {row['content'] or ''}",
+        }
+        for row in rows
+    ])
+    await update_references(db, [], [row["cover_image"] for row in rows])
+    await bump_generation(db, "articles")
+    return ids
+
+
+def bulk_result(rows: List[Tuple[int, BaseModel]], ids: List[str], errors: List[dict]) -> dict:
+    """Resultado por linha: id das gravadas e erro das rejeitadas, na ordem do arquivo"""
+    results = [{"row": row, "id": item_id} for (row, _), item_id in zip(rows, ids)] + errors
+    results.sort(key=lambda result: result["row"])
+    return {"created": len(ids), "failed": len(errors), "results": results}
+
+
+async def save_rows(db: AsyncSession, insert_items: Callable[[AsyncSession, list], Awaitable[List[str]]],
+                    rows: List[Tuple[int, BaseModel]], errors: List[dict], atomic: bool) -> dict:
+    """Grava as linhas válidas em uma única transação e retorna o resultado por linha.
+
+    Se o banco recusar o lote (ex.: registro gravado por outra requisição entre a consulta e o
+    insert, ou valor maior que a coluna no Postgres), com atomic nada é gravado (409); sem atomic,
+    as linhas são regravadas uma a uma e as recusadas viram erros da linha.
+    """
+    try:
+        ids = await insert_items(db, [item for _, item in rows])
+        await db.commit()
+        return bulk_result(rows, ids, errors)
+    except (IntegrityError, DataError):
+        await db.rollback()
+        if atomic:
+            raise HTTPException(status_code=409, detail="Lote recusado pelo banco (registro duplicado ou inválido)")
+
+    saved, ids, errors = [], [], list(errors)
+    for row, item in rows:
+        try:
+            ids += await insert_items(db, [item])
+            await db.commit()
+            saved.append((row, item))
+        except DBAPIError as e:
+            await db.rollback()
+            errors.append(row_error(row, e.orig))
+    return bulk_result(saved, ids, errors)
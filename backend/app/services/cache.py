@@ -0,0 +1,142 @@
+"""
+Cache de respostas em memória, invalidado por geração armazenada no banco
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+import anyio
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.cache_generation import CacheGeneration
+from app.services.compression import choose_encoding, compress
+
+
+class ResponseCache:
+    """LRU limitado em bytes, com TTL, de respostas já serializadas"""
+
+    def __init__(self, max_bytes: int, ttl_seconds: int):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, generation: int) -> Optional[bytes]:
+        """Retorna o corpo em cache se ainda for da geração atual e não tiver expirado"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_generation, expires_at, body = entry
+                if entry_generation == generation and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return body
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def set(self, key: tuple, generation: int, body: bytes):
+        """Armazena um corpo, descartando as entradas menos usadas se passar do limite"""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (generation, time.monotonic() + self.ttl_seconds, body)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[2])
+
+
+response_cache = ResponseCache(
+    max_bytes=settings.RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+)
+
+
+async def get_generation(db: AsyncSession, namespace: str) -> int:
+    """Lê a geração atual dos dados de um recurso"""
+    generation = await db.scalar(
+        select(CacheGeneration.generation).where(CacheGeneration.namespace == namespace)
+    )
+    return generation or 0
+
+
+async def bump_generation(db: AsyncSession, namespace: str):
+    """Incrementa a geração de um recurso na transação atual (invalida o cache em todos os workers)"""
+    increment = update(CacheGeneration).where(
+        CacheGeneration.namespace == namespace
+    ).values(generation=CacheGeneration.generation + 1)
+    if (await db.execute(increment)).rowcount:
+        return
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(CacheGeneration).values(namespace=namespace, generation=1))
+    except IntegrityError:
+        # Outro worker criou a linha ao mesmo tempo
+        await db.execute(increment)
+
+
+def serialize(adapter: TypeAdapter, data) -> bytes:
+    """Valida objetos ORM com o schema de resposta e serializa em JSON"""
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+async def cached_response(namespace: str, generation: int, key: tuple, build: Callable[[], Awaitable[bytes]],
+                          headers: Optional[dict] = None, request: Optional[Request] = None) -> Response:
+    """Retorna a resposta JSON em cache para a geração informada ou a constrói com build().
+
+    Com request, a resposta vai comprimida conforme o Accept-Encoding: a versão comprimida fica no
+    cache ao lado da original, então cada geração é comprimida uma única vez por codificação.
+    """
+    cache_key = (namespace, *key)
+    body = response_cache.get(cache_key, generation)
+    if body is None:
+        body = await build()
+        response_cache.set(cache_key, generation, body)
+
+    if request is None:
+        return Response(content=body, media_type="application/json", headers=headers)
+    # Todas as versões, inclusive a sem compressão, dependem do Accept-Encoding
+    headers = {**(headers or {}), "vary": "Accept-Encoding"}
+    encoding = None
+    if len(body) >= settings.COMPRESSION_MIN_BYTES:
+        encoding = choose_encoding(request.headers.get("accept-encoding"))
+    if encoding is None:
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    encoded = response_cache.get((*cache_key, encoding), generation)
+    if encoded is None:
+        encoded = await anyio.to_thread.run_sync(compress, body, encoding, True)
+        response_cache.set((*cache_key, encoding), generation, encoded)
+    headers["content-encoding"] = encoding
+    return Response(content=encoded, media_type="application/json", headers=headers)
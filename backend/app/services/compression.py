@@ -0,0 +1,180 @@
+"""
+Compressão das respostas (Brotli ou gzip, conforme o Accept-Encoding): na hora, pelo middleware,
+ou uma vez por versão dos dados, para as respostas guardadas no cache
+"""
+import zlib
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+# Em ordem de preferência quando o cliente aceita as duas com o mesmo peso
+ENCODINGS = ("br", "gzip")
+
+# Tipos que se beneficiam da compressão, além de text/*, *+json e *+xml; PDFs, imagens e
+# arquivos .gz já são comprimidos e passam direto
+COMPRESSIBLE_TYPES = {
+    "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "image/svg+xml",
+}
+
+
+@lru_cache(maxsize=128)
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Codificação a usar para o cabeçalho Accept-Encoding (None: sem compressão)"""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        weight = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    chosen, chosen_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > chosen_weight:
+            chosen, chosen_weight = encoding, weight
+    return chosen
+
+
+def is_compressible(content_type: str) -> bool:
+    """Se vale comprimir um conteúdo desse tipo"""
+    media_type = content_type.split(";")[0].strip().lower()
+    return (
+        media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith("+json") or media_type.endswith("+xml")
+    )
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    """Comprime um corpo inteiro (cached: com o nível das respostas em cache)"""
+    if encoding == "br":
+        quality = settings.COMPRESSION_CACHED_BROTLI_QUALITY if cached else settings.COMPRESSION_BROTLI_QUALITY
+        return brotli.compress(body, quality=quality)
+    level = settings.COMPRESSION_CACHED_GZIP_LEVEL if cached else settings.COMPRESSION_GZIP_LEVEL
+    return zlib.compress(body, level, wbits=31)
+
+
+def stream_compressor(encoding: str) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    """Funções (comprimir parte, finalizar) para comprimir um corpo transmitido em partes"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def vary_on_encoding(headers: MutableHeaders):
+    """Marca a resposta como dependente do Accept-Encoding (uma vez só), também quando vai sem
+    compressão: um cache compartilhado não pode entregar essa versão a quem aceita gzip/br"""
+    vary = [token.strip().lower() for token in headers.get("vary", "").split(",")]
+    if "accept-encoding" not in vary and "*" not in vary:
+        headers.add_vary_header("Accept-Encoding")
+
+
+def mark_encoded(headers: MutableHeaders, encoding: str):
+    """Ajusta os cabeçalhos de uma resposta que passa a ser enviada comprimida"""
+    headers["content-encoding"] = encoding
+    vary_on_encoding(headers)
+    # Os bytes mudam: intervalos não se aplicam e um ETag forte deixa de identificá-los
+    if "accept-ranges" in headers:
+        del headers["accept-ranges"]
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["etag"] = f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """Comprime respostas de texto a partir de COMPRESSION_MIN_BYTES.
+
+    Respostas já codificadas (ex.: as do cache, comprimidas uma vez por versão), parciais (Range)
+    ou de tipos já comprimidos passam sem alteração; respostas transmitidas em partes são
+    comprimidas em fluxo, sem Content-Length.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            async def send_identity(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    if "content-encoding" not in headers and is_compressible(headers.get("content-type", "")):
+                        vary_on_encoding(headers)
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+        compressor = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough, compressor
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if ("content-encoding" in headers or "content-range" in headers
+                        or not is_compressible(headers.get("content-type", ""))):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Só se decide com a primeira parte do corpo (tamanho e se há mais partes)
+                    start = message
+                return
+            if message["type"] != "http.response.body":
+                # Ex.: envio zero-copy de arquivo, que não passa por aqui
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers = MutableHeaders(scope=start)
+                mark_encoded(headers, encoding)
+                if not more_body:
+                    data = compress(body, encoding)
+                    headers["content-length"] = str(len(data))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": data})
+                    return
+                if "content-length" in headers:
+                    del headers["content-length"]
+                compressor = stream_compressor(encoding)
+                await send(start)
+
+            process, finish = compressor
+            data = process(body) if body else b""
+            if not more_body:
+                data += finish()
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,200 @@
+"""
+Armazenamento endereçado pelo conteúdo: arquivos nomeados pelo SHA-256, enviados uma única
+vez e removidos quando nenhum registro os referencia mais
+"""
+import asyncio
+import logging
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path, PurePosixPath
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import ImageAsset, Job, StoredFile
+from app.services.images import IMAGE_FORMATS, cloudinary_variants, create_derivatives, find_variants, save_variants
+from app.services.jobs import job_handler
+from app.services.metrics import record_upload
+from app.services.storage import StorageBackend, get_backend
+from app.services.upload import StoredUpload, get_temp_upload_path
+
+logger = logging.getLogger(__name__)
+
+CLOUDINARY_ROOT = "carlota-mag"
+PURGE_BATCH = 100
+
+
+def content_key(backend: str, folder: str, sha256: str, ext: str) -> str:
+    """Chave do objeto: o hash do conteúdo (no Cloudinary, o public_id sem extensão)"""
+    if backend == "cloudinary":
+        return f"{CLOUDINARY_ROOT}/{folder}/{sha256}"
+    return f"{folder}/{sha256}{ext}"
+
+
+async def find_existing(db: AsyncSession, backend: StorageBackend, key: str) -> Optional[StoredFile]:
+    """Retorna o arquivo já armazenado com a chave, se o objeto ainda existir"""
+    stored = await db.get(StoredFile, (backend.name, key))
+    if stored is None or not await backend.exists(key):
+        return None
+
+    # Um novo upload do mesmo conteúdo adia a limpeza, como se o arquivo tivesse acabado de chegar
+    stored.last_uploaded_at = datetime.utcnow()
+    await db.commit()
+    return stored
+
+
+async def register(db: AsyncSession, backend: str, key: str, url: str,
+                   sha256: str, size: int, content_type: str) -> None:
+    """Registra o arquivo recém-armazenado, preservando as referências de um registro anterior"""
+    insert = sqlite_insert if db.bind.dialect.name == "sqlite" else pg_insert
+    now = datetime.utcnow()
+    stmt = insert(StoredFile).values(
+        backend=backend, key=key, url=url, sha256=sha256, size=size,
+        content_type=content_type, ref_count=0, created_at=now, last_uploaded_at=now
+    )
+    # Uploads simultâneos do mesmo conteúdo gravam o mesmo objeto: o segundo só renova o registro
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["backend", "key"],
+        set_={"url": url, "last_uploaded_at": now}
+    ))
+    await db.commit()
+
+
+async def _put(backend: StorageBackend, key: str, path: Path, size: int, content_type: str) -> str:
+    """Grava o objeto no backend, convertendo falhas do serviço em erro da API"""
+    started = time.perf_counter()
+    try:
+        url = await backend.put(key, path, size, content_type)
+    except Exception as e:
+        record_upload(backend.name, size, time.perf_counter() - started, failed=True)
+        raise HTTPException(status_code=500, detail=f"Erro no upload: {str(e)}")
+    record_upload(backend.name, size, time.perf_counter() - started)
+    return url
+
+
+async def store_file(db: AsyncSession, upload: StoredUpload, folder: str, ext: str, content_type: str) -> str:
+    """Armazena o upload pelo conteúdo e retorna a URL; conteúdo repetido não é regravado"""
+    backend = get_backend()
+    key = content_key(backend.name, folder, upload.sha256, ext)
+    existing = await find_existing(db, backend, key)
+    if existing:
+        return existing.url
+    url = await _put(backend, key, upload.path, upload.size, content_type)
+    await register(db, backend.name, key, url, upload.sha256, upload.size, content_type)
+    return url
+
+
+async def store_image(db: AsyncSession, upload: StoredUpload, folder: str, ext: str,
+                      content_type: str) -> Tuple[str, List[dict]]:
+    """Armazena uma imagem pelo conteúdo junto com os derivados WebP/JPEG (URL, derivados)"""
+    backend = get_backend()
+    key = content_key(backend.name, folder, upload.sha256, ext)
+    existing = await find_existing(db, backend, key)
+    variants = await find_variants(db, existing.url) if existing else None
+    if existing and variants is not None:
+        return existing.url, variants
+
+    if backend.transforms_images:
+        # O Cloudinary gera os derivados sob demanda a partir de parâmetros na URL
+        url = await _put(backend, key, upload.path, upload.size, content_type)
+        variants = cloudinary_variants(url)
+    else:
+        # Os derivados são gerados antes de gravar o original, o que também valida a imagem
+        with tempfile.TemporaryDirectory(dir=get_temp_upload_path()) as derivatives_dir:
+            derivatives = await create_derivatives(upload.path, Path(derivatives_dir), upload.sha256)
+            url = await _put(backend, key, upload.path, upload.size, content_type)
+            urls = await asyncio.gather(*(
+                _put(
+                    backend,
+                    f"{folder}/{derivative['filename']}",
+                    Path(derivatives_dir) / derivative["filename"],
+                    derivative["size"],
+                    IMAGE_FORMATS[derivative["format"]][1]
+                )
+                for derivative in derivatives
+            ))
+        variants = [
+            {"url": variant_url, "width": derivative["width"], "format": derivative["format"]}
+            for derivative, variant_url in zip(derivatives, urls)
+        ]
+    await register(db, backend.name, key, url, upload.sha256, upload.size, content_type)
+    await save_variants(db, url, variants)
+    return url, variants
+
+
+async def update_references(db: AsyncSession, old_urls: Iterable[Optional[str]],
+                            new_urls: Iterable[Optional[str]]) -> None:
+    """Ajusta a contagem de referências quando um registro troca de arquivos (chamar antes do commit).
+
+    URLs fora do armazenamento endereçado (uploads antigos, links externos) são ignoradas; os
+    arquivos que ficam sem referências são removidos pelo job periódico de limpeza.
+    """
+    old = Counter(url for url in old_urls if url)
+    new = Counter(url for url in new_urls if url)
+    for url, count in (new - old).items():
+        await db.execute(update(StoredFile).where(StoredFile.url == url).values(
+            ref_count=StoredFile.ref_count + count
+        ))
+    for url, count in (old - new).items():
+        await db.execute(update(StoredFile).where(StoredFile.url == url).values(
+            ref_count=StoredFile.ref_count - count
+        ))
+
+
+def _derivative_keys(key: str, variants: Optional[list]) -> list:
+    """Chaves dos derivados de uma imagem, gravados na mesma pasta do original"""
+    folder = PurePosixPath(key).parent
+    return [str(folder / PurePosixPath(variant["url"]).name) for variant in variants or []]
+
+
+async def purge_unreferenced() -> int:
+    """Remove os arquivos sem referências enviados há mais tempo que o período de carência"""
+    cutoff = datetime.utcnow() - timedelta(hours=settings.STORAGE_ORPHAN_GRACE_HOURS)
+    removable = (StoredFile.ref_count <= 0, StoredFile.last_uploaded_at < cutoff)
+    removed = 0
+    async with AsyncSessionLocal() as db:
+        candidates = (await db.execute(
+            select(StoredFile.backend, StoredFile.key, StoredFile.url)
+            .where(*removable)
+            .limit(PURGE_BATCH)
+        )).all()
+        for stored in candidates:
+            # O registro sai antes do objeto; se ganhou uma referência nesse meio tempo, fica
+            result = await db.execute(delete(StoredFile).where(
+                StoredFile.backend == stored.backend,
+                StoredFile.key == stored.key,
+                *removable
+            ))
+            if result.rowcount != 1:
+                await db.rollback()
+                continue
+            backend = get_backend(stored.backend)
+            asset = await db.get(ImageAsset, stored.url)
+            keys = [stored.key]
+            if asset is not None:
+                # No Cloudinary os derivados são transformações da URL, sem objetos próprios
+                if not backend.transforms_images:
+                    keys += _derivative_keys(stored.key, asset.variants)
+                await db.delete(asset)
+            await db.commit()
+            try:
+                await backend.delete(keys)
+            except Exception:
+                logger.warning("Falha ao remover o arquivo %s do backend %s", stored.key, stored.backend, exc_info=True)
+            removed += 1
+    return removed
+
+
+@job_handler("purge_storage", every=settings.MAINTENANCE_INTERVAL_MINUTES * 60)
+async def run_purge_job(job: Job) -> None:
+    """Job periódico de limpeza: remove lotes até não restar arquivo removível"""
+    while await purge_unreferenced():
+        pass
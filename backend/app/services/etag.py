@@ -0,0 +1,28 @@
+"""
+ETags fracos e respostas 304 para os endpoints JSON
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.services.file_response import etag_matches
+
+# O cliente pode guardar a resposta, mas deve revalidá-la com o ETag a cada uso
+API_CACHE_CONTROL = "no-cache"
+
+
+def weak_etag(*parts) -> str:
+    """Gera um ETag fraco a partir da versão dos dados e dos parâmetros da consulta"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def check_etag(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Retorna 304 se o cliente já tem a versão atual; caso contrário anota o ETag na resposta"""
+    headers = {"ETag": etag, "Cache-Control": API_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
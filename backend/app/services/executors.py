@@ -0,0 +1,88 @@
+"""
+Executores dedicados para I/O bloqueante de armazenamento e para trabalho de CPU
+"""
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from app.config import settings
+
+_executors: dict = {}
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_storage_executor(backend: str) -> ThreadPoolExecutor:
+    """Retorna o executor limitado de um backend de armazenamento"""
+    executor = _executors.get(backend)
+    if executor is None:
+        max_workers = {
+            "s3": settings.S3_MAX_CONCURRENCY,
+            "cloudinary": settings.CLOUDINARY_MAX_CONCURRENCY,
+        }.get(backend, settings.STORAGE_MAX_CONCURRENCY)
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"storage-{backend}")
+        _executors[backend] = executor
+    return executor
+
+
+async def run_storage_io(backend: str, func, *args, **kwargs):
+    """Executa uma chamada bloqueante fora do event loop, no executor do backend"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_storage_executor(backend),
+        functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown_storage_executors():
+    """Finaliza os executores de armazenamento"""
+    for executor in _executors.values():
+        executor.shutdown(wait=True)
+    _executors.clear()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Retorna o pool de processos para tarefas pesadas de CPU (extração de PDFs, imagens)"""
+    global _process_pool
+    if _process_pool is None:
+        # spawn: não herda o event loop nem as conexões abertas do worker da API
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.PROCESS_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+def _discard_process_pool(pool: ProcessPoolExecutor):
+    """Descarta um pool quebrado; o próximo get_process_pool cria outro"""
+    global _process_pool
+    if _process_pool is pool:
+        _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_in_process(func, *args):
+    """Executa uma função (de nível de módulo) no pool de processos.
+
+    Se um processo filho morrer (falha no pdfium, OOM killer), o pool inteiro quebra: ele é
+    trocado por um novo e a chamada é repetida uma vez.
+    """
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        pool = get_process_pool()
+        try:
+            return await loop.run_in_executor(pool, func, *args)
+        except BrokenProcessPool:
+            _discard_process_pool(pool)
+            if attempt:
+                raise
+
+
+def shutdown_process_pool():
+    """Finaliza o pool de processos, descartando tarefas ainda não iniciadas"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
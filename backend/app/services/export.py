@@ -0,0 +1,95 @@
+"""
+Exportação em NDJSON ou CSV transmitida em partes: as linhas são lidas com cursor no servidor
+(yield_per) e codificadas à medida que chegam, com memória constante para qualquer volume
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import AsyncIterator, List, Sequence, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select
+
+from app.config import settings
+from app.database import AsyncReadSessionLocal
+
+EXPORT_FORMATS = {
+    # formato: (extensão, content-type)
+    "ndjson": ("ndjson", "application/x-ndjson"),
+    "csv": ("csv", "text/csv"),  # o Starlette acrescenta o charset
+}
+
+
+def export_columns(model, schema: Type[BaseModel]) -> list:
+    """Colunas exportadas: os campos da resposta da API, sem os controles internos"""
+    return [getattr(model, field) for field in schema.model_fields]
+
+
+def _default(value):
+    """Serialização dos tipos que o json não conhece (datas)"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def _ndjson(keys: List[str], rows: Sequence) -> str:
+    """Uma linha JSON por registro"""
+    return "".join(
+        json.dumps(dict(zip(keys, row)), ensure_ascii=False, default=_default) + "\n" for row in rows
+    )
+
+
+def _csv(rows: Sequence) -> str:
+    """Linhas CSV; listas e objetos (ex.: derivados da capa) vão como JSON na célula"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict))
+            else value.isoformat() if isinstance(value, (date, datetime))
+            else value
+            for value in row
+        ])
+    return buffer.getvalue()
+
+
+async def _encoded(stmt: Select, fmt: str) -> AsyncIterator[bytes]:
+    """Partes do arquivo exportado, uma por lote de linhas lido do banco"""
+    keys = [column.key for column in stmt.selected_columns]
+    if fmt == "csv":
+        # BOM: o Excel reconhece o UTF-8 (acentos) ao abrir o arquivo
+        yield ("\ufeff" + _csv([keys])).encode()
+    # Sessão própria: a resposta continua sendo enviada depois que a rota retorna
+    async with AsyncReadSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=settings.EXPORT_BATCH_ROWS))
+        async for rows in result.partitions():
+            yield (_csv(rows) if fmt == "csv" else _ndjson(keys, rows)).encode()
+
+
+async def _gzipped(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Comprime as partes em um único fluxo gzip"""
+    compressor = zlib.compressobj(settings.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_response(stmt: Select, fmt: str, name: str, compress: bool) -> StreamingResponse:
+    """Resposta de download com as linhas da consulta no formato pedido (opcionalmente .gz)"""
+    ext, media_type = EXPORT_FORMATS[fmt]
+    filename = f"{name}-{date.today().isoformat()}.{ext}"
+    chunks = _encoded(stmt, fmt)
+    if compress:
+        chunks = _gzipped(chunks)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"},
+    )
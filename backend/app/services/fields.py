@@ -0,0 +1,41 @@
+"""
+Listagens enxutas: só as colunas do resumo (ou as pedidas em ?fields=) são lidas do banco, e os
+objetos são serializados direto com orjson, sem validar cada um com o schema de resposta
+"""
+from typing import List, Optional, Sequence, Type, Union
+
+import orjson
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy.orm import load_only
+
+
+def select_fields(schema: Type[BaseModel], fields: Optional[str]) -> List[str]:
+    """Campos pedidos em ?fields= (separados por vírgula), na ordem do schema; sem o parâmetro, todos"""
+    available = list(schema.model_fields)
+    if not fields:
+        return available
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(available)
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos inválidos: {', '.join(sorted(unknown)) or fields}. Disponíveis: {', '.join(available)}"
+        )
+    return [name for name in available if name in requested]
+
+
+def load_fields(model, fields: List[str], required: Sequence = ()):
+    """load_only com as colunas dos campos e as usadas na ordenação/cursor (required)"""
+    names = dict.fromkeys([*fields, *(column.key for column in required)])
+    return load_only(*(getattr(model, name) for name in names))
+
+
+def dump_fields(data: Union[list, dict], fields: List[str]) -> bytes:
+    """Serializa uma lista ou página {items, next_cursor} de objetos ORM só com os campos pedidos"""
+    def project(obj) -> dict:
+        return {name: getattr(obj, name) for name in fields}
+
+    if isinstance(data, dict):
+        return orjson.dumps({**data, "items": [project(obj) for obj in data["items"]]})
+    return orjson.dumps([project(obj) for obj in data])
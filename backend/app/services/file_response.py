@@ -0,0 +1,230 @@
+"""
+Respostas de arquivo com suporte a Range, ETag e GET condicional
+"""
+import os
+import re
+import stat
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from mimetypes import guess_type
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import anyio
+from fastapi import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.services.executors import run_storage_io
+
+CHUNK_SIZE = 256 * 1024
+MAX_RANGES = 16
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+# Nomes gerados no upload nunca são sobrescritos, então o conteúdo de uma URL não muda:
+# prefixo aleatório (uploads antigos e capas geradas) ou SHA-256 do conteúdo
+UNIQUE_FILENAME = re.compile(r"^(?:[0-9a-f]{8}_|[0-9a-f]{64}(?:[._]|$))")
+
+RANGE_SPEC = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+
+async def stat_file(path: Path) -> Optional[os.stat_result]:
+    """stat do arquivo fora do event loop; None se ele não existe (ex.: removido do cache)"""
+    try:
+        stat_result = await run_storage_io("local", path.stat)
+    except FileNotFoundError:
+        return None
+    return stat_result if stat.S_ISREG(stat_result.st_mode) else None
+
+
+def make_etag(stat_result: os.stat_result) -> str:
+    """Gera um ETag forte a partir do tamanho e da data de modificação"""
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Compara o cabeçalho If-None-Match com o ETag atual (comparação fraca)"""
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+
+def not_modified_since(header: str, mtime: float) -> bool:
+    """Verifica o cabeçalho If-Modified-Since"""
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(mtime) <= since
+
+
+def parse_range(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """Interpreta o cabeçalho Range; retorna intervalos inclusivos, [] se insatisfazível ou None se inválido"""
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+
+    ranges = []
+    for spec in specs.split(","):
+        match = RANGE_SPEC.match(spec)
+        if not match or match.groups() == ("", ""):
+            return None
+        start, end = match.groups()
+        if start == "":
+            # Sufixo: os últimos N bytes
+            length = int(end)
+            if length == 0:
+                continue
+            ranges.append((max(size - length, 0), size - 1))
+            continue
+        start = int(start)
+        end = int(end) if end else size - 1
+        if end < start and start < size:
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    # Une intervalos sobrepostos ou adjacentes
+    ranges.sort()
+    merged: List[Tuple[int, int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class RangeFileResponse(Response):
+    """Envia um arquivo inteiro ou intervalos dele, usando zero-copy quando o servidor suporta"""
+
+    def __init__(self, path: Path, stat_result: os.stat_result, ranges: Optional[List[Tuple[int, int]]],
+                 headers: dict, media_type: str):
+        self.path = path
+        self.size = stat_result.st_size
+        self.ranges = ranges
+        self.media_type = media_type
+        self.background = None
+        self.boundary = uuid.uuid4().hex
+        self.parts = []
+
+        if ranges is None:
+            self.status_code = 200
+            content_length = self.size
+            content_type = media_type
+        elif len(ranges) == 1:
+            self.status_code = 206
+            start, end = ranges[0]
+            headers["content-range"] = f"bytes {start}-{end}/{self.size}"
+            content_length = end - start + 1
+            content_type = media_type
+        else:
+            self.status_code = 206
+            content_length = 0
+            for start, end in ranges:
+                part_header = (
+                    f"--{self.boundary}\r\n"
+                    f"Content-Type: {media_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{self.size}\r\n\r\n"
+                ).encode("latin-1")
+                self.parts.append((part_header, start, end))
+                content_length += len(part_header) + (end - start + 1) + 2
+            self.closing = f"--{self.boundary}--\r\n".encode("latin-1")
+            content_length += len(self.closing)
+            content_type = f"multipart/byteranges; boundary={self.boundary}"
+
+        headers["content-length"] = str(content_length)
+        headers["content-type"] = content_type
+        self.init_headers(headers)
+
+    async def _send_file_range(self, scope: Scope, send: Send, file, start: int, count: int, more_body: bool):
+        """Envia um trecho do arquivo, via zero-copy se disponível"""
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            await send({
+                "type": "http.response.zerocopysend",
+                "file": file.wrapped,
+                "offset": start,
+                "count": count,
+                "more_body": more_body,
+            })
+            return
+
+        await file.seek(start)
+        remaining = count
+        while remaining > 0:
+            chunk = await file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        if not more_body:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            if self.ranges is None:
+                await self._send_file_range(scope, send, file, 0, self.size, False)
+            elif len(self.ranges) == 1:
+                start, end = self.ranges[0]
+                await self._send_file_range(scope, send, file, start, end - start + 1, False)
+            else:
+                for part_header, start, end in self.parts:
+                    await send({"type": "http.response.body", "body": part_header, "more_body": True})
+                    await self._send_file_range(scope, send, file, start, end - start + 1, True)
+                    await send({"type": "http.response.body", "body": b"\r\n", "more_body": True})
+                await send({"type": "http.response.body", "body": self.closing, "more_body": False})
+
+
+def build_file_response(request: Request, path: Path, stat_result: os.stat_result,
+                        cache_control: Optional[str] = None) -> Response:
+    """Monta a resposta adequada (200, 206, 304 ou 416) para servir um arquivo.
+
+    Sem cache_control, arquivos com nome único são imutáveis; rotas cujo arquivo pode
+    mudar (ex.: o PDF atual de uma revista) devem informar a política.
+    """
+    etag = make_etag(stat_result)
+    if cache_control is None:
+        cache_control = IMMUTABLE_CACHE_CONTROL if UNIQUE_FILENAME.match(path.name) else REVALIDATE_CACHE_CONTROL
+    headers = {
+        "accept-ranges": "bytes",
+        "etag": etag,
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "cache-control": cache_control,
+    }
+
+    # If-None-Match tem precedência sobre If-Modified-Since
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    elif if_modified_since and not_modified_since(if_modified_since, stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    media_type = guess_type(path.name)[0] or "application/octet-stream"
+    ranges = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        ranges = parse_range(range_header, stat_result.st_size)
+        if ranges == []:
+            headers["content-range"] = f"bytes */{stat_result.st_size}"
+            return Response(status_code=416, headers=headers)
+
+    return RangeFileResponse(path, stat_result, ranges, headers, media_type)
@@ -0,0 +1,114 @@
+"""
+Derivados redimensionados das imagens de capa (WebP e JPEG em larguras fixas)
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ImageAsset
+from app.services.executors import run_in_process
+
+IMAGE_WIDTHS = (200, 400, 800, 1600)
+IMAGE_FORMATS = {
+    # formato: (extensão, content-type, parâmetros do Pillow)
+    "webp": (".webp", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": (".jpg", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def variant_filename(stem: str, width: int, fmt: str) -> str:
+    """Nome do arquivo derivado (ex.: 1a2b3c4d_capa_400w.webp)"""
+    return f"{stem}_{width}w{IMAGE_FORMATS[fmt][0]}"
+
+
+def make_derivatives(source: str, destination: str, stem: str) -> List[dict]:
+    """Gera os derivados da imagem (executa no pool de processos)"""
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    # Nunca amplia: imagens menores que a maior largura ganham um derivado no tamanho original
+    widths = sorted({w for w in IMAGE_WIDTHS if w < image.width} | {min(image.width, IMAGE_WIDTHS[-1])}, reverse=True)
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    variants = []
+    current = image
+    for width in widths:
+        # Reduz a partir do derivado anterior (no máximo 2x por passo), mais barato que partir do original
+        height = max(1, round(image.height * width / image.width))
+        if current.width != width:
+            current = current.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        for fmt, (_, _, options) in IMAGE_FORMATS.items():
+            output = current
+            if fmt == "jpeg" and has_alpha:
+                output = Image.new("RGB", current.size, (255, 255, 255))
+                output.paste(current, mask=current.getchannel("A"))
+            filename = variant_filename(stem, width, fmt)
+            path = Path(destination) / filename
+            output.save(path, fmt.upper(), **options)
+            variants.append({"width": width, "format": fmt, "filename": filename, "size": path.stat().st_size})
+    return variants
+
+
+async def create_derivatives(source: Path, destination: Path, stem: str) -> List[dict]:
+    """Gera os derivados fora do event loop, validando a imagem"""
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        return await run_in_process(make_derivatives, str(source.resolve()), str(destination.resolve()), stem)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise HTTPException(status_code=400, detail="Imagem inválida ou corrompida")
+
+
+def cloudinary_variants(secure_url: str) -> List[dict]:
+    """Monta as URLs de transformação do Cloudinary equivalentes aos derivados locais"""
+    prefix, sep, rest = secure_url.partition("/upload/")
+    if not sep:
+        return []
+    return [
+        {"width": width, "format": fmt, "url": f"{prefix}/upload/c_limit,w_{width},f_{'jpg' if fmt == 'jpeg' else fmt},q_auto/{rest}"}
+        for width in IMAGE_WIDTHS
+        for fmt in IMAGE_FORMATS
+    ]
+
+
+async def save_variants(db: AsyncSession, url: str, variants: List[dict]) -> None:
+    """Registra os derivados de uma imagem enviada"""
+    await db.merge(ImageAsset(url=url, variants=[
+        {"url": v["url"], "width": v["width"], "format": v["format"]} for v in variants
+    ]))
+    await db.commit()
+
+
+async def find_variants(db: AsyncSession, url: Optional[str]) -> Optional[List[dict]]:
+    """Retorna os derivados registrados para a URL da imagem, se houver"""
+    if not url:
+        return None
+    asset = await db.get(ImageAsset, url)
+    return asset.variants if asset else None
+
+
+async def find_variants_many(db: AsyncSession, urls: Iterable[Optional[str]]) -> Dict[str, List[dict]]:
+    """Derivados de várias imagens em uma única consulta (importação em lote)"""
+    urls = {url for url in urls if url}
+    if not urls:
+        return {}
+    assets = await db.scalars(select(ImageAsset).where(ImageAsset.url.in_(urls)))
+    return {asset.url: asset.variants for asset in assets}
+
+
+def best_variant(variants: List[dict], width: Optional[int], accept: str) -> Optional[dict]:
+    """Escolhe o menor derivado com a largura pedida, em WebP se o cliente aceitar"""
+    fmt = "webp" if "image/webp" in accept else "jpeg"
+    candidates = sorted((v for v in variants if v["format"] == fmt), key=lambda v: v["width"])
+    if not candidates:
+        return None
+    if width is None:
+        return candidates[-1]
+    return next((v for v in candidates if v["width"] >= width), candidates[-1])
@@ -0,0 +1,253 @@
+"""
+Fila de jobs persistida no banco: trabalho lento fora das requisições, com novas tentativas
+e reserva segura entre vários workers (processos da API ou python -m app.worker)
+"""
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, event, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+CLAIM_BATCH = 10
+
+
+@dataclass
+class JobType:
+    handler: Callable[[Job], Awaitable[None]]
+    max_attempts: int
+    every: Optional[int]  # Segundos entre as execuções de um job periódico
+
+
+_job_types: Dict[str, JobType] = {}
+_tasks: Set[asyncio.Task] = set()
+_wakeup: Optional[asyncio.Event] = None
+
+
+def job_handler(kind: str, max_attempts: Optional[int] = None, every: Optional[int] = None):
+    """Registra a função que executa os jobs do tipo; com every, o job se repete periodicamente"""
+    def register(func):
+        _job_types[kind] = JobType(func, max_attempts or settings.JOB_MAX_ATTEMPTS, every)
+        return func
+    return register
+
+
+async def enqueue(db: AsyncSession, kind: str, payload: Optional[dict] = None,
+                  run_at: Optional[datetime] = None, dedupe_key: Optional[str] = None) -> None:
+    """Coloca um job na fila dentro da transação atual (chamar antes do commit).
+
+    Com dedupe_key, o job é descartado se outro com a mesma chave ainda não começou.
+    """
+    await enqueue_many(db, kind, [(payload or {}, dedupe_key)], run_at)
+
+
+async def enqueue_many(db: AsyncSession, kind: str, jobs: List[Tuple[dict, Optional[str]]],
+                       run_at: Optional[datetime] = None) -> None:
+    """Coloca vários jobs do mesmo tipo na fila em uma única instrução (payload, dedupe_key)"""
+    if not jobs:
+        return
+    job_type = _job_types.get(kind)
+    insert = sqlite_insert if db.bind.dialect.name == "sqlite" else pg_insert
+    now = datetime.utcnow()
+    max_attempts = job_type.max_attempts if job_type else settings.JOB_MAX_ATTEMPTS
+    rows = [
+        {
+            "id": uuid.uuid4().hex, "kind": kind, "payload": payload, "status": "pending", "attempts": 0,
+            "max_attempts": max_attempts, "run_at": run_at or now, "dedupe_key": dedupe_key, "created_at": now,
+        }
+        for payload, dedupe_key in jobs
+    ]
+    await db.execute(insert(Job).on_conflict_do_nothing(index_elements=["dedupe_key"]), rows)
+    # Os workers deste processo são acordados assim que os jobs ficam visíveis
+    if not event.contains(db.sync_session, "after_commit", _wake_workers):
+        event.listen(db.sync_session, "after_commit", _wake_workers)
+
+
+def _wake_workers(session) -> None:
+    """Acorda os workers do processo (os demais encontram o job na próxima consulta)"""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+def _ready(now: datetime):
+    """Jobs prontos: pendentes no horário ou com a reserva de um worker que parou vencida"""
+    return or_(
+        and_(Job.status == "pending", Job.run_at <= now),
+        and_(Job.status == "running", Job.locked_until < now)
+    )
+
+
+def _owned(job: Job):
+    """Condição de posse: o número da tentativa distingue uma reserva de outra mais recente"""
+    return (Job.id == job.id, Job.status == "running", Job.attempts == job.attempts)
+
+
+async def claim_job(db: AsyncSession) -> Optional[Job]:
+    """Reserva o próximo job pronto; a atualização condicional impede dois workers no mesmo job"""
+    now = datetime.utcnow()
+    candidates = (await db.scalars(
+        select(Job.id).where(_ready(now)).order_by(Job.run_at).limit(CLAIM_BATCH)
+    )).all()
+    for job_id in candidates:
+        result = await db.execute(update(Job).where(Job.id == job_id, _ready(now)).values(
+            status="running",
+            attempts=Job.attempts + 1,
+            locked_by=WORKER_ID,
+            locked_until=now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+            started_at=now,
+            # A partir daqui um novo job com a mesma chave é aceito (ex.: o PDF mudou de novo)
+            dedupe_key=None
+        ))
+        if result.rowcount == 1:
+            await db.commit()
+            return await db.get(Job, job_id, populate_existing=True)
+        await db.rollback()
+    return None
+
+
+def _backoff(attempts: int) -> timedelta:
+    """Espera exponencial até a próxima tentativa, com variação para espalhar as retomadas"""
+    delay = min(settings.JOB_RETRY_MAX_SECONDS, settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+async def _heartbeat(job: Job) -> None:
+    """Renova a reserva enquanto o job executa"""
+    while True:
+        await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(Job).where(*_owned(job)).values(
+                    locked_until=datetime.utcnow() + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+                ))
+                await db.commit()
+        except Exception:
+            logger.warning("Falha ao renovar a reserva do job %s", job.id, exc_info=True)
+
+
+async def _finish(job: Job, error: Optional[str]) -> None:
+    """Registra o resultado: concluído, nova tentativa com espera ou falha definitiva"""
+    job_type = _job_types.get(job.kind)
+    now = datetime.utcnow()
+    if error and job_type and job.attempts < job.max_attempts:
+        values = {"status": "pending", "run_at": now + _backoff(job.attempts)}
+    else:
+        values = {"status": "failed" if error else "done", "finished_at": now}
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(update(Job).where(*_owned(job)).values(
+            locked_by=None, locked_until=None, last_error=error, **values
+        ))
+        if result.rowcount == 1 and job_type and job_type.every and values["status"] != "pending":
+            await enqueue(
+                db, job.kind, job.payload,
+                run_at=now + timedelta(seconds=job_type.every), dedupe_key=job.kind
+            )
+        await db.commit()
+
+
+async def _release(job: Job) -> None:
+    """Devolve à fila um job interrompido pelo desligamento, sem contar a tentativa"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Job).where(*_owned(job)).values(
+            status="pending",
+            attempts=Job.attempts - 1,
+            run_at=datetime.utcnow(),
+            locked_by=None,
+            locked_until=None
+        ))
+        await db.commit()
+
+
+async def run_job(job: Job) -> None:
+    """Executa um job reservado; exceções do handler levam a uma nova tentativa"""
+    heartbeat = asyncio.create_task(_heartbeat(job))
+    error = None
+    try:
+        job_type = _job_types.get(job.kind)
+        if job_type is None:
+            raise LookupError(f"Tipo de job desconhecido: {job.kind}")
+        if job.attempts > job.max_attempts:
+            # Reservas vencidas repetidas: o job derruba o worker, não deve ser retomado
+            raise RuntimeError("Limite de tentativas excedido")
+        await job_type.handler(job)
+    except asyncio.CancelledError:
+        await asyncio.shield(_release(job))
+        raise
+    except Exception as e:
+        logger.warning("Falha no job %s (%s), tentativa %s", job.id, job.kind, job.attempts, exc_info=True)
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        heartbeat.cancel()
+    await _finish(job, error)
+
+
+async def ensure_periodic_jobs() -> None:
+    """Garante um job agendado para cada tipo periódico (a chave impede duplicatas entre workers)"""
+    try:
+        async with AsyncSessionLocal() as db:
+            for kind, job_type in _job_types.items():
+                if job_type.every:
+                    await enqueue(db, kind, dedupe_key=kind)
+            await db.commit()
+    except Exception:
+        logger.exception("Falha ao agendar os jobs periódicos")
+
+
+async def _work() -> None:
+    """Laço de um worker: executa os jobs prontos e espera quando a fila esvazia"""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                job = await claim_job(db)
+            if job is not None:
+                await run_job(job)
+                continue
+        except Exception:
+            logger.exception("Falha no worker de jobs")
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.JOB_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+
+
+def start_workers(concurrency: int) -> None:
+    """Inicia os workers de jobs no event loop atual"""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    coroutines = [ensure_periodic_jobs()] + [_work() for _ in range(concurrency)]
+    for coroutine in coroutines:
+        task = asyncio.create_task(coroutine)
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+
+async def stop_workers() -> None:
+    """Cancela os workers; os jobs em andamento voltam para a fila"""
+    for task in list(_tasks):
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+
+
+@job_handler("prune_jobs", every=settings.MAINTENANCE_INTERVAL_MINUTES * 60)
+async def prune_jobs(job: Job) -> None:
+    """Remove os jobs encerrados há mais tempo que o período de retenção"""
+    cutoff = datetime.utcnow() - timedelta(days=settings.JOB_RETENTION_DAYS)
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Job).where(Job.status.in_(("done", "failed")), Job.finished_at < cutoff))
+        await db.commit()
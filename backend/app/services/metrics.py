@@ -0,0 +1,161 @@
+"""
+Métricas do Prometheus: latência e requisições em andamento por rota, consultas SQL (por
+requisição e por tipo) e uploads por backend de armazenamento.
+
+Com vários workers (gunicorn), cada processo grava seus valores em PROMETHEUS_MULTIPROC_DIR
+(definido no gunicorn.conf.py) e /metrics agrega os arquivos de todos eles.
+"""
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Rota de requisições que não correspondem a nenhuma rota (evita um rótulo por URL)
+UNMATCHED_ROUTE = "unmatched"
+
+SQL_OPERATIONS = {"select", "insert", "update", "delete", "with", "pragma"}
+
+REQUESTS = Counter(
+    "http_requests_total", "Requisições atendidas", ["method", "route", "status"]
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Duração das requisições até o fim da resposta", ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requisições em andamento", ["method", "route"], multiprocess_mode="livesum"
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "Consultas SQL por requisição", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+REQUEST_QUERY_DURATION = Histogram(
+    "http_request_db_duration_seconds", "Tempo total em consultas SQL por requisição", ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Duração de cada consulta SQL", ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 5),
+)
+UPLOAD_BYTES = Counter(
+    "storage_upload_bytes_total", "Bytes gravados no armazenamento", ["backend"]
+)
+UPLOAD_DURATION = Histogram(
+    "storage_upload_duration_seconds", "Duração das gravações no armazenamento", ["backend"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+UPLOAD_THROUGHPUT = Histogram(
+    "storage_upload_throughput_bytes_per_second", "Taxa de cada gravação no armazenamento", ["backend"],
+    buckets=(1e5, 5e5, 1e6, 5e6, 1e7, 2.5e7, 5e7, 1e8, 2.5e8, 1e9),
+)
+UPLOAD_FAILURES = Counter(
+    "storage_upload_failures_total", "Gravações no armazenamento que falharam", ["backend"]
+)
+
+# [consultas, segundos] da requisição em andamento (None fora de requisições, ex.: jobs)
+_request_queries: ContextVar[Optional[list]] = ContextVar("request_queries", default=None)
+
+
+def _operation(statement: str) -> str:
+    """Tipo da consulta pela primeira palavra (select, insert...), para o rótulo"""
+    words = statement.lstrip()[:10].split(None, 1)
+    operation = words[0].lower() if words else ""
+    return operation if operation in SQL_OPERATIONS else "other"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    QUERY_DURATION.labels(_operation(statement)).observe(elapsed)
+    totals = _request_queries.get()
+    if totals is not None:
+        totals[0] += 1
+        totals[1] += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Mede as consultas do engine (síncrono, ou o sync_engine de um engine assíncrono)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def record_upload(backend: str, size: int, seconds: float, failed: bool = False) -> None:
+    """Registra uma gravação no armazenamento (bytes, duração e taxa por backend)"""
+    if failed:
+        UPLOAD_FAILURES.labels(backend).inc()
+        return
+    UPLOAD_BYTES.labels(backend).inc(size)
+    UPLOAD_DURATION.labels(backend).observe(seconds)
+    if seconds > 0:
+        UPLOAD_THROUGHPUT.labels(backend).observe(size / seconds)
+
+
+def _route_path(scope: Scope) -> str:
+    """Caminho da rota (modelo, ex.: /api/articles/{article_id}) que atenderá a requisição"""
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Mede cada requisição HTTP pela rota, incluindo o envio do corpo (respostas em partes)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_path(scope)
+        status = 500
+        totals = [0, 0.0]
+        token = _request_queries.set(totals)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            REQUESTS.labels(method, route, str(status)).inc()
+            REQUEST_QUERIES.labels(route).observe(totals[0])
+            REQUEST_QUERY_DURATION.labels(route).observe(totals[1])
+            in_progress.dec()
+            _request_queries.reset(token)
+
+
+def metrics_response() -> Response:
+    """Métricas no formato texto do Prometheus (somadas entre os workers, em modo multiprocesso)"""
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    # O tipo já traz o charset: passado como cabeçalho para o Starlette não acrescentar outro
+    return Response(content=generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
@@ -0,0 +1,90 @@
+"""
+Paginação por cursor (keyset) para as listagens
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Date, DateTime, Select, desc, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values: list) -> str:
+    """Serializa os valores da última linha em um cursor opaco"""
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    """Lê um cursor opaco, convertendo os valores para os tipos das colunas"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        converted = []
+        for column, value in zip(columns, values):
+            if value is not None and isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif value is not None and isinstance(column.type, Date):
+                value = date.fromisoformat(value)
+            converted.append(value)
+        return converted
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _after(columns: list, values: list):
+    """Condição de linhas posteriores ao cursor em ordem decrescente (comparação de tuplas, usa o índice)"""
+    return tuple_(*columns) < tuple_(*[literal(v, c.type) for c, v in zip(columns, values)])
+
+
+def keyset_ordering(columns: list) -> list:
+    """Ordenação decrescente pelas colunas do cursor, com nulos por último"""
+    return [desc(columns[0]).nulls_last(), *[desc(c) for c in columns[1:]]]
+
+
+async def keyset_page(db: AsyncSession, stmt: Select, columns: list, limit: int,
+                      cursor: Optional[str]) -> Tuple[List, Optional[str]]:
+    """Retorna uma página ordenada de forma decrescente pelas colunas e o cursor da próxima.
+
+    A primeira coluna pode ser nula: as linhas com valor nulo vêm por último e são
+    percorridas em um segundo trecho, para que cada consulta continue usando o índice.
+    """
+    lead, rest = columns[0], columns[1:]
+    ordering = keyset_ordering(columns)
+    null_ordering = [desc(c) for c in rest]
+    values = decode_cursor(cursor, columns) if cursor else None
+
+    async def fetch(page_stmt: Select) -> list:
+        return list((await db.scalars(page_stmt)).all())
+
+    if values is None:
+        rows = await fetch(stmt.order_by(*ordering).limit(limit + 1))
+    elif values[0] is not None:
+        rows = await fetch(stmt.where(_after(columns, values)).order_by(*ordering).limit(limit + 1))
+        if len(rows) <= limit and lead.nullable:
+            rows += await fetch(stmt.where(lead.is_(None)).order_by(*null_ordering).limit(limit + 1 - len(rows)))
+    else:
+        rows = await fetch(stmt.where(
+            lead.is_(None),
+            _after(rest, values[1:])
+        ).order_by(*null_ordering).limit(limit + 1))
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], c.key) for c in columns])
+    return rows, next_cursor
+
+
+async def page_or_list(db: AsyncSession, stmt: Select, columns: list, limit: Optional[int], cursor: Optional[str]):
+    """Retorna uma página {items, next_cursor} ou, sem limit, a lista completa (compatibilidade)"""
+    if limit is None:
+        return list((await db.scalars(stmt.order_by(*keyset_ordering(columns)))).all())
+    items, next_cursor = await keyset_page(db, stmt, columns, limit, cursor)
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,102 @@
+"""
+Renderização das páginas dos PDFs: miniaturas em cache no disco e capa gerada
+"""
+import asyncio
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.services.content_store import store_image
+from app.services.executors import run_in_process, run_storage_io
+from app.services.upload import describe_file, get_temp_upload_path
+
+
+def get_thumbs_path(magazine_id: str) -> Path:
+    """Pasta das miniaturas de uma revista"""
+    return Path(settings.UPLOAD_DIR) / "thumbs" / magazine_id
+
+
+def thumb_path(magazine_id: str, page_number: int) -> Path:
+    """Arquivo da miniatura de uma página"""
+    return get_thumbs_path(magazine_id) / f"{page_number}.webp"
+
+
+def render_pages(source: str, destination: str, start: int, end: int, width: int, quality: int) -> int:
+    """Renderiza as páginas start..end em WebP, pulando as já existentes (executa no pool de processos)"""
+    import pypdfium2 as pdfium
+
+    rendered = 0
+    pdf = pdfium.PdfDocument(source)
+    try:
+        for number in range(start, min(end, len(pdf)) + 1):
+            output = Path(destination) / f"{number}.webp"
+            if output.exists():
+                continue
+            page = pdf[number - 1]
+            try:
+                image = page.render(scale=width / page.get_width()).to_pil()
+            finally:
+                page.close()
+            # Grava em um arquivo parcial para que o cache nunca sirva miniaturas incompletas
+            partial = output.with_name(f"{output.name}.{uuid.uuid4().hex[:8]}.part")
+            image.save(partial, "WEBP", quality=quality)
+            os.replace(partial, output)
+            rendered += 1
+    finally:
+        pdf.close()
+    return rendered
+
+
+def render_cover(source: str, destination: str) -> None:
+    """Renderiza a primeira página como imagem de capa em JPEG (executa no pool de processos)"""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(source)
+    try:
+        page = pdf[0]
+        try:
+            image = page.render(scale=settings.PDF_COVER_WIDTH / page.get_width()).to_pil()
+        finally:
+            page.close()
+    finally:
+        pdf.close()
+    image.convert("RGB").save(destination, "JPEG", quality=88, optimize=True, progressive=True)
+
+
+async def render_thumbnails(path: Path, magazine_id: str, page_count: int,
+                            pages: Optional[range] = None) -> int:
+    """Renderiza as miniaturas em paralelo, em lotes distribuídos pelo pool de processos"""
+    destination = get_thumbs_path(magazine_id)
+    destination.mkdir(parents=True, exist_ok=True)
+    pages = pages or range(1, page_count + 1)
+    batch = settings.PDF_THUMB_BATCH_PAGES
+    results = await asyncio.gather(*(
+        run_in_process(
+            render_pages, str(path.resolve()), str(destination),
+            start, min(start + batch - 1, pages.stop - 1),
+            settings.PDF_THUMB_WIDTH, settings.PDF_THUMB_QUALITY
+        )
+        for start in range(pages.start, pages.stop, batch)
+    ))
+    return sum(results)
+
+
+async def generate_cover(db: AsyncSession, path: Path) -> Tuple[str, List[dict]]:
+    """Gera a capa a partir da primeira página e a armazena como uma capa enviada (URL, derivados)"""
+    temp_path = get_temp_upload_path() / f"{uuid.uuid4().hex}.jpg"
+    try:
+        await run_in_process(render_cover, str(path.resolve()), str(temp_path.resolve()))
+        upload = await run_storage_io("local", describe_file, temp_path)
+        return await store_image(db, upload, "covers", ".jpg", "image/jpeg")
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+async def remove_thumbnails(magazine_id: str) -> None:
+    """Apaga o cache de miniaturas de uma revista"""
+    await run_storage_io("local", shutil.rmtree, get_thumbs_path(magazine_id), ignore_errors=True)
@@ -0,0 +1,223 @@
+"""
+Processamento dos PDFs das revistas fora do caminho das requisições: texto página a
+página, miniaturas e capa padrão
+"""
+import asyncio
+import logging
+import os
+import shutil
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Job, Magazine, MagazinePage
+from app.services.cache import bump_generation
+from app.services.content_store import update_references
+from app.services.executors import run_in_process, run_storage_io
+from app.services.jobs import enqueue_many, job_handler
+from app.services.pdf_render import generate_cover, remove_thumbnails, render_thumbnails
+from app.services.storage import download_file, locate
+from app.services.upload import get_temp_upload_path
+
+logger = logging.getLogger(__name__)
+
+
+def count_pages(path: str) -> int:
+    """Conta as páginas do PDF (executa no pool de processos)"""
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def extract_pages(path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """Extrai o texto das páginas start..end do PDF (executa no pool de processos)"""
+    from pypdf import PdfReader
+    reader = PdfReader(path)
+    pages = []
+    for number in range(start, end + 1):
+        try:
+            text = reader.pages[number - 1].extract_text() or ""
+        except Exception:
+            # Uma página ilegível não deve impedir a indexação do resto da edição
+            logger.warning("Falha ao extrair a página %s de %s", number, path, exc_info=True)
+            text = ""
+        pages.append((number, " ".join(text.split())))
+    return pages
+
+
+@asynccontextmanager
+async def local_pdf(pdf_url: str):
+    """Disponibiliza o PDF em disco: na pasta de uploads, no cache dos backends remotos ou
+    baixado para um temporário"""
+    location = locate(pdf_url)
+    if location and location[0].name == "local":
+        path = await location[0].local_path(location[1])
+        if path is None:
+            raise FileNotFoundError(pdf_url)
+        yield path
+        return
+
+    temp_path = get_temp_upload_path() / f"{uuid.uuid4().hex}.pdf"
+    try:
+        cached = await location[0].local_path(location[1]) if location else None
+        if cached is not None:
+            # Vínculo próprio: a cópia do cache pode ser removida (LRU) durante o processamento
+            try:
+                os.link(cached, temp_path)
+            except OSError:
+                await run_storage_io("local", shutil.copyfile, cached, temp_path)
+        elif location:
+            await location[0].get(location[1], temp_path)
+        else:
+            await run_storage_io("download", download_file, pdf_url, temp_path)
+        yield temp_path
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+async def reset_pages(db: AsyncSession, magazine: Magazine) -> None:
+    """Descarta o texto extraído e, se houver PDF, coloca a revista na fila de extração"""
+    await db.execute(delete(MagazinePage).where(MagazinePage.magazine_id == magazine.id))
+    await remove_thumbnails(magazine.id)
+    magazine.text_status = "pending" if magazine.pdf_url else None
+    magazine.page_count = None
+    magazine.text_locked_until = None
+
+
+async def _claim(db: AsyncSession, magazine_id: str, pdf_url: Optional[str] = None) -> bool:
+    """Reserva a revista para este worker por um período; falha se outro worker a detém.
+
+    Com pdf_url renova a reserva, desde que o PDF não tenha sido trocado nesse meio tempo.
+    """
+    now = datetime.utcnow()
+    stmt = update(Magazine).where(
+        Magazine.id == magazine_id,
+        Magazine.text_status.in_(("pending", "processing"))
+    )
+    if pdf_url is None:
+        stmt = stmt.where(or_(Magazine.text_locked_until.is_(None), Magazine.text_locked_until < now))
+    else:
+        stmt = stmt.where(Magazine.pdf_url == pdf_url)
+    # O progresso da extração não altera a versão (updated_at) da revista
+    result = await db.execute(stmt.values(
+        text_status="processing",
+        text_locked_until=now + timedelta(seconds=settings.PDF_TEXT_LEASE_SECONDS),
+        updated_at=Magazine.updated_at
+    ))
+    if result.rowcount != 1:
+        await db.rollback()
+        return False
+    await db.commit()
+    return True
+
+
+async def _finish(db: AsyncSession, magazine_id: str, pdf_url: str, status: str,
+                  page_count: Optional[int] = None) -> None:
+    """Registra o fim da extração e invalida os caches das revistas"""
+    values = {"text_status": status, "text_locked_until": None}
+    if page_count is not None:
+        values["page_count"] = page_count
+    await db.execute(update(Magazine).where(
+        Magazine.id == magazine_id,
+        Magazine.pdf_url == pdf_url
+    ).values(**values))
+    await bump_generation(db, "magazines")
+    await db.commit()
+
+
+async def extract_magazine_text(magazine_id: str, retry: bool = False) -> None:
+    """Extrai e indexa o texto do PDF da revista, retomando das páginas já gravadas, e renderiza
+    as miniaturas e a capa padrão.
+
+    Falhas são propagadas; com retry a revista volta a pendente para uma nova tentativa.
+    """
+    async with AsyncSessionLocal() as db:
+        if not await _claim(db, magazine_id):
+            status = await db.scalar(select(Magazine.text_status).where(Magazine.id == magazine_id))
+            if status in ("pending", "processing"):
+                # Outro worker ainda processa um PDF anterior da revista: tenta de novo mais tarde
+                raise RuntimeError(f"Revista {magazine_id} em processamento por outro worker")
+            return
+        pdf_url = await db.scalar(select(Magazine.pdf_url).where(Magazine.id == magazine_id))
+        try:
+            async with local_pdf(pdf_url) as path:
+                page_count = await run_in_process(count_pages, str(path.resolve()))
+                done = await db.scalar(
+                    select(func.max(MagazinePage.page_number)).where(MagazinePage.magazine_id == magazine_id)
+                ) or 0
+
+                batch = settings.PDF_TEXT_BATCH_PAGES
+                for start in range(done + 1, page_count + 1, batch):
+                    end = min(start + batch - 1, page_count)
+                    pages = await run_in_process(extract_pages, str(path.resolve()), start, end)
+                    db.add_all(
+                        MagazinePage(magazine_id=magazine_id, page_number=number, text=text)
+                        for number, text in pages
+                    )
+                    # Cada lote é gravado junto com a renovação da reserva
+                    if not await _claim(db, magazine_id, pdf_url):
+                        logger.info("Extração da revista %s interrompida: PDF alterado ou removido", magazine_id)
+                        return
+
+                # Miniaturas já renderizadas continuam no cache do disco e são puladas
+                await render_thumbnails(path, magazine_id, page_count)
+                if not await _claim(db, magazine_id, pdf_url):
+                    return
+                try:
+                    await _default_cover(db, magazine_id, path)
+                except Exception:
+                    # Sem capa gerada a edição continua utilizável: não invalida a extração
+                    logger.warning("Falha ao gerar a capa da revista %s", magazine_id, exc_info=True)
+                    await db.rollback()
+            await _finish(db, magazine_id, pdf_url, "done", page_count)
+        except asyncio.CancelledError:
+            # Desligamento: libera a reserva para que outro worker retome de onde parou
+            await asyncio.shield(_release(magazine_id))
+            raise
+        except Exception:
+            await db.rollback()
+            await _finish(db, magazine_id, pdf_url, "pending" if retry else "failed")
+            raise
+
+
+async def _default_cover(db: AsyncSession, magazine_id: str, path: Path) -> None:
+    """Usa a primeira página como capa quando nenhuma foi enviada"""
+    if await db.scalar(select(Magazine.cover_image).where(Magazine.id == magazine_id)):
+        return
+    file_url, variants = await generate_cover(db, path)
+    result = await db.execute(update(Magazine).where(
+        Magazine.id == magazine_id,
+        or_(Magazine.cover_image.is_(None), Magazine.cover_image == "")
+    ).values(cover_image=file_url, cover_variants=variants))
+    if result.rowcount == 1:
+        await update_references(db, [], [file_url])
+    await db.commit()
+
+
+async def _release(magazine_id: str) -> None:
+    """Libera a reserva de uma extração interrompida"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Magazine).where(Magazine.id == magazine_id).values(
+            text_locked_until=None,
+            updated_at=Magazine.updated_at
+        ))
+        await db.commit()
+
+
+async def queue_extraction(db: AsyncSession, *magazine_ids: str) -> None:
+    """Coloca a extração do PDF das revistas na fila de jobs (chamar antes do commit)"""
+    await enqueue_many(db, "pdf_text", [
+        ({"magazine_id": magazine_id}, f"pdf_text:{magazine_id}") for magazine_id in magazine_ids
+    ])
+
+
+@job_handler("pdf_text")
+async def run_extraction_job(job: Job) -> None:
+    """Job de extração; na última tentativa a falha fica registrada na revista"""
+    await extract_magazine_text(job.payload["magazine_id"], retry=job.attempts < job.max_attempts)
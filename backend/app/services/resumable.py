@@ -0,0 +1,154 @@
+"""
+Uploads retomáveis: o PDF chega em partes gravadas em um temporário, no offset informado
+pelo cliente, e vai para o armazenamento configurado quando completo
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import aiofiles
+from fastapi import HTTPException
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Job, UploadSession
+from app.services.content_store import store_file
+from app.services.executors import run_storage_io
+from app.services.jobs import job_handler
+from app.services.upload import describe_file, get_temp_upload_path
+
+
+def part_path(session_id: str) -> Path:
+    """Arquivo temporário que acumula as partes de uma sessão"""
+    path = get_temp_upload_path() / "resumable"
+    path.mkdir(parents=True, exist_ok=True)
+    return path / f"{session_id}.part"
+
+
+def _expiration() -> datetime:
+    """Prazo da sessão, renovado a cada parte recebida"""
+    return datetime.utcnow() + timedelta(hours=settings.RESUMABLE_UPLOAD_EXPIRES_HOURS)
+
+
+async def expire_sessions(db: AsyncSession) -> int:
+    """Remove as sessões abandonadas (sem envio dentro do prazo) e seus temporários"""
+    now = datetime.utcnow()
+    expired = (await db.scalars(select(UploadSession.id).where(
+        UploadSession.expires_at < now,
+        or_(UploadSession.locked_until.is_(None), UploadSession.locked_until < now)
+    ))).all()
+    if not expired:
+        return 0
+    await db.execute(delete(UploadSession).where(UploadSession.id.in_(expired)))
+    await db.commit()
+    for session_id in expired:
+        part_path(session_id).unlink(missing_ok=True)
+    return len(expired)
+
+
+@job_handler("expire_upload_sessions", every=settings.MAINTENANCE_INTERVAL_MINUTES * 60)
+async def run_expire_job(job: Job) -> None:
+    """Job periódico que descarta as sessões abandonadas"""
+    async with AsyncSessionLocal() as db:
+        await expire_sessions(db)
+
+
+async def create_session(db: AsyncSession, filename: str, size: int) -> UploadSession:
+    """Abre uma sessão de upload com o tamanho total declarado"""
+    session = UploadSession(filename=filename, size=size, received=0, expires_at=_expiration())
+    db.add(session)
+    await db.commit()
+    part_path(session.id).touch()
+    return session
+
+
+async def get_session(db: AsyncSession, session_id: str) -> Optional[UploadSession]:
+    """Retorna a sessão, se existir e não tiver expirado"""
+    session = await db.get(UploadSession, session_id)
+    if session is None or session.expires_at < datetime.utcnow():
+        return None
+    return session
+
+
+async def _claim(db: AsyncSession, session: UploadSession, offset: int) -> None:
+    """Reserva a sessão para um envio no offset informado (409 se não for o offset atual)"""
+    now = datetime.utcnow()
+    result = await db.execute(update(UploadSession).where(
+        UploadSession.id == session.id,
+        UploadSession.received == offset,
+        UploadSession.expires_at > now,
+        or_(UploadSession.locked_until.is_(None), UploadSession.locked_until < now)
+    ).values(locked_until=now + timedelta(seconds=settings.RESUMABLE_UPLOAD_LOCK_SECONDS)))
+    await db.commit()
+    if result.rowcount == 1:
+        return
+
+    await db.refresh(session)
+    if session.received != offset:
+        raise HTTPException(
+            status_code=409,
+            detail="Offset não confere com o já recebido",
+            headers={"Upload-Offset": str(session.received)}
+        )
+    raise HTTPException(status_code=423, detail="Outra parte deste upload está sendo enviada")
+
+
+async def _release(db: AsyncSession, session: UploadSession, received: int) -> None:
+    """Registra o novo offset, libera a reserva e renova o prazo da sessão"""
+    await db.execute(update(UploadSession).where(UploadSession.id == session.id).values(
+        received=received,
+        locked_until=None,
+        expires_at=_expiration()
+    ))
+    await db.commit()
+    await db.refresh(session)
+
+
+async def receive_chunk(db: AsyncSession, session: UploadSession, offset: int,
+                        chunks: AsyncIterator[bytes]) -> int:
+    """Grava o corpo da requisição no offset e retorna o novo offset.
+
+    Se a conexão cair no meio, os bytes já gravados continuam valendo para a retomada.
+    """
+    await _claim(db, session, offset)
+    written = 0
+    try:
+        async with aiofiles.open(part_path(session.id), "r+b") as out:
+            await out.seek(offset)
+            try:
+                async for chunk in chunks:
+                    if offset + written + len(chunk) > session.size:
+                        raise HTTPException(status_code=413, detail="A parte excede o tamanho declarado do upload")
+                    await out.write(chunk)
+                    written += len(chunk)
+            finally:
+                # Descarta sobras de uma tentativa anterior além do que foi recebido agora
+                await out.truncate(offset + written)
+    finally:
+        await _release(db, session, offset + written)
+    return offset + written
+
+
+async def finish_session(db: AsyncSession, session: UploadSession, folder: str, ext: str,
+                         content_type: str) -> str:
+    """Move o arquivo completo para o armazenamento e encerra a sessão, retornando a URL"""
+    await _claim(db, session, session.size)
+    try:
+        upload = await run_storage_io("local", describe_file, part_path(session.id))
+        file_url = await store_file(db, upload, folder, ext, content_type)
+    except BaseException:
+        await _release(db, session, session.size)
+        raise
+    await db.execute(delete(UploadSession).where(UploadSession.id == session.id))
+    await db.commit()
+    part_path(session.id).unlink(missing_ok=True)
+    return file_url
+
+
+async def cancel_session(db: AsyncSession, session: UploadSession) -> None:
+    """Descarta a sessão e as partes já recebidas"""
+    await db.execute(delete(UploadSession).where(UploadSession.id == session.id))
+    await db.commit()
+    part_path(session.id).unlink(missing_ok=True)
@@ -0,0 +1,82 @@
+"""
+Upload multipart paralelo para o S3
+"""
+import math
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+MIN_PART_SIZE = 5 * 1024 * 1024  # Mínimo exigido pelo S3 (exceto na última parte)
+
+
+def _upload_part(client, bucket: str, key: str, upload_id: str, path: Path,
+                 part_number: int, offset: int, length: int, max_retries: int) -> dict:
+    """Envia uma parte do arquivo, com novas tentativas independentes das demais partes"""
+    attempt = 0
+    while True:
+        try:
+            # Lê a parte apenas no momento do envio para manter a memória limitada
+            with open(path, "rb") as f:
+                f.seek(offset)
+                body = f.read(length)
+            response = client.upload_part(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=body,
+                ContentLength=length
+            )
+            return {"PartNumber": part_number, "ETag": response["ETag"]}
+        except (ClientError, BotoCoreError):
+            attempt += 1
+            if attempt > max_retries:
+                raise
+            time.sleep(0.5 * 2 ** (attempt - 1))
+
+
+def multipart_upload(client, bucket: str, key: str, path: Path, size: int, content_type: str,
+                     part_size: int, max_concurrency: int, max_retries: int) -> None:
+    """Envia o arquivo em partes paralelas, abortando o upload em caso de falha"""
+    part_size = max(part_size, MIN_PART_SIZE)
+    part_count = max(1, math.ceil(size / part_size))
+
+    upload_id = client.create_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        ContentType=content_type
+    )["UploadId"]
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            futures = [
+                pool.submit(
+                    _upload_part, client, bucket, key, upload_id, path,
+                    number, (number - 1) * part_size,
+                    min(part_size, size - (number - 1) * part_size), max_retries
+                )
+                for number in range(1, part_count + 1)
+            ]
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in pending:
+                future.cancel()
+            for future in done:
+                if future.exception() is not None:
+                    raise future.exception()
+            parts = [future.result() for future in futures]
+
+        client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts}
+        )
+    except BaseException:
+        # Remove as partes já enviadas para não deixar uploads órfãos no bucket
+        try:
+            client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        except (ClientError, BotoCoreError):
+            pass
+        raise
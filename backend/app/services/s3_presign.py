@@ -0,0 +1,119 @@
+"""
+Upload direto do navegador para o S3 com URLs pré-assinadas (simples ou multipart)
+"""
+import hashlib
+import math
+from typing import List
+
+from botocore.exceptions import ClientError
+
+from app.services.s3_multipart import MIN_PART_SIZE
+
+MAX_PARTS = 10000  # Limite do S3 por upload multipart
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Uploads multipart são concluídos fora da chave final: só o conteúdo conferido é copiado para ela
+INCOMING_PREFIX = "incoming/"
+
+
+def incoming_key(key: str) -> str:
+    """Chave temporária de um upload multipart direto"""
+    return f"{INCOMING_PREFIX}{key}"
+
+
+def presign_put(client, bucket: str, key: str, content_type: str, checksum: str, expires: int) -> dict:
+    """URL de PUT único; o S3 recusa o corpo se o SHA-256 não conferir (bloqueante)"""
+    url = client.generate_presigned_url(
+        "put_object",
+        Params={"Bucket": bucket, "Key": key, "ContentType": content_type, "ChecksumSHA256": checksum},
+        ExpiresIn=expires
+    )
+    return {
+        "method": "PUT",
+        "url": url,
+        # Cabeçalhos assinados: o navegador precisa enviá-los exatamente assim
+        "headers": {"Content-Type": content_type, "x-amz-checksum-sha256": checksum},
+    }
+
+
+def part_size_for(size: int, part_size: int) -> int:
+    """Tamanho das partes respeitando o mínimo e o número máximo de partes do S3"""
+    return max(part_size, MIN_PART_SIZE, math.ceil(size / MAX_PARTS))
+
+
+def presign_multipart(client, bucket: str, key: str, content_type: str, size: int,
+                      part_size: int, expires: int) -> dict:
+    """Inicia um upload multipart e assina uma URL por parte (bloqueante)"""
+    part_size = part_size_for(size, part_size)
+    upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)["UploadId"]
+    parts = [
+        {
+            "part_number": number,
+            "url": client.generate_presigned_url(
+                "upload_part",
+                Params={"Bucket": bucket, "Key": key, "UploadId": upload_id, "PartNumber": number},
+                ExpiresIn=expires
+            ),
+        }
+        for number in range(1, max(1, math.ceil(size / part_size)) + 1)
+    ]
+    return {"method": "PUT", "upload_id": upload_id, "part_size": part_size, "parts": parts}
+
+
+def list_uploaded_parts(client, bucket: str, key: str, upload_id: str) -> List[dict]:
+    """Partes já recebidas pelo S3, sem depender dos ETags informados pelo navegador (bloqueante)"""
+    parts = []
+    marker = 0
+    while True:
+        response = client.list_parts(Bucket=bucket, Key=key, UploadId=upload_id, PartNumberMarker=marker)
+        parts += [{"PartNumber": part["PartNumber"], "ETag": part["ETag"]} for part in response.get("Parts", [])]
+        if not response.get("IsTruncated"):
+            return parts
+        marker = response["NextPartNumberMarker"]
+
+
+def complete_multipart(client, bucket: str, key: str, upload_id: str) -> None:
+    """Conclui o upload multipart com as partes recebidas (bloqueante)"""
+    parts = list_uploaded_parts(client, bucket, key, upload_id)
+    client.complete_multipart_upload(
+        Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+    )
+
+
+def abort_multipart(client, bucket: str, key: str, upload_id: str) -> None:
+    """Descarta as partes de um upload multipart abandonado (bloqueante)"""
+    try:
+        client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") != "NoSuchUpload":
+            raise
+
+
+def inspect_object(client, bucket: str, key: str) -> dict:
+    """Tamanho, tipo, checksum e primeiros bytes do objeto enviado (bloqueante)"""
+    head = client.head_object(Bucket=bucket, Key=key, ChecksumMode="ENABLED")
+    start = client.get_object(Bucket=bucket, Key=key, Range="bytes=0-4")["Body"].read()
+    return {
+        "size": head["ContentLength"],
+        "content_type": head.get("ContentType", ""),
+        "checksum": head.get("ChecksumSHA256"),
+        "start": start,
+    }
+
+
+def object_sha256(client, bucket: str, key: str) -> str:
+    """SHA-256 do conteúdo do objeto, lido em partes (bloqueante)"""
+    digest = hashlib.sha256()
+    body = client.get_object(Bucket=bucket, Key=key)["Body"]
+    for chunk in body.iter_chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def promote_object(client, bucket: str, source: str, key: str, content_type: str) -> None:
+    """Copia o objeto conferido para a chave final e remove o temporário (bloqueante)"""
+    client.copy(
+        {"Bucket": bucket, "Key": source}, bucket, key,
+        ExtraArgs={"ContentType": content_type, "MetadataDirective": "REPLACE"}
+    )
+    client.delete_object(Bucket=bucket, Key=source)
@@ -0,0 +1,216 @@
+"""
+Busca textual em artigos e revistas (FTS5 no SQLite, tsvector no Postgres)
+"""
+import html
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Article, Magazine, SearchDocument
+
+# Marcadores do trecho destacado: caracteres de uso privado, trocados por <mark> após escapar o HTML
+MARK_START = "\ue000"
+MARK_END = "\ue001"
+
+SNIPPET_WORDS = 16
+MAX_TERMS = 8
+
+# Mesma tabela da coluna gerada na migração 0003
+ACCENTS = "áàâãäåéèêëíìîïóòôõöúùûüçñ"
+PLAIN = "aaaaaaeeeeiiiiooooouuuucn"
+
+# Termos muito comuns casam com quase todo o acervo: só os candidatos mais recentes
+# (maior rowid) são pontuados, o que mantém a latência limitada. Os filtros (publicado, tipo)
+# ficam dentro dos candidatos, para que o limite conte só as linhas elegíveis
+SQLITE_SEARCH = text(f"""
+    WITH candidates AS (
+        SELECT min(rowid) AS floor FROM (
+            SELECT search_fts.rowid AS rowid
+            FROM search_fts
+            JOIN search_documents d ON d.id = search_fts.rowid
+            WHERE search_fts MATCH :query
+              AND d.is_published = 1
+              AND (:entity_type IS NULL OR d.entity_type = :entity_type)
+            ORDER BY search_fts.rowid DESC LIMIT :candidates
+        )
+    )
+    SELECT d.entity_type, d.entity_id, d.title,
+           snippet(search_fts, 1, '{MARK_START}', '{MARK_END}', '…', {SNIPPET_WORDS}) AS snippet,
+           snippet(search_fts, 0, '{MARK_START}', '{MARK_END}', '…', {SNIPPET_WORDS}) AS title_snippet,
+           search_fts.rank AS rank
+    FROM search_fts
+    JOIN search_documents d ON d.id = search_fts.rowid
+    WHERE search_fts MATCH :query
+      AND search_fts.rowid >= (SELECT floor FROM candidates)
+      AND d.is_published = 1
+      AND (:entity_type IS NULL OR d.entity_type = :entity_type)
+    ORDER BY search_fts.rank
+    LIMIT :limit OFFSET :offset
+""")
+
+# O destaque (ts_headline) é caro: é calculado só para as linhas da página
+POSTGRES_SEARCH = text(f"""
+    WITH q AS (
+        SELECT to_tsquery('portuguese', translate(lower(:query), '{ACCENTS}', '{PLAIN}')) AS query
+    ), candidates AS (
+        SELECT d.id FROM search_documents d, q
+        WHERE d.document @@ q.query
+          AND d.is_published
+          AND (CAST(:entity_type AS varchar) IS NULL OR d.entity_type = :entity_type)
+        ORDER BY d.id DESC
+        LIMIT :candidates
+    ), page AS (
+        SELECT d.entity_type, d.entity_id, d.title, d.body, ts_rank_cd(d.document, q.query) AS score
+        FROM search_documents d JOIN candidates c ON c.id = d.id, q
+        ORDER BY score DESC, d.id
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT page.entity_type, page.entity_id, page.title,
+           ts_headline('portuguese', page.body, q.query, :headline_options) AS snippet,
+           ts_headline('portuguese', page.title, q.query, :headline_options) AS title_snippet,
+           -page.score AS rank
+    FROM page, q
+    ORDER BY page.score DESC
+""")
+
+# Páginas de uma edição: os rowids de uma revista ficam em uma faixa contígua (gravados em
+# lotes), o que restringe a busca do FTS5 antes do filtro por revista
+SQLITE_PAGE_SEARCH = text(f"""
+    WITH bounds AS (
+        SELECT min(id) AS low, max(id) AS high FROM magazine_pages WHERE magazine_id = :magazine_id
+    )
+    SELECT p.page_number,
+           snippet(magazine_pages_fts, 0, '{MARK_START}', '{MARK_END}', '…', {SNIPPET_WORDS}) AS snippet
+    FROM magazine_pages_fts
+    JOIN magazine_pages p ON p.id = magazine_pages_fts.rowid
+    WHERE magazine_pages_fts MATCH :query
+      AND magazine_pages_fts.rowid BETWEEN (SELECT low FROM bounds) AND (SELECT high FROM bounds)
+      AND p.magazine_id = :magazine_id
+      AND p.page_number > :after_page
+    ORDER BY p.page_number
+    LIMIT :limit
+""")
+
+POSTGRES_PAGE_SEARCH = text(f"""
+    WITH q AS (
+        SELECT to_tsquery('portuguese', translate(lower(:query), '{ACCENTS}', '{PLAIN}')) AS query
+    ), hits AS (
+        SELECT p.page_number, p.text
+        FROM magazine_pages p, q
+        WHERE p.magazine_id = :magazine_id
+          AND p.page_number > :after_page
+          AND p.document @@ q.query
+        ORDER BY p.page_number
+        LIMIT :limit
+    )
+    SELECT hits.page_number, ts_headline('portuguese', hits.text, q.query, :headline_options) AS snippet
+    FROM hits, q
+    ORDER BY hits.page_number
+""")
+
+HEADLINE_OPTIONS = f"StartSel={MARK_START}, StopSel={MARK_END}, MaxWords={SNIPPET_WORDS}, MinWords=8, MaxFragments=2, FragmentDelimiter=…"
+
+
+def _terms(query: str) -> List[str]:
+    """Extrai as palavras da consulta, descartando a sintaxe dos motores de busca"""
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+def build_match(dialect: str, query: str) -> Optional[str]:
+    """Monta a consulta do motor: todas as palavras, com a última como prefixo"""
+    terms = _terms(query)
+    if not terms:
+        return None
+    if dialect == "sqlite":
+        return " ".join(f'"{term}"' for term in terms) + "*"
+    return " & ".join(terms) + ":*"
+
+
+def best_snippet(body: Optional[str], title: Optional[str]) -> Optional[str]:
+    """Trecho do corpo com o termo destacado ou, se o termo só aparece no título, o do título"""
+    if body and MARK_START in body:
+        return body
+    if title and MARK_START in title:
+        return title
+    return body
+
+
+def render_snippet(snippet: Optional[str]) -> str:
+    """Escapa o trecho e converte os marcadores em <mark>"""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+async def search(db: AsyncSession, query: str, entity_type: Optional[str],
+                 limit: int, offset: int) -> List[Tuple[str, str, str, str, float]]:
+    """Busca documentos publicados ordenados por relevância (tipo, id, título, trecho, pontuação)"""
+    dialect = db.bind.dialect.name
+    match = build_match(dialect, query)
+    if match is None:
+        return []
+
+    params = {
+        "query": match, "entity_type": entity_type, "limit": limit, "offset": offset,
+        "candidates": settings.SEARCH_MAX_CANDIDATES,
+    }
+    if dialect == "sqlite":
+        rows = await db.execute(SQLITE_SEARCH, params)
+    else:
+        rows = await db.execute(POSTGRES_SEARCH, {**params, "headline_options": HEADLINE_OPTIONS})
+    # O rank dos dois motores é menor para os melhores resultados
+    return [
+        (row.entity_type, row.entity_id, row.title, render_snippet(best_snippet(row.snippet, row.title_snippet)), -row.rank)
+        for row in rows
+    ]
+
+
+async def _upsert(db: AsyncSession, entity_type: str, entity_id: str, is_published: bool,
+                  title: str, body: str) -> None:
+    """Insere ou atualiza o documento de busca de um registro"""
+    insert = sqlite_insert if db.bind.dialect.name == "sqlite" else pg_insert
+    values = {"is_published": bool(is_published), "title": title or "", "body": body}
+    stmt = insert(SearchDocument).values(entity_type=entity_type, entity_id=entity_id, **values)
+    await db.execute(stmt.on_conflict_do_update(index_elements=["entity_type", "entity_id"], set_=values))
+
+
+async def index_article(db: AsyncSession, article: Article) -> None:
+    """Atualiza o índice de busca com o artigo (chamar antes do commit)"""
+    await db.flush()
+    body = f"{article.excerpt or ''} {article.content or ''}"
+    await _upsert(db, "article", article.id, article.is_published, article.title, body)
+
+
+async def index_magazine(db: AsyncSession, magazine: Magazine) -> None:
+    """Atualiza o índice de busca com a revista (chamar antes do commit)"""
+    await db.flush()
+    body = f"{magazine.edition or ''} {magazine.description or ''}"
+    await _upsert(db, "magazine", magazine.id, magazine.is_published, magazine.title, body)
+
+
+async def remove_from_index(db: AsyncSession, entity_type: str, entity_id: str) -> None:
+    """Remove um registro do índice de busca"""
+    await db.execute(delete(SearchDocument).where(
+        SearchDocument.entity_type == entity_type,
+        SearchDocument.entity_id == entity_id
+    ))
+
+
+async def search_pages(db: AsyncSession, magazine_id: str, query: str,
+                       limit: int, after_page: int) -> List[Tuple[int, str]]:
+    """Busca nas páginas de uma revista, em ordem de página (número, trecho)"""
+    dialect = db.bind.dialect.name
+    match = build_match(dialect, query)
+    if match is None:
+        return []
+
+    params = {"query": match, "magazine_id": magazine_id, "limit": limit, "after_page": after_page}
+    if dialect == "sqlite":
+        rows = await db.execute(SQLITE_PAGE_SEARCH, params)
+    else:
+        rows = await db.execute(POSTGRES_PAGE_SEARCH, {**params, "headline_options": HEADLINE_OPTIONS})
+    return [(row.page_number, render_snippet(row.snippet)) for row in rows]
@@ -0,0 +1,94 @@
+"""
+Slugs de artigos e serviços: geração a partir do título, sufixo livre em caso de colisão e
+busca por id ou slug
+"""
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Letras que a decomposição Unicode não reduz a ASCII
+TRANSLITERATION = str.maketrans({
+    "ß": "ss", "æ": "ae", "œ": "oe", "ø": "o", "đ": "d", "ð": "d", "ł": "l", "þ": "th",
+})
+INVALID_CHARS = re.compile(r"[^a-z0-9\s-]+")
+SEPARATORS = re.compile(r"[\s-]+")
+# Os ids são UUIDs: uma chave nesse formato é buscada primeiro pelo id, as demais pelo slug
+UUID_PATTERN = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+EMPTY_SLUG = "sem-titulo"
+PREFIX_QUERY_BATCH = 50
+
+
+def generate_slug(title: str) -> str:
+    """Gera um slug a partir do título (acentos removidos, pontuação descartada, hífens entre palavras)"""
+    text = title.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text.translate(TRANSLITERATION))
+        text = text.encode("ascii", "ignore").decode("ascii")
+    return SEPARATORS.sub("-", INVALID_CHARS.sub("", text)).strip("-")
+
+
+def _same_or_suffixed(db: AsyncSession, column, base: str):
+    """Slug igual à base ou base-<sufixo>, como uma faixa do índice único"""
+    if db.bind.dialect.name == "sqlite":
+        # Comparação binária: todo "base-..." fica entre "base-" e "base." ('.' sucede '-')
+        return or_(column == base, and_(column > f"{base}-", column < f"{base}."))
+    # Em collations com regras de idioma a ordem não é a dos bytes: prefixo com LIKE
+    return or_(column == base, column.startswith(f"{base}-", autoescape=True))
+
+
+def _free_slug(base: str, taken: set, next_suffix: Dict[str, int]) -> str:
+    """A base, se livre, ou base-N com o menor N livre a partir do último usado"""
+    if base not in taken:
+        return base
+    suffix = next_suffix.get(base, 2)
+    while f"{base}-{suffix}" in taken:
+        suffix += 1
+    next_suffix[base] = suffix + 1
+    return f"{base}-{suffix}"
+
+
+async def allocate_slugs(db: AsyncSession, model, bases: Iterable[str],
+                         exclude_id: Optional[str] = None) -> List[str]:
+    """Slugs livres para as bases, na ordem recebida: colisões com o banco ou dentro do próprio
+    lote ganham um sufixo numérico (uma consulta por faixa a cada PREFIX_QUERY_BATCH bases)"""
+    bases = [base or EMPTY_SLUG for base in bases]
+    distinct = list(dict.fromkeys(bases))
+    taken = set()
+    for start in range(0, len(distinct), PREFIX_QUERY_BATCH):
+        stmt = select(model.slug).where(or_(*(
+            _same_or_suffixed(db, model.slug, base) for base in distinct[start:start + PREFIX_QUERY_BATCH]
+        )))
+        if exclude_id is not None:
+            stmt = stmt.where(model.id != exclude_id)
+        taken.update((await db.scalars(stmt)).all())
+
+    allocated, next_suffix = [], {}
+    for base in bases:
+        slug = _free_slug(base, taken, next_suffix)
+        taken.add(slug)
+        allocated.append(slug)
+    return allocated
+
+
+async def unique_slug(db: AsyncSession, model, base: str, exclude_id: Optional[str] = None) -> str:
+    """Slug livre para um registro (exclude_id: o próprio registro, numa atualização)"""
+    return (await allocate_slugs(db, model, [base], exclude_id))[0]
+
+
+async def find_version(db: AsyncSession, model, key: str) -> Optional[Row]:
+    """Busca (id, updated_at) pelo id ou pelo slug.
+
+    A coluna provável (pelo formato da chave) é consultada primeiro, só pelo seu índice; a
+    outra só é consultada se a primeira não encontrar nada.
+    """
+    columns = (model.id, model.slug) if UUID_PATTERN.match(key) else (model.slug, model.id)
+    for column in columns:
+        version = (await db.execute(select(model.id, model.updated_at).where(column == key))).first()
+        if version is not None:
+            return version
+    return None
@@ -0,0 +1,529 @@
+"""
+Backends de armazenamento (local, S3 e Cloudinary) com uma interface comum e um cache
+em disco, com remoção LRU, na frente dos backends remotos
+"""
+import asyncio
+import os
+import re
+import shutil
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import aiofiles
+import boto3
+import cloudinary
+import cloudinary.api
+import cloudinary.uploader
+import cloudinary.utils
+from botocore.exceptions import ClientError
+
+from app.config import settings
+from app.services.executors import run_storage_io
+from app.services.s3_multipart import multipart_upload
+
+CHUNK_SIZE = 1024 * 1024
+S3_DELETE_BATCH = 1000  # Limite do DeleteObjects por requisição
+CLOUDINARY_CHUNK_SIZE = 20 * 1024 * 1024
+CLOUDINARY_URL = re.compile(r"^https://res\.cloudinary\.com/[^/]+/(image|raw)/upload/(?:v\d+/)?(carlota-mag/.+)$")
+
+# Configurar Cloudinary
+if settings.use_cloudinary:
+    cloudinary.config(
+        cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+        api_key=settings.CLOUDINARY_API_KEY,
+        api_secret=settings.CLOUDINARY_API_SECRET
+    )
+
+# Configurar AWS S3
+s3_client = None
+if settings.use_s3:
+    s3_client = boto3.client(
+        's3',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_S3_REGION,
+        endpoint_url=settings.AWS_S3_ENDPOINT_URL or None
+    )
+
+
+def current_backend() -> str:
+    """Backend usado nos novos uploads (prioridade: S3 > Cloudinary > Local)"""
+    if settings.use_s3:
+        return "s3"
+    if settings.use_cloudinary:
+        return "cloudinary"
+    return "local"
+
+
+def get_s3_url(key: str) -> str:
+    """Retorna a URL pública de um objeto no S3"""
+    if settings.AWS_S3_ENDPOINT_URL:
+        return f"{settings.AWS_S3_ENDPOINT_URL.rstrip('/')}/{settings.AWS_S3_BUCKET}/{key}"
+    return f"https://{settings.AWS_S3_BUCKET}.s3.{settings.AWS_S3_REGION}.amazonaws.com/{key}"
+
+
+def put_file_to_s3(path: Path, key: str, size: int, content_type: str):
+    """Envia um arquivo pequeno ao S3 com uma única requisição (bloqueante)"""
+    with open(path, "rb") as body:
+        s3_client.put_object(
+            Bucket=settings.AWS_S3_BUCKET,
+            Key=key,
+            Body=body,
+            ContentLength=size,
+            ContentType=content_type
+        )
+
+
+def s3_object_exists(key: str) -> bool:
+    """Verifica se o objeto existe no S3 (bloqueante)"""
+    try:
+        s3_client.head_object(Bucket=settings.AWS_S3_BUCKET, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+    return True
+
+
+def delete_s3_objects(keys: List[str]) -> None:
+    """Remove objetos do S3 em lotes (bloqueante)"""
+    for start in range(0, len(keys), S3_DELETE_BATCH):
+        s3_client.delete_objects(
+            Bucket=settings.AWS_S3_BUCKET,
+            Delete={"Objects": [{"Key": key} for key in keys[start:start + S3_DELETE_BATCH]], "Quiet": True}
+        )
+
+
+def download_file(url: str, destination: Path) -> None:
+    """Baixa um arquivo remoto para o disco (bloqueante)"""
+    with urllib.request.urlopen(url, timeout=60) as response, open(destination, "wb") as out:
+        shutil.copyfileobj(response, out, length=CHUNK_SIZE)
+
+
+def url_exists(url: str) -> bool:
+    """Verifica com um HEAD se a URL pública responde (bloqueante)"""
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, method="HEAD"), timeout=30):
+            return True
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return False
+        raise
+
+
+class StorageBackend:
+    """Interface comum dos backends: chaves relativas (ex.: pdfs/<sha256>.pdf) e URLs públicas"""
+
+    name = ""
+    # O backend gera os derivados de imagem sob demanda (por parâmetros na URL)
+    transforms_images = False
+
+    async def put(self, key: str, path: Path, size: int, content_type: str) -> str:
+        """Armazena o arquivo sob a chave e retorna a URL pública (o arquivo de origem pode ser movido)"""
+        raise NotImplementedError
+
+    async def get(self, key: str, destination: Path) -> None:
+        """Copia o objeto para um arquivo local"""
+        raise NotImplementedError
+
+    def stream(self, key: str) -> AsyncIterator[bytes]:
+        """Lê o objeto em blocos"""
+        raise NotImplementedError
+
+    async def delete(self, keys: List[str]) -> None:
+        """Remove os objetos (chaves inexistentes são ignoradas)"""
+        raise NotImplementedError
+
+    async def exists(self, key: str) -> bool:
+        """Verifica se o objeto existe"""
+        raise NotImplementedError
+
+    async def local_path(self, key: str) -> Optional[Path]:
+        """Caminho do objeto no disco local, se disponível sem baixá-lo a cada leitura"""
+        return None
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        """Chave de um objeto a partir da URL pública, se pertencer a este backend"""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Arquivos na pasta de uploads, servidos pela própria API em /uploads"""
+
+    name = "local"
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Chave fora da pasta de uploads: {key}")
+        return path
+
+    async def put(self, key: str, path: Path, size: int, content_type: str) -> str:
+        destination = self._path(key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        # Os temporários de upload ficam no mesmo disco: basta movê-los
+        os.replace(path, destination)
+        return f"/uploads/{key}"
+
+    async def get(self, key: str, destination: Path) -> None:
+        await run_storage_io("local", shutil.copyfile, self._path(key), destination)
+
+    async def stream(self, key: str) -> AsyncIterator[bytes]:
+        async with aiofiles.open(self._path(key), "rb") as f:
+            while chunk := await f.read(CHUNK_SIZE):
+                yield chunk
+
+    async def delete(self, keys: List[str]) -> None:
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+    async def exists(self, key: str) -> bool:
+        return await run_storage_io("local", self._path(key).is_file)
+
+    async def local_path(self, key: str) -> Optional[Path]:
+        path = self._path(key)
+        return path if await run_storage_io("local", path.is_file) else None
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        if url.startswith("/uploads/"):
+            return url.removeprefix("/uploads/")
+        return None
+
+
+class S3Storage(StorageBackend):
+    """Objetos no bucket S3 (ou compatível, como MinIO)"""
+
+    name = "s3"
+
+    async def put(self, key: str, path: Path, size: int, content_type: str) -> str:
+        # Arquivos grandes vão em partes paralelas; capas pequenas continuam com put_object
+        if size >= settings.S3_MULTIPART_THRESHOLD_MB * 1024 * 1024:
+            await run_storage_io(
+                "s3",
+                multipart_upload,
+                s3_client,
+                settings.AWS_S3_BUCKET,
+                key,
+                path,
+                size,
+                content_type,
+                part_size=settings.S3_MULTIPART_PART_SIZE_MB * 1024 * 1024,
+                max_concurrency=settings.S3_MULTIPART_CONCURRENCY,
+                max_retries=settings.S3_MULTIPART_MAX_RETRIES
+            )
+        else:
+            await run_storage_io("s3", put_file_to_s3, path, key, size, content_type)
+        return get_s3_url(key)
+
+    async def get(self, key: str, destination: Path) -> None:
+        # download_file baixa arquivos grandes em intervalos paralelos
+        await run_storage_io("s3", s3_client.download_file, settings.AWS_S3_BUCKET, key, str(destination))
+
+    async def stream(self, key: str) -> AsyncIterator[bytes]:
+        response = await run_storage_io("s3", s3_client.get_object, Bucket=settings.AWS_S3_BUCKET, Key=key)
+        body = response["Body"]
+        try:
+            while chunk := await run_storage_io("s3", body.read, CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
+
+    async def delete(self, keys: List[str]) -> None:
+        await run_storage_io("s3", delete_s3_objects, keys)
+
+    async def exists(self, key: str) -> bool:
+        return await run_storage_io("s3", s3_object_exists, key)
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        prefix = get_s3_url("")
+        if url.startswith(prefix):
+            return url.removeprefix(prefix)
+        return None
+
+
+class CloudinaryStorage(StorageBackend):
+    """Recursos no Cloudinary: a chave é o public_id (sem extensão)"""
+
+    name = "cloudinary"
+    transforms_images = True
+
+    @staticmethod
+    def _resource_type(key: str) -> str:
+        """PDFs são recursos "raw"; capas são imagens"""
+        return "image" if "/covers/" in f"/{key}" else "raw"
+
+    def url(self, key: str) -> str:
+        return cloudinary.utils.cloudinary_url(key, resource_type=self._resource_type(key), secure=True)[0]
+
+    async def put(self, key: str, path: Path, size: int, content_type: str) -> str:
+        # upload_large envia o arquivo em blocos, sem carregá-lo inteiro em memória
+        result = await run_storage_io(
+            "cloudinary",
+            cloudinary.uploader.upload_large,
+            str(path),
+            resource_type=self._resource_type(key),
+            public_id=key,
+            chunk_size=CLOUDINARY_CHUNK_SIZE
+        )
+        return result["secure_url"]
+
+    async def get(self, key: str, destination: Path) -> None:
+        await run_storage_io("cloudinary", download_file, self.url(key), destination)
+
+    async def stream(self, key: str) -> AsyncIterator[bytes]:
+        response = await run_storage_io("cloudinary", urllib.request.urlopen, self.url(key), timeout=60)
+        try:
+            while chunk := await run_storage_io("cloudinary", response.read, CHUNK_SIZE):
+                yield chunk
+        finally:
+            response.close()
+
+    async def delete(self, keys: List[str]) -> None:
+        by_type: Dict[str, List[str]] = {}
+        for key in keys:
+            by_type.setdefault(self._resource_type(key), []).append(key)
+        for resource_type, public_ids in by_type.items():
+            await run_storage_io("cloudinary", cloudinary.api.delete_resources, public_ids, resource_type=resource_type)
+
+    async def exists(self, key: str) -> bool:
+        # HEAD na URL de entrega: não consome a cota da Admin API
+        return await run_storage_io("cloudinary", url_exists, self.url(key))
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        # URLs com transformações (derivados) não correspondem a um objeto armazenado
+        match = CLOUDINARY_URL.match(url)
+        if not match:
+            return None
+        resource_type, public_id = match.groups()
+        return public_id.rsplit(".", 1)[0] if resource_type == "image" else public_id
+
+
+def _mark_access(path: Path) -> Optional[os.stat_result]:
+    """Atualiza só o atime de uma cópia (o ETag vem do mtime); None se o arquivo não existe"""
+    try:
+        st = path.stat()
+        os.utime(path, ns=(time.time_ns(), st.st_mtime_ns))
+    except FileNotFoundError:
+        return None
+    return st
+
+
+def _unlink_all(paths: List[Path]) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+class DiskCache:
+    """Cópias locais de objetos remotos, com remoção LRU dentro de um limite de bytes.
+
+    Os nomes são endereçados pelo conteúdo (ou únicos por upload), então uma cópia nunca
+    fica desatualizada. Vários workers podem dividir a pasta: cada um mantém seu próprio
+    índice e confere a existência do arquivo antes de usá-lo.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries: Optional["OrderedDict[str, int]"] = None
+        self._size = 0
+        self._loading = asyncio.Lock()
+        # Um lock por download em andamento, removido quando sai o último que o esperava
+        self._fills: Dict[str, asyncio.Lock] = {}
+        self._fill_users: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Chave fora do cache: {key}")
+        return path
+
+    def _scan(self) -> "OrderedDict[str, int]":
+        """Lê a pasta, do acesso mais antigo ao mais recente (bloqueante: roda no executor)"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        files = [
+            (path.stat(), path) for path in self.root.rglob("*")
+            if path.is_file() and not path.name.endswith(".part")
+        ]
+        files.sort(key=lambda item: item[0].st_atime)
+        return OrderedDict((path.relative_to(self.root).as_posix(), st.st_size) for st, path in files)
+
+    async def _load(self) -> "OrderedDict[str, int]":
+        """Reconstrói o índice a partir da pasta no primeiro uso, fora do event loop"""
+        if self._entries is None:
+            async with self._loading:
+                if self._entries is None:
+                    entries = await run_storage_io("local", self._scan)
+                    self._size = sum(entries.values())
+                    self._entries = entries
+        return self._entries
+
+    async def _touch(self, key: str, path: Path) -> bool:
+        """Marca o acesso à cópia, se ela existir (pode ter sido removida por outro worker).
+
+        O índice só é alterado no event loop; stat e utime rodam no executor local.
+        """
+        entries = self._entries
+        st = await run_storage_io("local", _mark_access, path)
+        if st is None:
+            if key in entries:
+                self._size -= entries.pop(key)
+            return False
+        if key not in entries:
+            entries[key] = st.st_size
+            self._size += st.st_size
+        entries.move_to_end(key)
+        return True
+
+    async def _evict(self, keep: str) -> None:
+        """Remove os arquivos menos usados até caber no limite"""
+        entries = self._entries
+        removed = []
+        while self._size > self.max_bytes and len(entries) > 1:
+            key = next(iter(entries))
+            if key == keep:
+                entries.move_to_end(key)
+                continue
+            self._size -= entries.pop(key)
+            removed.append(self._path(key))
+        if removed:
+            await run_storage_io("local", _unlink_all, removed)
+
+    async def discard(self, key: str) -> None:
+        """Remove a cópia local de um objeto"""
+        entries = await self._load()
+        if key in entries:
+            self._size -= entries.pop(key)
+        await run_storage_io("local", self._path(key).unlink, missing_ok=True)
+
+    async def fetch(self, key: str, origin: StorageBackend) -> Path:
+        """Retorna a cópia local do objeto, baixando-a da origem na primeira leitura"""
+        await self._load()
+        path = self._path(key)
+        if await self._touch(key, path):
+            self.hits += 1
+            return path
+
+        # Leituras simultâneas do mesmo objeto esperam um único download
+        lock = self._fills.setdefault(key, asyncio.Lock())
+        self._fill_users[key] = self._fill_users.get(key, 0) + 1
+        try:
+            async with lock:
+                if await self._touch(key, path):
+                    self.hits += 1
+                    return path
+                self.misses += 1
+                await run_storage_io("local", path.parent.mkdir, parents=True, exist_ok=True)
+                partial = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.part")
+                try:
+                    await origin.get(key, partial)
+                    await run_storage_io("local", os.replace, partial, path)
+                finally:
+                    await run_storage_io("local", partial.unlink, missing_ok=True)
+                await self._touch(key, path)
+                await self._evict(keep=key)
+                return path
+        finally:
+            self._fill_users[key] -= 1
+            if not self._fill_users[key]:
+                del self._fill_users[key]
+                del self._fills[key]
+
+    async def stats(self) -> dict:
+        """Estatísticas de uso do cache"""
+        entries = await self._load()
+        return {
+            "files": len(entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class CachedStorage(StorageBackend):
+    """Backend remoto com leitura através do cache em disco"""
+
+    def __init__(self, origin: StorageBackend, cache: DiskCache):
+        self.origin = origin
+        self.cache = cache
+        self.name = origin.name
+        self.transforms_images = origin.transforms_images
+
+    async def put(self, key: str, path: Path, size: int, content_type: str) -> str:
+        return await self.origin.put(key, path, size, content_type)
+
+    async def get(self, key: str, destination: Path) -> None:
+        await run_storage_io("local", shutil.copyfile, await self.cache.fetch(key, self.origin), destination)
+
+    async def stream(self, key: str) -> AsyncIterator[bytes]:
+        path = await self.cache.fetch(key, self.origin)
+        async with aiofiles.open(path, "rb") as f:
+            while chunk := await f.read(CHUNK_SIZE):
+                yield chunk
+
+    async def delete(self, keys: List[str]) -> None:
+        for key in keys:
+            await self.cache.discard(key)
+        await self.origin.delete(keys)
+
+    async def exists(self, key: str) -> bool:
+        # Consulta sempre a origem: a cópia local não garante que o objeto ainda exista lá
+        return await self.origin.exists(key)
+
+    async def local_path(self, key: str) -> Optional[Path]:
+        return await self.cache.fetch(key, self.origin)
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        return self.origin.key_for_url(url)
+
+
+_backends: Dict[str, StorageBackend] = {}
+_disk_cache: Optional[DiskCache] = None
+
+
+def get_disk_cache() -> Optional[DiskCache]:
+    """Cache em disco compartilhado pelos backends remotos (None se desativado)"""
+    global _disk_cache
+    if _disk_cache is None and settings.STORAGE_CACHE_MAX_MB > 0:
+        root = Path(settings.STORAGE_CACHE_DIR or Path(settings.UPLOAD_DIR) / "cache")
+        _disk_cache = DiskCache(root, settings.STORAGE_CACHE_MAX_MB * 1024 * 1024)
+    return _disk_cache
+
+
+def get_backend(name: Optional[str] = None) -> StorageBackend:
+    """Retorna o backend pelo nome (por padrão, o usado nos novos uploads)"""
+    name = name or current_backend()
+    backend = _backends.get(name)
+    if backend is None:
+        if name == "local":
+            backend = LocalStorage(Path(settings.UPLOAD_DIR))
+        else:
+            backend = S3Storage() if name == "s3" else CloudinaryStorage()
+            cache = get_disk_cache()
+            if cache is not None:
+                backend = CachedStorage(backend, cache)
+        _backends[name] = backend
+    return backend
+
+
+def locate(url: Optional[str]) -> Optional[Tuple[StorageBackend, str]]:
+    """Identifica o backend e a chave de uma URL armazenada (None para links externos)"""
+    if not url:
+        return None
+    names = ["local"] + (["s3"] if settings.use_s3 else []) + (["cloudinary"] if settings.use_cloudinary else [])
+    for name in names:
+        backend = get_backend(name)
+        key = backend.key_for_url(url)
+        if key:
+            return backend, key
+    return None
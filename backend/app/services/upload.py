@@ -0,0 +1,79 @@
+"""
+Serviço de gravação de uploads em streaming
+"""
+import hashlib
+import os
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+
+from app.config import settings
+
+
+@dataclass
+class StoredUpload:
+    """Arquivo gravado em disco a partir de um upload"""
+    path: Path
+    size: int
+    sha256: str
+
+
+def get_temp_upload_path() -> Path:
+    """Retorna a pasta de arquivos temporários de upload"""
+    path = Path(settings.UPLOAD_DIR) / "tmp"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+async def stream_to_disk(file: UploadFile, destination: Path, max_size_mb: int) -> StoredUpload:
+    """Grava o upload em disco por blocos, validando o tamanho e calculando o SHA-256"""
+    max_size_bytes = max_size_mb * 1024 * 1024
+    chunk_size = settings.UPLOAD_CHUNK_SIZE_KB * 1024
+    digest = hashlib.sha256()
+    size = 0
+
+    # Grava em um arquivo parcial para nunca expor uploads incompletos
+    partial_path = destination.with_name(f"{destination.name}.part")
+    try:
+        async with aiofiles.open(partial_path, "wb") as out:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_size_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Arquivo muito grande. Máximo permitido: {max_size_mb}MB"
+                    )
+                digest.update(chunk)
+                await out.write(chunk)
+        os.replace(partial_path, destination)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+
+    return StoredUpload(path=destination, size=size, sha256=digest.hexdigest())
+
+
+def describe_file(path: Path) -> StoredUpload:
+    """Calcula o tamanho e o SHA-256 de um arquivo já gravado em disco (bloqueante)"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(settings.UPLOAD_CHUNK_SIZE_KB * 1024):
+            size += len(chunk)
+            digest.update(chunk)
+    return StoredUpload(path=path, size=size, sha256=digest.hexdigest())
+
+
+@asynccontextmanager
+async def spooled_upload(file: UploadFile, max_size_mb: int):
+    """Grava o upload em um arquivo temporário, removido ao sair do contexto"""
+    temp_path = get_temp_upload_path() / uuid.uuid4().hex
+    stored = await stream_to_disk(file, temp_path, max_size_mb)
+    try:
+        yield stored
+    finally:
+        stored.path.unlink(missing_ok=True)
@@ -0,0 +1,32 @@
+"""
+Worker dedicado da fila de jobs: python -m app.worker
+
+Com workers dedicados, desative os do processo da API (JOB_WORKERS_IN_PROCESS=false).
+"""
+import asyncio
+import logging
+import signal
+
+from app.config import settings
+from app.services import content_store, pdf_text, resumable  # noqa: F401 - registram os handlers
+from app.services.executors import shutdown_process_pool, shutdown_storage_executors
+from app.services.jobs import start_workers, stop_workers
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    start_workers(settings.JOB_CONCURRENCY)
+    await stop.wait()
+    # Os jobs em andamento voltam para a fila e são retomados por outro worker
+    await stop_workers()
+    shutdown_process_pool()
+    shutdown_storage_executors()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+Benchmark: requisições por segundo no acesso síncrono (threadpool) x assíncrono (AsyncSession)
+
+Uso: python -m benchmarks.db_paths [--requests 5000] [--concurrency 256] [--database-url URL]
+Requer httpx (pip install httpx). Sem --database-url usa um banco SQLite temporário;
+com Postgres, aponte para um banco descartável (as tabelas são criadas e populadas).
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import Base, create_async_db_engine, create_db_engine
+from app.models import Magazine
+from app.routers.magazines import MAGAZINE_ORDER
+from app.services.pagination import keyset_ordering
+
+PAGE_SIZE = 20
+
+
+def build_apps(database_url: str):
+    """Monta dois apps equivalentes: um com handler síncrono e outro assíncrono"""
+    sync_engine = create_db_engine(database_url)
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    async_engine = create_async_db_engine(database_url)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    stmt = select(Magazine).where(Magazine.is_published == True).order_by(
+        *keyset_ordering(MAGAZINE_ORDER)
+    ).limit(PAGE_SIZE)
+
+    sync_app = FastAPI()
+    async_app = FastAPI()
+
+    @sync_app.get("/magazines")
+    def sync_list(db: Session = Depends(get_sync_db)):
+        return [m.title for m in db.scalars(stmt).all()]
+
+    @async_app.get("/magazines")
+    async def async_list(db: AsyncSession = Depends(get_async_db)):
+        return [m.title for m in (await db.scalars(stmt)).all()]
+
+    return sync_engine, async_engine, sync_app, async_app
+
+
+def seed(engine, rows: int):
+    """Cria as tabelas e insere revistas de exemplo"""
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add_all(Magazine(title=f"Revista {i}", is_published=True) for i in range(rows))
+        db.commit()
+
+
+async def measure(app: FastAPI, total: int, concurrency: int) -> float:
+    """Dispara requisições com concorrência limitada e retorna requisições por segundo"""
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get("/magazines")
+                response.raise_for_status()
+
+        await one()  # aquecimento
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        sync_engine, async_engine, sync_app, async_app = build_apps(database_url)
+        seed(sync_engine, args.rows)
+
+        sync_rps = asyncio.run(measure(sync_app, args.requests, args.concurrency))
+        async_rps = asyncio.run(measure(async_app, args.requests, args.concurrency))
+
+        sync_engine.dispose()
+        asyncio.run(async_engine.dispose())
+
+    print(f"banco: {sync_engine.url.get_backend_name()}  requisições: {args.requests}  concorrência: {args.concurrency}")
+    print(f"síncrono (threadpool):     {sync_rps:8.1f} req/s")
+    print(f"assíncrono (AsyncSession): {async_rps:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
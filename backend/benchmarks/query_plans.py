@@ -0,0 +1,95 @@
+"""
+Verificação dos planos de consulta das listagens (EXPLAIN QUERY PLAN, SQLite)
+
+Uso: python -m benchmarks.query_plans (também conferido nos testes, em tests/test_query_plans.py)
+"""
+import sys
+from datetime import date, datetime
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import Article, Contact, Magazine, Service
+from app.routers.articles import ARTICLE_ORDER
+from app.routers.contacts import CONTACT_ORDER
+from app.routers.magazines import MAGAZINE_ORDER
+from app.services.pagination import _after, keyset_ordering
+
+PAGE = 21
+
+
+def _keyset_queries(name: str, stmt: Select, columns: tuple):
+    """Consultas usadas pela paginação por cursor: primeira página, página seguinte e trecho de nulos"""
+    sample = [date.today(), datetime.utcnow(), "~"][-len(columns):]
+    ordering = keyset_ordering(columns)
+    yield f"{name} (lista)", stmt.order_by(*ordering)
+    yield f"{name} (primeira página)", stmt.order_by(*ordering).limit(PAGE)
+    yield f"{name} (próxima página)", stmt.where(_after(columns, sample)).order_by(*ordering).limit(PAGE)
+    if len(columns) > 2:
+        yield f"{name} (trecho sem data)", stmt.where(
+            columns[0].is_(None), _after(columns[1:], sample[1:])
+        ).order_by(*ordering[1:]).limit(PAGE)
+
+
+def list_queries():
+    """Consultas emitidas pelos endpoints de listagem"""
+    yield from _keyset_queries("magazines", select(Magazine), MAGAZINE_ORDER)
+    yield from _keyset_queries(
+        "magazines publicadas", select(Magazine).where(Magazine.is_published == True), MAGAZINE_ORDER
+    )
+    yield from _keyset_queries("articles", select(Article), ARTICLE_ORDER)
+    yield from _keyset_queries(
+        "articles publicados", select(Article).where(Article.is_published == True), ARTICLE_ORDER
+    )
+    yield "articles em destaque", select(Article).where(
+        Article.is_published == True,
+        Article.is_featured == True
+    ).order_by(Article.publish_date.desc()).limit(5)
+    yield "services", select(Service).order_by(Service.order.asc())
+    yield "services ativos", select(Service).where(Service.is_active == True).order_by(Service.order.asc())
+    yield from _keyset_queries("contacts", select(Contact), CONTACT_ORDER)
+    yield from _keyset_queries("contacts não lidos", select(Contact).where(Contact.is_read == False), CONTACT_ORDER)
+
+
+def explain(db: Session, stmt: Select) -> list:
+    """Retorna as linhas de detalhe do EXPLAIN QUERY PLAN de uma consulta"""
+    compiled = stmt.compile(dialect=db.bind.dialect)
+    params = compiled.construct_params()
+    values = tuple(params[name] for name in compiled.positiontup)
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", values).fetchall()
+    return [row[-1] for row in rows]
+
+
+def uses_index(plan: list) -> bool:
+    """Confere se o plano busca/ordena pelo índice, sem varredura completa nem ordenação temporária"""
+    for detail in plan:
+        if detail.startswith("SCAN") and "USING" not in detail:
+            return False
+        if "TEMP B-TREE" in detail:
+            return False
+    return any("INDEX" in detail for detail in plan)
+
+
+def check_query_plans(db: Session) -> list:
+    """Retorna (nome, plano, ok) para cada consulta de listagem"""
+    return [(name, plan, uses_index(plan)) for name, plan in ((n, explain(db, q)) for n, q in list_queries())]
+
+
+def main() -> int:
+    db = SessionLocal()
+    try:
+        if db.bind.dialect.name != "sqlite":
+            print("Verificação disponível apenas para SQLite")
+            return 0
+        results = check_query_plans(db)
+    finally:
+        db.close()
+
+    for name, plan, ok in results:
+        print(f"[{'OK' if ok else 'FALHA'}] {name}: {' | '.join(plan)}")
+    return 0 if all(ok for _, _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
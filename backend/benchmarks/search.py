@@ -0,0 +1,105 @@
+"""
+Benchmark: latência da busca textual com muitos artigos indexados
+
+Uso: python -m benchmarks.search [--rows 100000] [--queries 200] [--uniform]
+Cria um banco SQLite temporário com as migrações e mede app.services.search.search.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+WORDS = (
+    "educação saúde cultura moda música cinema teatro política economia esporte "
+    "literatura arte fotografia viagem gastronomia tecnologia ciência história "
+    "cidade praia verão inverno festa carnaval memória mulheres juventude trabalho"
+).split()
+
+QUERIES = ["educacao", "saúde", "carnaval praia", "fotog", "história arte", "moda verão", "mu"]
+
+# Vocabulário com distribuição de Zipf: as palavras reais ficam entre as ~100 mais
+# frequentes e aparecem em cerca de 15% dos textos; --uniform usa só elas (pior caso)
+VOCABULARY_SIZE = 20_000
+REAL_WORDS_RANK = 100
+
+
+def vocabulary(uniform: bool):
+    """Retorna as palavras e os pesos acumulados usados para gerar os textos"""
+    if uniform:
+        return WORDS, None
+    words = [f"termo{i}" for i in range(VOCABULARY_SIZE)]
+    words[REAL_WORDS_RANK:REAL_WORDS_RANK + len(WORDS)] = WORDS
+    cum_weights, total = [], 0.0
+    for rank in range(1, VOCABULARY_SIZE + 1):
+        total += 1 / rank
+        cum_weights.append(total)
+    return words, cum_weights
+
+
+def seed(database_url: str, rows: int, uniform: bool = False) -> None:
+    """Aplica as migrações e popula o índice de busca"""
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import insert
+
+    from app.database import create_db_engine
+    from app.models import SearchDocument
+
+    command.upgrade(Config(str(Path(__file__).resolve().parent.parent / "alembic.ini")), "head")
+    engine = create_db_engine(database_url)
+    rng = random.Random(42)
+    words, cum_weights = vocabulary(uniform)
+    with engine.begin() as conn:
+        for start in range(0, rows, 5000):
+            conn.execute(insert(SearchDocument), [
+                {
+                    "entity_type": "article",
+                    "entity_id": f"{i:036d}",
+                    "is_published": i % 10 != 0,
+                    "title": " ".join(rng.choices(words, cum_weights=cum_weights, k=5)),
+                    "body": " ".join(rng.choices(words, cum_weights=cum_weights, k=150)),
+                }
+                for i in range(start, min(start + 5000, rows))
+            ])
+    engine.dispose()
+
+
+async def measure(queries: int) -> list:
+    """Executa as buscas e retorna as latências em milissegundos"""
+    from app.database import AsyncReadSessionLocal
+    from app.services.search import search
+
+    latencies = []
+    async with AsyncReadSessionLocal() as db:
+        for i in range(queries):
+            started = time.perf_counter()
+            await search(db, QUERIES[i % len(QUERIES)], None, 21, 0)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--uniform", action="store_true", help="Todas as palavras em todos os textos")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A configuração é lida na importação de app.database
+        database_url = f"sqlite:///{Path(tmp) / 'search.db'}"
+        os.environ["DATABASE_URL"] = database_url
+        seed(database_url, args.rows, args.uniform)
+        latencies = sorted(asyncio.run(measure(args.queries)))
+
+    print(f"documentos: {args.rows}  buscas: {args.queries}")
+    print(f"mediana: {statistics.median(latencies):.2f} ms")
+    print(f"p95:     {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
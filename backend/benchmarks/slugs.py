@@ -0,0 +1,150 @@
+"""
+Benchmark: geração de slugs e busca por id ou slug
+
+Uso: python -m benchmarks.slugs [--titles 100000] [--rows 50000] [--lookups 2000]
+Compara a geração atual (app.services.slugs) com a antiga de nove re.sub por chamada e,
+em um banco SQLite temporário, a busca com OR entre id e slug com a busca pela coluna provável.
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+TITLES = (
+    "Edição de Verão: moda praia", "Cultura & Memória — 50 anos", "São João na Bahia",
+    "Entrevista com a diretora", "Música popular brasileira", "Crônica: a cidade à noite",
+    "Fotografia e cinema", "Gastronomia nordestina", "Tecnologia na educação", "Carnaval 2026!",
+)
+
+
+def legacy_slug(title: str) -> str:
+    """Geração anterior, mantida só como referência do benchmark"""
+    slug = title.lower()
+    slug = re.sub(r'[àáâãäå]', 'a', slug)
+    slug = re.sub(r'[èéêë]', 'e', slug)
+    slug = re.sub(r'[ìíîï]', 'i', slug)
+    slug = re.sub(r'[òóôõö]', 'o', slug)
+    slug = re.sub(r'[ùúûü]', 'u', slug)
+    slug = re.sub(r'[ç]', 'c', slug)
+    slug = re.sub(r'[^a-z0-9\s-]', '', slug)
+    slug = re.sub(r'[\s_]+', '-', slug)
+    slug = re.sub(r'-+', '-', slug)
+    return slug.strip('-')
+
+
+def time_per_call(func, titles: list) -> float:
+    """Tempo médio por chamada em microssegundos"""
+    started = time.perf_counter()
+    for title in titles:
+        func(title)
+    return (time.perf_counter() - started) / len(titles) * 1e6
+
+
+def seed(database_url: str, rows: int) -> list:
+    """Aplica as migrações e cria artigos com slugs repetidos (base, base-2, base-3...)"""
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import insert
+
+    from app.database import create_db_engine
+    from app.models import Article
+
+    command.upgrade(Config(str(Path(__file__).resolve().parent.parent / "alembic.ini")), "head")
+    engine = create_db_engine(database_url)
+    slugs = []
+    with engine.begin() as conn:
+        for start in range(0, rows, 5000):
+            batch = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "title": f"Artigo {i}",
+                    "slug": f"artigo-{i // 10}" + (f"-{i % 10 + 1}" if i % 10 else ""),
+                    "is_published": True,
+                    "is_featured": False,
+                }
+                for i in range(start, min(start + 5000, rows))
+            ]
+            conn.execute(insert(Article), batch)
+            slugs += [row["slug"] for row in batch]
+    engine.dispose()
+    return slugs
+
+
+async def measure_lookups(keys: list) -> tuple:
+    """Latências (ms) da busca com OR e da busca pela coluna provável"""
+    from sqlalchemy import select
+
+    from app.database import AsyncReadSessionLocal
+    from app.models import Article
+    from app.services.slugs import find_version
+
+    with_or, split = [], []
+    async with AsyncReadSessionLocal() as db:
+        for key in keys:
+            started = time.perf_counter()
+            (await db.execute(select(Article.id, Article.updated_at).where(
+                (Article.id == key) | (Article.slug == key)
+            ))).first()
+            with_or.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            await find_version(db, Article, key)
+            split.append((time.perf_counter() - started) * 1000)
+    return with_or, split
+
+
+async def measure_collisions(bases: list) -> list:
+    """Latências (ms) da escolha de um sufixo livre com a consulta por faixa"""
+    from app.database import AsyncReadSessionLocal
+    from app.models import Article
+    from app.services.slugs import unique_slug
+
+    latencies = []
+    async with AsyncReadSessionLocal() as db:
+        for base in bases:
+            started = time.perf_counter()
+            await unique_slug(db, Article, base)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=100_000)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    from app.services.slugs import generate_slug
+
+    titles = [TITLES[i % len(TITLES)] + f" {i}" for i in range(args.titles)]
+    print(f"geração ({args.titles} títulos)")
+    print(f"  anterior: {time_per_call(legacy_slug, titles):.2f} µs/chamada")
+    print(f"  atual:    {time_per_call(generate_slug, titles):.2f} µs/chamada")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A configuração é lida na importação de app.database
+        database_url = f"sqlite:///{Path(tmp) / 'slugs.db'}"
+        os.environ["DATABASE_URL"] = database_url
+        slugs = seed(database_url, args.rows)
+        rng = random.Random(42)
+        # Metade das buscas por slug; a outra metade por ids inexistentes (pior caso: duas consultas)
+        keys = rng.sample(slugs, min(args.lookups, len(slugs)) // 2)
+        keys += [str(uuid.uuid4()) for _ in range(len(keys))]
+        with_or, split = asyncio.run(measure_lookups(keys))
+        collisions = asyncio.run(measure_collisions([f"artigo-{rng.randrange(args.rows // 10)}" for _ in keys]))
+
+    print(f"busca por slug ({args.rows} artigos, {len(keys)} buscas, mediana)")
+    print(f"  id OR slug:      {statistics.median(with_or):.3f} ms")
+    print(f"  coluna provável: {statistics.median(split):.3f} ms")
+    print(f"  sufixo livre:    {statistics.median(collisions):.3f} ms (10 slugs por base)")
+
+
+if __name__ == "__main__":
+    main()
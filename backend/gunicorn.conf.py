@@ -0,0 +1,27 @@
+"""
+Configuração do gunicorn: as métricas do Prometheus de todos os workers são gravadas em
+PROMETHEUS_MULTIPROC_DIR e somadas em /metrics
+"""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+worker_class = "uvicorn.workers.UvicornWorker"
+
+
+def on_starting(server):
+    # Definida antes de criar os workers, que a herdam ao importar o prometheus_client
+    directory = Path(os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR", str(Path(tempfile.gettempdir()) / "carlota-mag-metrics")
+    ))
+    # Arquivos de uma execução anterior somariam valores de processos que já não existem
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    # Descarta os gauges (requisições em andamento) do worker encerrado
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,62 @@
+"""
+Ambiente do Alembic - executa as migrações com a URL de app.config
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.config import settings
+from app.database import Base, normalize_database_url
+import app.models  # noqa: F401 - registra os modelos no metadata
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Ignora no autogenerate os objetos da busca criados com SQL próprio (FTS5 e tsvector)"""
+    if type_ == "table" and name.startswith(("search_fts", "magazine_pages_fts")):
+        return False
+    if type_ == "column" and name == "document" and obj.table.name in ("search_documents", "magazine_pages"):
+        return False
+    if type_ == "index" and name in ("ix_search_documents_document", "ix_magazine_pages_document"):
+        return False
+    return True
+
+
+def run_migrations_offline():
+    """Gera o SQL das migrações sem conectar ao banco"""
+    context.configure(
+        url=normalize_database_url(settings.DATABASE_URL),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        include_object=include_object,
+        render_as_batch=settings.DATABASE_URL.startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Aplica as migrações no banco configurado"""
+    connectable = create_engine(normalize_database_url(settings.DATABASE_URL), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
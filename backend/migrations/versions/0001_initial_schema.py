@@ -0,0 +1,95 @@
+"""
+Esquema inicial (tabelas criadas antes pelo Base.metadata.create_all)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bancos já existentes foram criados pelo create_all: só cria o que faltar
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "magazines" not in existing:
+        op.create_table(
+            "magazines",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("title", sa.String(255), nullable=False),
+            sa.Column("edition", sa.String(50), nullable=True),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("pdf_url", sa.String(500), nullable=True),
+            sa.Column("cover_image", sa.String(500), nullable=True),
+            sa.Column("publish_date", sa.Date(), nullable=True),
+            sa.Column("is_published", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+
+    if "articles" not in existing:
+        op.create_table(
+            "articles",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("title", sa.String(255), nullable=False),
+            sa.Column("slug", sa.String(255), nullable=False, unique=True),
+            sa.Column("excerpt", sa.Text(), nullable=True),
+            sa.Column("content", sa.Text(), nullable=True),
+            sa.Column("cover_image", sa.String(500), nullable=True),
+            sa.Column("category", sa.String(100), nullable=True),
+            sa.Column("author", sa.String(100), nullable=True),
+            sa.Column("publish_date", sa.Date(), nullable=True),
+            sa.Column("is_published", sa.Boolean(), nullable=True),
+            sa.Column("is_featured", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+
+    if "services" not in existing:
+        op.create_table(
+            "services",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("title", sa.String(255), nullable=False),
+            sa.Column("slug", sa.String(255), nullable=False, unique=True),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("icon", sa.String(100), nullable=True),
+            sa.Column("image", sa.String(500), nullable=True),
+            sa.Column("order", sa.Integer(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+
+    if "contacts" not in existing:
+        op.create_table(
+            "contacts",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("name", sa.String(255), nullable=False),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("phone", sa.String(50), nullable=True),
+            sa.Column("subject", sa.String(255), nullable=True),
+            sa.Column("message", sa.Text(), nullable=False),
+            sa.Column("is_read", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+
+    if "cache_generations" not in existing:
+        op.create_table(
+            "cache_generations",
+            sa.Column("namespace", sa.String(50), primary_key=True),
+            sa.Column("generation", sa.Integer(), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table("cache_generations")
+    op.drop_table("contacts")
+    op.drop_table("services")
+    op.drop_table("articles")
+    op.drop_table("magazines")
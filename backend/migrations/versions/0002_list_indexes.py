@@ -0,0 +1,40 @@
+"""
+Índices compostos para os filtros e ordenações das listagens
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_magazines_published_order", "magazines", ["is_published", "publish_date", "created_at", "id"])
+    op.create_index("ix_magazines_order", "magazines", ["publish_date", "created_at", "id"])
+
+    op.create_index("ix_articles_published_order", "articles", ["is_published", "publish_date", "created_at", "id"])
+    op.create_index("ix_articles_featured", "articles", ["is_published", "is_featured", "publish_date"])
+    op.create_index("ix_articles_order", "articles", ["publish_date", "created_at", "id"])
+
+    op.create_index("ix_services_active_order", "services", ["is_active", "order"])
+    op.create_index("ix_services_order", "services", ["order"])
+
+    op.create_index("ix_contacts_unread_order", "contacts", ["is_read", "created_at", "id"])
+    op.create_index("ix_contacts_order", "contacts", ["created_at", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_contacts_order", table_name="contacts")
+    op.drop_index("ix_contacts_unread_order", table_name="contacts")
+    op.drop_index("ix_services_order", table_name="services")
+    op.drop_index("ix_services_active_order", table_name="services")
+    op.drop_index("ix_articles_order", table_name="articles")
+    op.drop_index("ix_articles_featured", table_name="articles")
+    op.drop_index("ix_articles_published_order", table_name="articles")
+    op.drop_index("ix_magazines_order", table_name="magazines")
+    op.drop_index("ix_magazines_published_order", table_name="magazines")
@@ -0,0 +1,84 @@
+"""
+Índice de busca textual de artigos e revistas (FTS5 no SQLite, tsvector no Postgres)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Remoção de acentos no Postgres sem depender da extensão unaccent (precisa ser imutável)
+ACCENTS = "áàâãäåéèêëíìîïóòôõöúùûüçñ"
+PLAIN = "aaaaaaeeeeiiiiooooouuuucn"
+
+
+def upgrade():
+    op.create_table(
+        "search_documents",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("entity_type", sa.String(20), nullable=False),
+        sa.Column("entity_id", sa.String(36), nullable=False),
+        sa.Column("is_published", sa.Boolean(), nullable=False),
+        sa.Column("title", sa.Text(), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.UniqueConstraint("entity_type", "entity_id", name="uq_search_documents_entity"),
+    )
+
+    if op.get_bind().dialect.name == "sqlite":
+        # Tabela FTS5 de conteúdo externo, sincronizada por triggers; os índices de
+        # prefixo evitam juntar as listas de muitos termos em buscas com poucas letras
+        op.execute(
+            "CREATE VIRTUAL TABLE search_fts USING fts5("
+            "title, body, content='search_documents', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        op.execute("INSERT INTO search_fts(search_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+        op.execute(
+            "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+            "INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END"
+        )
+        op.execute(
+            "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+            "INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END"
+        )
+        op.execute(
+            "CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+            "INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+            "INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END"
+        )
+    else:
+        # Título com peso A e corpo com peso B, sem acentos, com o dicionário português
+        op.execute(
+            "ALTER TABLE search_documents ADD COLUMN document tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('portuguese'::regconfig, translate(lower(title), '{ACCENTS}', '{PLAIN}')), 'A') || "
+            f"setweight(to_tsvector('portuguese'::regconfig, translate(lower(body), '{ACCENTS}', '{PLAIN}')), 'B')"
+            ") STORED"
+        )
+        op.execute("CREATE INDEX ix_search_documents_document ON search_documents USING gin (document)")
+
+    # Indexa o conteúdo já existente
+    op.execute(
+        "INSERT INTO search_documents (entity_type, entity_id, is_published, title, body) "
+        "SELECT 'article', id, coalesce(is_published, false), title, coalesce(excerpt, '') || ' ' || coalesce(content, '') "
+        "FROM articles"
+    )
+    op.execute(
+        "INSERT INTO search_documents (entity_type, entity_id, is_published, title, body) "
+        "SELECT 'magazine', id, coalesce(is_published, false), title, coalesce(edition, '') || ' ' || coalesce(description, '') "
+        "FROM magazines"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS search_documents_au")
+        op.execute("DROP TRIGGER IF EXISTS search_documents_ad")
+        op.execute("DROP TRIGGER IF EXISTS search_documents_ai")
+        op.execute("DROP TABLE IF EXISTS search_fts")
+    op.drop_table("search_documents")
@@ -0,0 +1,78 @@
+"""
+Texto das páginas dos PDFs das revistas, com índice de busca por página
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Mesma remoção de acentos da migração 0003
+ACCENTS = "áàâãäåéèêëíìîïóòôõöúùûüçñ"
+PLAIN = "aaaaaaeeeeiiiiooooouuuucn"
+
+
+def upgrade():
+    with op.batch_alter_table("magazines") as batch:
+        batch.add_column(sa.Column("text_status", sa.String(20), nullable=True))
+        batch.add_column(sa.Column("page_count", sa.Integer(), nullable=True))
+        batch.add_column(sa.Column("text_locked_until", sa.DateTime(), nullable=True))
+
+    op.create_table(
+        "magazine_pages",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("magazine_id", sa.String(36), sa.ForeignKey("magazines.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("page_number", sa.Integer(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.UniqueConstraint("magazine_id", "page_number", name="uq_magazine_pages_page"),
+    )
+
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE magazine_pages_fts USING fts5("
+            "text, content='magazine_pages', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        op.execute(
+            "CREATE TRIGGER magazine_pages_ai AFTER INSERT ON magazine_pages BEGIN "
+            "INSERT INTO magazine_pages_fts(rowid, text) VALUES (new.id, new.text); END"
+        )
+        op.execute(
+            "CREATE TRIGGER magazine_pages_ad AFTER DELETE ON magazine_pages BEGIN "
+            "INSERT INTO magazine_pages_fts(magazine_pages_fts, rowid, text) VALUES ('delete', old.id, old.text); END"
+        )
+        op.execute(
+            "CREATE TRIGGER magazine_pages_au AFTER UPDATE ON magazine_pages BEGIN "
+            "INSERT INTO magazine_pages_fts(magazine_pages_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+            "INSERT INTO magazine_pages_fts(rowid, text) VALUES (new.id, new.text); END"
+        )
+    else:
+        op.execute(
+            "ALTER TABLE magazine_pages ADD COLUMN document tsvector GENERATED ALWAYS AS ("
+            f"to_tsvector('portuguese'::regconfig, translate(lower(text), '{ACCENTS}', '{PLAIN}'))"
+            ") STORED"
+        )
+        op.execute("CREATE INDEX ix_magazine_pages_document ON magazine_pages USING gin (document)")
+
+    # Edições já cadastradas entram na fila de extração
+    op.execute("UPDATE magazines SET text_status = 'pending' WHERE pdf_url IS NOT NULL AND pdf_url <> ''")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS magazine_pages_au")
+        op.execute("DROP TRIGGER IF EXISTS magazine_pages_ad")
+        op.execute("DROP TRIGGER IF EXISTS magazine_pages_ai")
+        op.execute("DROP TABLE IF EXISTS magazine_pages_fts")
+    op.drop_table("magazine_pages")
+
+    with op.batch_alter_table("magazines") as batch:
+        batch.drop_column("text_locked_until")
+        batch.drop_column("page_count")
+        batch.drop_column("text_status")
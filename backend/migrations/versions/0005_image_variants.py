@@ -0,0 +1,39 @@
+"""
+Derivados redimensionados das imagens de capa
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "image_assets",
+        sa.Column("url", sa.String(500), primary_key=True),
+        sa.Column("variants", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    with op.batch_alter_table("magazines") as batch:
+        batch.add_column(sa.Column("cover_variants", sa.JSON(), nullable=True))
+    with op.batch_alter_table("articles") as batch:
+        batch.add_column(sa.Column("cover_variants", sa.JSON(), nullable=True))
+    with op.batch_alter_table("services") as batch:
+        batch.add_column(sa.Column("image_variants", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("services") as batch:
+        batch.drop_column("image_variants")
+    with op.batch_alter_table("articles") as batch:
+        batch.drop_column("cover_variants")
+    with op.batch_alter_table("magazines") as batch:
+        batch.drop_column("cover_variants")
+    op.drop_table("image_assets")
@@ -0,0 +1,36 @@
+"""
+Arquivos enviados endereçados pelo conteúdo, com contagem de referências
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Arquivos enviados antes desta revisão ficam fora da contagem e nunca são removidos
+    op.create_table(
+        "stored_files",
+        sa.Column("backend", sa.String(20), primary_key=True),
+        sa.Column("key", sa.String(500), primary_key=True),
+        sa.Column("url", sa.String(500), nullable=False, unique=True),
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("content_type", sa.String(100), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("last_uploaded_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_stored_files_unreferenced", "stored_files", ["ref_count", "last_uploaded_at"])
+
+
+def downgrade():
+    op.drop_index("ix_stored_files_unreferenced", table_name="stored_files")
+    op.drop_table("stored_files")
@@ -0,0 +1,65 @@
+"""
+Fila de jobs em segundo plano
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+import uuid
+from datetime import datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    jobs = op.create_table(
+        "jobs",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("kind", sa.String(50), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("run_at", sa.DateTime(), nullable=False),
+        sa.Column("locked_by", sa.String(100), nullable=True),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("dedupe_key", sa.String(100), nullable=True, unique=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_jobs_ready", "jobs", ["status", "run_at"])
+    op.create_index("ix_jobs_order", "jobs", ["created_at", "id"])
+
+    # As extrações pendentes eram retomadas por varredura da tabela de revistas: viram jobs
+    pending = op.get_bind().execute(sa.text(
+        "SELECT id FROM magazines WHERE text_status IN ('pending', 'processing')"
+    )).scalars().all()
+    now = datetime.utcnow()
+    op.bulk_insert(jobs, [
+        {
+            "id": uuid.uuid4().hex,
+            "kind": "pdf_text",
+            "payload": {"magazine_id": magazine_id},
+            "status": "pending",
+            "attempts": 0,
+            "max_attempts": 5,
+            "run_at": now,
+            "dedupe_key": f"pdf_text:{magazine_id}",
+            "created_at": now,
+        }
+        for magazine_id in pending
+    ])
+
+
+def downgrade():
+    op.drop_index("ix_jobs_order", table_name="jobs")
+    op.drop_index("ix_jobs_ready", table_name="jobs")
+    op.drop_table("jobs")
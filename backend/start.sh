@@ -1,3 +1,7 @@
 #!/bin/bash
 PORT="${PORT:-8000}"
+
+# Aplica as migrações uma única vez, antes de iniciar os workers
+alembic upgrade head || exit 1
+
 exec uvicorn app.main:app --host 0.0.0.0 --port "$PORT"
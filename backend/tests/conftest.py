@@ -0,0 +1,64 @@
+"""
+Configuração dos testes: banco SQLite e pasta de uploads temporários, com o S3 simulado pelo moto.
+
+As variáveis de ambiente precisam estar definidas antes da importação de app.config (lidas uma
+única vez), por isso ficam no topo deste arquivo.
+"""
+import os
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix="carlota-tests-")
+TEST_BUCKET = "carlota-tests"
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{TEST_DIR}/test.db",
+    "DATABASE_READ_URL": "",
+    "UPLOAD_DIR": f"{TEST_DIR}/uploads",
+    "STORAGE_CACHE_MAX_MB": "0",
+    "JOB_WORKERS_IN_PROCESS": "false",
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_S3_BUCKET": TEST_BUCKET,
+    "AWS_S3_REGION": "us-east-1",
+    "AWS_S3_ENDPOINT_URL": "",
+    "CLOUDINARY_CLOUD_NAME": "",
+})
+
+import boto3
+import httpx
+import pytest
+from alembic import command
+from alembic.config import Config
+from moto import mock_aws
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def s3():
+    """S3 simulado (vale para as chamadas feitas em qualquer thread, inclusive nos executores)"""
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=TEST_BUCKET)
+        yield client
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Aplica as migrações no banco temporário"""
+    command.upgrade(Config(os.path.join(BACKEND_DIR, "alembic.ini")), "head")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    """Cliente HTTP assíncrono ligado direto à aplicação (sem servidor)"""
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
@@ -0,0 +1,85 @@
+"""
+Importação em lote pela API
+"""
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import DataError
+
+from app.config import settings
+from app.routers import magazines
+from app.services import bulk
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+@pytest.mark.anyio
+async def test_ndjson_stops_reading_past_the_row_limit(client, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_MAX_ROWS", 3)
+    sent = 0
+
+    async def body():
+        nonlocal sent
+        for n in range(100):
+            sent += 1
+            yield json.dumps({"title": f"Edição {n}"}).encode() + b"\n"
+
+    response = await client.post("/api/magazines/bulk", content=body(), headers=NDJSON)
+    assert response.status_code == 413
+    assert sent < 10
+
+
+@pytest.mark.anyio
+async def test_magazine_rows_rejected_by_the_database_are_reported_per_row(client, monkeypatch):
+    # Mesmo id para todas as linhas: o banco recusa o lote e, linha a linha, só a segunda
+    fixed = uuid.uuid4()
+    monkeypatch.setattr(bulk, "uuid", SimpleNamespace(uuid4=lambda: fixed))
+    rows = [{"title": "Edição de março"}, {"title": "Edição de abril"}]
+
+    atomic = await client.post("/api/magazines/bulk", params={"atomic": True}, json=rows)
+    assert atomic.status_code == 409
+
+    response = await client.post("/api/magazines/bulk", json=rows)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["created"] == 1 and result["failed"] == 1
+    assert [(hit["row"], hit["id"]) for hit in result["results"]] == [(1, str(fixed)), (2, None)]
+    assert result["results"][1]["error"]
+
+
+@pytest.mark.anyio
+async def test_article_slug_taken_after_allocation_is_reallocated(client, monkeypatch):
+    await client.post("/api/articles", json={"title": "Nota da redação"})
+    allocate = bulk.allocate_slugs
+    calls = 0
+
+    async def stale_allocation(db, model, bases, exclude_id=None):
+        # A primeira consulta não vê o slug gravado por outra requisição
+        nonlocal calls
+        calls += 1
+        bases = list(bases)
+        return bases if calls == 1 else await allocate(db, model, bases, exclude_id)
+
+    monkeypatch.setattr(bulk, "allocate_slugs", stale_allocation)
+    response = await client.post("/api/articles/bulk", json=[{"title": "Nota da redação"}, {"title": "Expediente"}])
+    assert response.json()["created"] == 2
+    slugs = {(await client.get(f"/api/articles/{hit['id']}")).json()["slug"] for hit in response.json()["results"]}
+    assert slugs == {"nota-da-redacao-2", "expediente"}
+
+
+@pytest.mark.anyio
+async def test_data_error_on_one_row_is_reported_for_that_row(client, monkeypatch):
+    async def insert_rejecting_long_titles(db, items):
+        # Como o Postgres com um valor maior que o varchar da coluna
+        if any(len(item.title) > 20 for item in items):
+            raise DataError("INSERT INTO magazines ...", {}, Exception("value too long for type character varying(20)"))
+        return await bulk.insert_magazines(db, items)
+
+    monkeypatch.setattr(magazines, "insert_magazines", insert_rejecting_long_titles)
+    response = await client.post("/api/magazines/bulk", json=[{"title": "Edição curta"}, {"title": "Edição" * 10}])
+    assert response.status_code == 200
+    result = response.json()
+    assert result["created"] == 1 and result["failed"] == 1
+    assert "value too long" in result["results"][1]["error"]
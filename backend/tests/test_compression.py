@@ -0,0 +1,28 @@
+"""
+Compressão das respostas e o cabeçalho Vary em todas as versões
+"""
+import pytest
+
+
+@pytest.mark.anyio
+async def test_cached_list_varies_on_encoding_with_and_without_compression(client):
+    for order in range(20):
+        await client.post("/api/services", json={
+            "title": f"Serviço de revisão {order}", "description": "Leitura crítica e preparação de originais",
+            "order": order,
+        })
+
+    plain = await client.get("/api/services", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    compressed = await client.get("/api/services", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.json() == plain.json()
+
+
+@pytest.mark.anyio
+async def test_uncompressed_json_varies_on_encoding(client):
+    response = await client.get("/api/magazines", headers={"Accept-Encoding": "identity"})
+    assert response.headers["vary"] == "Accept-Encoding"
@@ -0,0 +1,60 @@
+"""
+Cache em disco na frente dos backends remotos
+"""
+import asyncio
+
+import pytest
+
+from app.services.storage import DiskCache
+
+
+class SlowOrigin:
+    """Origem de teste: cada download demora e fica registrado"""
+
+    def __init__(self):
+        self.downloads = []
+
+    async def get(self, key, destination):
+        self.downloads.append(key)
+        await asyncio.sleep(0.05)
+        destination.write_bytes(b"%PDF-" + key.encode())
+
+
+@pytest.mark.anyio
+async def test_concurrent_reads_share_one_download_and_release_the_lock(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=1024 * 1024)
+    origin = SlowOrigin()
+
+    paths = await asyncio.gather(*(cache.fetch("pdfs/a.pdf", origin) for _ in range(5)))
+    assert origin.downloads == ["pdfs/a.pdf"]
+    assert {path.read_bytes() for path in paths} == {b"%PDF-pdfs/a.pdf"}
+    assert cache._fills == {} and cache._fill_users == {}
+    assert (await cache.stats())["misses"] == 1
+
+
+@pytest.mark.anyio
+async def test_index_is_rebuilt_from_existing_files(tmp_path):
+    (tmp_path / "pdfs").mkdir()
+    (tmp_path / "pdfs" / "b.pdf").write_bytes(b"x" * 10)
+    (tmp_path / "pdfs" / "c.pdf.1a2b3c4d.part").write_bytes(b"x" * 99)
+
+    stats = await DiskCache(tmp_path, max_bytes=1024).stats()
+    assert stats["files"] == 1 and stats["bytes"] == 10
+
+
+@pytest.mark.anyio
+async def test_least_recently_used_copy_is_evicted(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=40)
+    origin = SlowOrigin()
+
+    first = await cache.fetch("pdfs/a.pdf", origin)
+    await cache.fetch("pdfs/b.pdf", origin)
+    await cache.fetch("pdfs/a.pdf", origin)  # a passa a ser a mais recente
+    await cache.fetch("pdfs/c.pdf", origin)
+
+    assert first.exists() and not (tmp_path / "pdfs" / "b.pdf").exists()
+    assert (await cache.stats())["files"] == 2
+
+    await cache.discard("pdfs/a.pdf")
+    assert not first.exists()
+    assert await cache.fetch("pdfs/a.pdf", origin) == first and origin.downloads.count("pdfs/a.pdf") == 2
@@ -0,0 +1,19 @@
+"""
+Pool de processos para o trabalho de CPU
+"""
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services import executors
+
+
+@pytest.mark.anyio
+async def test_pool_is_replaced_after_a_worker_dies():
+    try:
+        with pytest.raises(BrokenProcessPool):
+            await executors.run_in_process(os._exit, 1)
+        assert await executors.run_in_process(pow, 2, 10) == 1024
+    finally:
+        executors.shutdown_process_pool()
@@ -0,0 +1,12 @@
+"""
+Exportação em NDJSON/CSV
+"""
+import pytest
+
+
+@pytest.mark.anyio
+async def test_csv_export_has_single_charset(client):
+    response = await client.get("/api/magazines/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"].startswith('attachment; filename="magazines-')
@@ -0,0 +1,37 @@
+"""
+Respostas de arquivo (stat fora do event loop)
+"""
+from pathlib import Path
+
+import pytest
+
+from app.config import settings
+from app.services.file_response import stat_file
+
+
+@pytest.mark.anyio
+async def test_stat_file_only_returns_existing_regular_files(tmp_path):
+    path = tmp_path / "pagina-1.webp"
+    path.write_bytes(b"RIFF")
+    assert (await stat_file(path)).st_size == 4
+    assert await stat_file(tmp_path / "ausente.webp") is None
+    assert await stat_file(tmp_path) is None
+
+
+@pytest.mark.anyio
+async def test_magazine_pdf_is_served_from_disk_and_redirects_when_missing(client):
+    path = Path(settings.UPLOAD_DIR) / "pdfs" / "edicao-teste.pdf"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"%PDF-1.4 conteudo")
+    created = await client.post("/api/magazines", json={
+        "title": "Edição servida do disco", "pdf_url": "/uploads/pdfs/edicao-teste.pdf",
+    })
+    url = f"/api/magazines/{created.json()['id']}/pdf"
+
+    response = await client.get(url, headers={"Range": "bytes=0-4"})
+    assert response.status_code == 206 and response.content == b"%PDF-"
+
+    path.unlink()
+    response = await client.get(url)
+    assert response.status_code == 307
+    assert response.headers["location"] == "/uploads/pdfs/edicao-teste.pdf"
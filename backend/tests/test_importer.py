@@ -0,0 +1,45 @@
+"""
+Importador em lote pela linha de comando (python -m app.importer)
+"""
+import io
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app import importer
+from app.importer import import_file
+from app.services import bulk
+
+
+@pytest.mark.anyio
+async def test_rows_rejected_by_the_database_do_not_drop_the_batch(tmp_path, monkeypatch, capsys):
+    # Mesmo id para todas as linhas: o lote é recusado e, linha a linha, só a primeira passa
+    monkeypatch.setattr(bulk, "uuid", SimpleNamespace(uuid4=lambda fixed=uuid.uuid4(): fixed))
+    path = tmp_path / "revistas.ndjson"
+    path.write_text("\n".join(json.dumps({"title": f"Edição {n}"}) for n in range(3)))
+
+    assert await import_file("magazines", str(path), batch_size=10, dry_run=False) == (1, 2)
+    stderr = capsys.readouterr().err
+    assert "linha 2:" in stderr and "linha 3:" in stderr
+
+
+def test_json_array_cut_at_every_position_and_invalid_elements(monkeypatch):
+    text = '[{"title": "Edição, [1]"}, {"title": tru}, {"n": -12.5e3}, {"a": 1 "b": 2}, "\\"x\\"", 123]'
+    for read_size in range(1, len(text) + 1):
+        monkeypatch.setattr(importer, "READ_SIZE", read_size)
+        rows = list(importer.iter_json_array(io.StringIO(text)))
+        values = [None if isinstance(value, json.JSONDecodeError) else value for _, value in rows]
+        assert [row for row, _ in rows] == [1, 2, 3, 4, 5, 6]
+        assert values == [{"title": "Edição, [1]"}, None, {"n": -12.5e3}, None, '"x"', 123]
+
+
+def test_invalid_json_element_does_not_read_the_rest_of_the_file(monkeypatch):
+    monkeypatch.setattr(importer, "READ_SIZE", 64)
+    file = io.StringIO('[{"title": oops}, ' + ", ".join('{"title": "Edição"}' for _ in range(10000)) + "]")
+    rows = importer.iter_json_array(file)
+    row, error = next(rows)
+    assert row == 1 and isinstance(error, json.JSONDecodeError)
+    assert file.tell() <= 128
+    assert sum(1 for _ in rows) == 10000
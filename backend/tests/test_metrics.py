@@ -0,0 +1,14 @@
+"""
+Endpoint /metrics no formato do Prometheus
+"""
+import pytest
+from prometheus_client import CONTENT_TYPE_LATEST
+
+
+@pytest.mark.anyio
+async def test_metrics_content_type_and_route_labels(client):
+    await client.get("/api/articles/nao-existe")
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE_LATEST
+    assert 'http_requests_total{method="GET",route="/api/articles/{article_id}",status="404"}' in response.text
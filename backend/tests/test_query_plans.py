@@ -0,0 +1,17 @@
+"""
+Planos das consultas de listagem (EXPLAIN QUERY PLAN no SQLite): cada uma deve buscar e
+ordenar pelo índice, sem varredura completa nem ordenação temporária
+"""
+import pytest
+
+from app.database import SessionLocal
+from benchmarks.query_plans import explain, list_queries, uses_index
+
+QUERIES = dict(list_queries())
+
+
+@pytest.mark.parametrize("name", list(QUERIES))
+def test_listing_query_uses_an_index(name):
+    with SessionLocal() as db:
+        plan = explain(db, QUERIES[name])
+    assert uses_index(plan), " | ".join(plan)
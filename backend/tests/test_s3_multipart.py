@@ -0,0 +1,99 @@
+"""
+Upload multipart paralelo para o S3 (simulado pelo moto)
+"""
+import os
+import threading
+
+import pytest
+from botocore.exceptions import ClientError
+from conftest import TEST_BUCKET
+
+from app.config import settings
+from app.services import s3_multipart
+from app.services.s3_multipart import MIN_PART_SIZE, multipart_upload
+from app.services.storage import S3Storage
+
+SIZE = 2 * MIN_PART_SIZE + 1024  # Três partes, a última menor
+
+
+class FlakyClient:
+    """Cliente S3 em que o envio de uma parte falha as primeiras `failures` vezes"""
+
+    def __init__(self, client, part_number: int, failures: int):
+        self.client = client
+        self.part_number = part_number
+        self.failures = failures
+        self.attempts = 0
+        self.aborted = []
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def upload_part(self, **kwargs):
+        if kwargs["PartNumber"] == self.part_number:
+            with self._lock:
+                self.attempts += 1
+                failing = self.attempts <= self.failures
+            if failing:
+                raise ClientError({"Error": {"Code": "SlowDown", "Message": "Reduza a taxa"}}, "UploadPart")
+        return self.client.upload_part(**kwargs)
+
+    def abort_multipart_upload(self, **kwargs):
+        self.aborted.append(kwargs["UploadId"])
+        return self.client.abort_multipart_upload(**kwargs)
+
+
+@pytest.fixture
+def large_file(tmp_path):
+    path = tmp_path / "edicao.pdf"
+    content = os.urandom(SIZE)
+    path.write_bytes(content)
+    return path, content
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(s3_multipart.time, "sleep", lambda seconds: None)
+
+
+def upload(client, key, path, max_retries):
+    multipart_upload(client, TEST_BUCKET, key, path, SIZE, "application/pdf",
+                     part_size=MIN_PART_SIZE, max_concurrency=3, max_retries=max_retries)
+
+
+def pending_uploads(s3, key):
+    return s3.list_multipart_uploads(Bucket=TEST_BUCKET, Prefix=key).get("Uploads", [])
+
+
+@pytest.mark.anyio
+async def test_large_put_is_reassembled_byte_for_byte(s3, large_file, monkeypatch):
+    monkeypatch.setattr(settings, "S3_MULTIPART_THRESHOLD_MB", 5)
+    monkeypatch.setattr(settings, "S3_MULTIPART_PART_SIZE_MB", 5)
+    path, content = large_file
+
+    await S3Storage().put("tests/multipart.pdf", path, SIZE, "application/pdf")
+    stored = s3.get_object(Bucket=TEST_BUCKET, Key="tests/multipart.pdf")
+    assert stored["ETag"].endswith('-3"')
+    assert stored["ContentType"] == "application/pdf"
+    assert stored["Body"].read() == content
+
+
+def test_failing_part_is_retried(s3, large_file):
+    path, content = large_file
+    client = FlakyClient(s3, part_number=2, failures=2)
+
+    upload(client, "tests/retried.pdf", path, max_retries=3)
+    assert client.attempts == 3 and client.aborted == []
+    assert s3.get_object(Bucket=TEST_BUCKET, Key="tests/retried.pdf")["Body"].read() == content
+
+
+def test_upload_is_aborted_when_retries_run_out(s3, large_file):
+    path, _ = large_file
+    client = FlakyClient(s3, part_number=2, failures=10)
+
+    with pytest.raises(ClientError):
+        upload(client, "tests/aborted.pdf", path, max_retries=2)
+    assert client.attempts == 3 and len(client.aborted) == 1
+    assert pending_uploads(s3, "tests/aborted.pdf") == []
+    assert "Contents" not in s3.list_objects_v2(Bucket=TEST_BUCKET, Prefix="tests/aborted.pdf")
@@ -0,0 +1,36 @@
+"""
+Busca: o limite de candidatos conta só os documentos elegíveis, e o trecho destaca o título
+quando o termo não aparece no corpo
+"""
+import pytest
+
+from app.config import settings
+
+
+@pytest.mark.anyio
+async def test_candidate_limit_counts_only_eligible_rows(client, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_MAX_CANDIDATES", 5)
+    magazine = await client.post("/api/magazines", json={
+        "title": "Edição especial", "description": "Um dossiê sobre xilogravura nordestina", "is_published": True,
+    })
+    assert magazine.status_code == 201
+    # Mais rascunhos e artigos recentes com o termo do que o limite de candidatos
+    for i in range(8):
+        await client.post("/api/articles", json={"title": f"Rascunho {i}", "content": "xilogravura", "is_published": False})
+        await client.post("/api/articles", json={"title": f"Artigo {i}", "content": "xilogravura", "is_published": True})
+
+    magazines = (await client.get("/api/search", params={"q": "xilogravura", "type": "magazine"})).json()
+    assert [hit["id"] for hit in magazines["items"]] == [magazine.json()["id"]]
+
+    published = (await client.get("/api/search", params={"q": "xilogravura", "limit": 100})).json()
+    assert len(published["items"]) == 5
+    assert all(not hit["title"].startswith("Rascunho") for hit in published["items"])
+
+
+@pytest.mark.anyio
+async def test_title_only_match_is_highlighted(client):
+    await client.post("/api/articles", json={
+        "title": "Entrevista com a maestrina", "excerpt": "Conversa sobre música", "is_published": True,
+    })
+    hits = (await client.get("/api/search", params={"q": "maestrina"})).json()["items"]
+    assert hits[0]["snippet"] == "Entrevista com a <mark>maestrina</mark>"
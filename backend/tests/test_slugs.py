@@ -0,0 +1,21 @@
+"""
+Slugs gerados na criação e na atualização
+"""
+import pytest
+
+from app.services.slugs import EMPTY_SLUG
+
+
+@pytest.mark.anyio
+async def test_update_never_saves_an_empty_slug(client):
+    created = (await client.post("/api/articles", json={"title": "Rascunho de pauta"})).json()
+    assert created["slug"] == "rascunho-de-pauta"
+
+    renamed = (await client.put(f"/api/articles/{created['id']}", json={"title": "¿?!"})).json()
+    assert renamed["slug"].startswith(EMPTY_SLUG)
+
+    cleared = (await client.put(f"/api/articles/{created['id']}", json={"slug": ""})).json()
+    assert cleared["slug"].startswith(EMPTY_SLUG)
+
+    restored = (await client.put(f"/api/articles/{created['id']}", json={"title": "Pauta final"})).json()
+    assert restored["slug"] == "pauta-final"
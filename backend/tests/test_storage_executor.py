@@ -0,0 +1,46 @@
+"""
+O I/O do armazenamento roda no executor do backend: um upload lento não trava as demais rotas
+"""
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from app.services import storage
+
+SLOW_UPLOAD_SECONDS = 3
+
+
+@pytest.mark.anyio
+async def test_public_lists_respond_during_slow_upload(client, monkeypatch):
+    started = threading.Event()
+
+    def slow_put(path, key, size, content_type):
+        # Bloqueia a thread como um put_object lento do boto3
+        started.set()
+        time.sleep(SLOW_UPLOAD_SECONDS)
+
+    monkeypatch.setattr(storage, "put_file_to_s3", slow_put)
+    pdf = b"%PDF-1.4\n" + os.urandom(4096)
+    upload = asyncio.create_task(
+        client.post("/api/upload/pdf", files={"file": ("lento.pdf", pdf, "application/pdf")})
+    )
+    assert await asyncio.to_thread(started.wait, 5)
+
+    began = time.perf_counter()
+    health, magazines = await asyncio.gather(
+        client.get("/health"),
+        client.get("/api/magazines", params={"published_only": True}),
+    )
+    elapsed = time.perf_counter() - began
+
+    assert health.status_code == 200
+    assert magazines.status_code == 200
+    assert elapsed < SLOW_UPLOAD_SECONDS / 3
+    assert not upload.done()
+
+    response = await upload
+    assert response.status_code == 200
+    assert response.json()["file_url"].endswith(".pdf")
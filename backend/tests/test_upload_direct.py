@@ -0,0 +1,148 @@
+"""
+Upload direto ao S3 (URLs pré-assinadas): o envio do navegador é feito aqui com o cliente do
+moto, e /complete precisa conferir tamanho, tipo e SHA-256 antes de registrar o arquivo
+"""
+import base64
+import hashlib
+import os
+
+import pytest
+
+from app.config import settings
+from conftest import TEST_BUCKET
+
+
+def make_pdf(size: int) -> bytes:
+    return b"%PDF-1.4\n" + os.urandom(size - 9)
+
+
+def sha256_of(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def checksum_of(sha256: str) -> str:
+    return base64.b64encode(bytes.fromhex(sha256)).decode()
+
+
+def object_exists(s3, key: str) -> bool:
+    return s3.list_objects_v2(Bucket=TEST_BUCKET, Prefix=key).get("KeyCount", 0) > 0
+
+
+async def presign(client, content: bytes, sha256: str) -> dict:
+    response = await client.post("/api/upload/pdf/presign", json={
+        "filename": "edicao.pdf", "size": len(content), "sha256": sha256,
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+def upload_parts(s3, target: dict, key: str, content: bytes) -> None:
+    """Envia as partes do multipart como o navegador faria com as URLs assinadas"""
+    size = target["part_size"]
+    for part in target["parts"]:
+        start = (part["part_number"] - 1) * size
+        s3.upload_part(
+            Bucket=TEST_BUCKET, Key=key, UploadId=target["upload_id"],
+            PartNumber=part["part_number"], Body=content[start:start + size]
+        )
+
+
+@pytest.fixture
+def small_multipart(monkeypatch):
+    """Multipart a partir de 5 MB (o mínimo do S3 por parte), para os testes não enviarem 16 MB"""
+    monkeypatch.setattr(settings, "S3_MULTIPART_THRESHOLD_MB", 5)
+    monkeypatch.setattr(settings, "S3_MULTIPART_PART_SIZE_MB", 5)
+
+
+@pytest.mark.anyio
+async def test_single_put_is_registered(client, s3):
+    content = make_pdf(2048)
+    sha256 = sha256_of(content)
+    target = await presign(client, content, sha256)
+    assert target["exists"] is False
+    assert target["headers"]["x-amz-checksum-sha256"] == checksum_of(sha256)
+
+    key = f"pdfs/{sha256}.pdf"
+    s3.put_object(Bucket=TEST_BUCKET, Key=key, Body=content, ContentType="application/pdf",
+                  ChecksumSHA256=checksum_of(sha256))
+    response = await client.post("/api/upload/pdf/complete", json={"sha256": sha256, "size": len(content)})
+    assert response.status_code == 200
+    assert response.json()["file_url"].endswith(key)
+
+    again = await presign(client, content, sha256)
+    assert again == {"exists": True, "file_url": response.json()["file_url"]}
+
+
+@pytest.mark.anyio
+async def test_size_mismatch_discards_unregistered_object(client, s3):
+    content = make_pdf(2048)
+    sha256 = sha256_of(content)
+    await presign(client, content, sha256)
+    key = f"pdfs/{sha256}.pdf"
+    s3.put_object(Bucket=TEST_BUCKET, Key=key, Body=content, ContentType="application/pdf",
+                  ChecksumSHA256=checksum_of(sha256))
+
+    response = await client.post("/api/upload/pdf/complete", json={"sha256": sha256, "size": len(content) + 1})
+    assert response.status_code == 400
+    assert not object_exists(s3, key)
+
+
+@pytest.mark.anyio
+async def test_failed_complete_keeps_registered_object(client, s3):
+    content = make_pdf(2048)
+    sha256 = sha256_of(content)
+    key = f"pdfs/{sha256}.pdf"
+    s3.put_object(Bucket=TEST_BUCKET, Key=key, Body=content, ContentType="application/pdf",
+                  ChecksumSHA256=checksum_of(sha256))
+    assert (await client.post("/api/upload/pdf/complete", json={"sha256": sha256, "size": len(content)})).status_code == 200
+
+    # Hash de um arquivo já armazenado com um tamanho errado: o objeto em uso não pode sumir
+    response = await client.post("/api/upload/pdf/complete", json={"sha256": sha256, "size": 5})
+    assert response.status_code == 400
+    assert s3.get_object(Bucket=TEST_BUCKET, Key=key)["Body"].read() == content
+
+
+@pytest.mark.anyio
+async def test_single_put_without_checksum_is_rehashed(client, s3):
+    # Compatíveis com o S3 podem não conferir nem informar o checksum do PUT
+    claimed = sha256_of(b"outro arquivo")
+    content = make_pdf(2048)
+    key = f"pdfs/{claimed}.pdf"
+    s3.put_object(Bucket=TEST_BUCKET, Key=key, Body=content, ContentType="application/pdf")
+
+    response = await client.post("/api/upload/pdf/complete", json={"sha256": claimed, "size": len(content)})
+    assert response.status_code == 400
+    assert not object_exists(s3, key)
+
+
+@pytest.mark.anyio
+async def test_multipart_is_verified_and_promoted(client, s3, small_multipart):
+    content = make_pdf(6 * 1024 * 1024)
+    sha256 = sha256_of(content)
+    target = await presign(client, content, sha256)
+    assert len(target["parts"]) == 2
+
+    upload_parts(s3, target, f"incoming/pdfs/{sha256}.pdf", content)
+    response = await client.post("/api/upload/pdf/complete", json={
+        "sha256": sha256, "size": len(content), "upload_id": target["upload_id"],
+    })
+    assert response.status_code == 200
+    stored = s3.get_object(Bucket=TEST_BUCKET, Key=f"pdfs/{sha256}.pdf")
+    assert stored["ContentType"] == "application/pdf"
+    assert stored["Body"].read() == content
+    assert not object_exists(s3, f"incoming/pdfs/{sha256}.pdf")
+
+
+@pytest.mark.anyio
+async def test_multipart_hash_mismatch_is_rejected(client, s3, small_multipart):
+    content = make_pdf(6 * 1024 * 1024)
+    claimed = sha256_of(b"conteudo de outro PDF")
+    target = await presign(client, content, claimed)
+
+    upload_parts(s3, target, f"incoming/pdfs/{claimed}.pdf", content)
+    response = await client.post("/api/upload/pdf/complete", json={
+        "sha256": claimed, "size": len(content), "upload_id": target["upload_id"],
+    })
+    assert response.status_code == 400
+    assert not object_exists(s3, f"pdfs/{claimed}.pdf")
+    assert not object_exists(s3, f"incoming/pdfs/{claimed}.pdf")
@@ -0,0 +1,121 @@
+"""
+Uploads retomáveis: offset conferido a cada parte, uma parte por vez (423), retomada depois de
+uma conexão interrompida e expiração das sessões abandonadas
+"""
+import asyncio
+import hashlib
+import os
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import update
+
+from app.database import AsyncSessionLocal
+from app.models import UploadSession
+from app.services.resumable import expire_sessions, part_path
+from conftest import TEST_BUCKET
+
+PATCH_HEADERS = {"Content-Type": "application/offset+octet-stream"}
+
+
+class ConnectionDropped(Exception):
+    pass
+
+
+async def open_upload(client, content: bytes) -> str:
+    response = await client.post("/api/upload/pdf/resumable", json={"filename": "edicao.pdf", "size": len(content)})
+    assert response.status_code == 201
+    assert response.headers["Upload-Offset"] == "0"
+    return response.headers["Location"]
+
+
+async def send(client, location: str, offset: int, body) -> httpx.Response:
+    return await client.patch(location, content=body, headers={**PATCH_HEADERS, "Upload-Offset": str(offset)})
+
+
+async def current_offset(client, location: str) -> int:
+    response = await client.head(location)
+    assert response.status_code == 200
+    return int(response.headers["Upload-Offset"])
+
+
+@pytest.mark.anyio
+async def test_wrong_offset_is_rejected_with_current_offset(client):
+    content = b"%PDF-1.4\n" + os.urandom(4000)
+    location = await open_upload(client, content)
+    assert (await send(client, location, 0, content[:1000])).status_code == 204
+
+    for offset in (0, 1500):
+        response = await send(client, location, offset, content[offset:offset + 500])
+        assert response.status_code == 409
+        assert response.headers["Upload-Offset"] == "1000"
+    assert await current_offset(client, location) == 1000
+
+
+@pytest.mark.anyio
+async def test_concurrent_patch_is_locked(client):
+    content = b"%PDF-1.4\n" + os.urandom(4000)
+    location = await open_upload(client, content)
+    first_chunk_sent = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_body():
+        yield content[:500]
+        first_chunk_sent.set()
+        await release.wait()
+        yield content[500:1000]
+
+    slow = asyncio.create_task(send(client, location, 0, slow_body()))
+    await asyncio.wait_for(first_chunk_sent.wait(), 5)
+
+    concurrent = await send(client, location, 0, content[:1000])
+    assert concurrent.status_code == 423
+
+    release.set()
+    response = await slow
+    assert response.status_code == 204
+    assert response.headers["Upload-Offset"] == "1000"
+
+
+@pytest.mark.anyio
+async def test_resume_after_partial_chunk(client, s3):
+    content = b"%PDF-1.4\n" + os.urandom(8000)
+    location = await open_upload(client, content)
+
+    async def dropped_body():
+        yield content[:3000]
+        raise ConnectionDropped()
+
+    # A conexão cai no meio da parte: os bytes já gravados valem para a retomada
+    with pytest.raises(ConnectionDropped):
+        await send(client, location, 0, dropped_body())
+    offset = await current_offset(client, location)
+    assert offset == 3000
+
+    response = await send(client, location, offset, content[offset:])
+    assert response.status_code == 200
+    key = f"pdfs/{hashlib.sha256(content).hexdigest()}.pdf"
+    assert response.json()["file_url"].endswith(key)
+    assert s3.get_object(Bucket=TEST_BUCKET, Key=key)["Body"].read() == content
+    assert (await client.head(location)).status_code == 404
+
+
+@pytest.mark.anyio
+async def test_expired_session_is_gone(client):
+    content = b"%PDF-1.4\n" + os.urandom(1000)
+    location = await open_upload(client, content)
+    session_id = location.rsplit("/", 1)[1]
+    assert (await send(client, location, 0, content[:500])).status_code == 204
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(UploadSession).where(UploadSession.id == session_id).values(
+            expires_at=datetime.utcnow() - timedelta(minutes=1)
+        ))
+        await db.commit()
+
+    assert (await client.head(location)).status_code == 404
+    assert (await send(client, location, 500, content[500:])).status_code == 404
+    async with AsyncSessionLocal() as db:
+        assert await expire_sessions(db) >= 1
+    assert not part_path(session_id).exists()
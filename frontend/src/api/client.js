@@ -13,7 +13,7 @@ async function request(endpoint, options = {}) {
   
   if (!response.ok) {
     const error = await response.json().catch(() => ({ detail: 'Erro desconhecido' }))
-    throw new Error(error.detail || 'Erro na requisição')
+    throw Object.assign(new Error(error.detail || 'Erro na requisição'), { status: response.status })
   }
   
   if (response.status === 204) {
@@ -23,14 +23,170 @@ async function request(endpoint, options = {}) {
   return response.json()
 }
 
+// Upload direto ao S3: desligado na primeira recusa da API (armazenamento local ou Cloudinary)
+let directUploadAvailable = true
+const DIRECT_UPLOAD_CONCURRENCY = 4
+
+// SHA-256 do arquivo calculado em partes num Web Worker (PDFs grandes não cabem num ArrayBuffer)
+function sha256Hex(file) {
+  return new Promise((resolve, reject) => {
+    const worker = new Worker(new URL('./sha256.worker.js', import.meta.url), { type: 'module' })
+    worker.onmessage = ({ data }) => {
+      worker.terminate()
+      if (data.error) {
+        reject(new Error(data.error))
+      } else {
+        resolve(data.sha256)
+      }
+    }
+    worker.onerror = () => {
+      worker.terminate()
+      reject(new Error('Erro ao calcular o hash do arquivo'))
+    }
+    worker.postMessage(file)
+  })
+}
+
+async function putOrThrow(url, body, headers) {
+  const response = await fetch(url, { method: 'PUT', body, headers })
+  if (!response.ok) {
+    throw new Error('Erro no upload')
+  }
+}
+
+// Envia o PDF direto ao bucket com as URLs pré-assinadas pela API; null se indisponível
+async function uploadPdfDirect(file) {
+  const sha256 = await sha256Hex(file)
+  let target
+  try {
+    target = await request('/upload/pdf/presign', {
+      method: 'POST',
+      body: JSON.stringify({ filename: file.name, size: file.size, sha256 }),
+    })
+  } catch (error) {
+    if (error.status === 501) {
+      directUploadAvailable = false
+      return null
+    }
+    throw error
+  }
+  if (target.exists) {
+    return { file_url: target.file_url }
+  }
+  
+  if (target.parts) {
+    const queue = [...target.parts]
+    const worker = async () => {
+      for (let part = queue.shift(); part; part = queue.shift()) {
+        const start = (part.part_number - 1) * target.part_size
+        await putOrThrow(part.url, file.slice(start, start + target.part_size))
+      }
+    }
+    try {
+      await Promise.all(Array.from({ length: DIRECT_UPLOAD_CONCURRENCY }, worker))
+    } catch (error) {
+      await request('/upload/pdf/abort', {
+        method: 'POST',
+        body: JSON.stringify({ sha256, upload_id: target.upload_id }),
+      }).catch(() => {})
+      throw error
+    }
+  } else {
+    await putOrThrow(target.url, file, target.headers)
+  }
+  
+  return request('/upload/pdf/complete', {
+    method: 'POST',
+    body: JSON.stringify({ sha256, size: file.size, upload_id: target.upload_id }),
+  })
+}
+
+// Upload retomável pela API: partes enviadas em sequência, retomando do offset do servidor
+const RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024
+const RESUMABLE_RETRIES = 5
+
+async function resumableOffset(url) {
+  const response = await fetch(url, { method: 'HEAD' })
+  if (!response.ok) {
+    throw Object.assign(new Error('Sessão de upload expirada'), { status: response.status })
+  }
+  return Number(response.headers.get('Upload-Offset'))
+}
+
+async function uploadPdfResumable(file) {
+  const session = await request('/upload/pdf/resumable', {
+    method: 'POST',
+    body: JSON.stringify({ filename: file.name, size: file.size }),
+  })
+  const url = `${API_BASE}/upload/pdf/resumable/${session.id}`
+  let offset = 0
+  let failures = 0
+  
+  for (;;) {
+    try {
+      const response = await fetch(url, {
+        method: 'PATCH',
+        body: file.slice(offset, offset + RESUMABLE_CHUNK_SIZE),
+        headers: {
+          'Content-Type': 'application/offset+octet-stream',
+          'Upload-Offset': String(offset),
+        },
+      })
+      if (response.status === 200) {
+        return response.json()
+      }
+      if (response.status === 204) {
+        offset = Number(response.headers.get('Upload-Offset'))
+        failures = 0
+        continue
+      }
+      if (response.status < 500 && ![409, 423].includes(response.status)) {
+        const error = await response.json().catch(() => ({ detail: 'Erro no upload' }))
+        throw Object.assign(new Error(error.detail), { status: response.status })
+      }
+    } catch (error) {
+      if (error.status) {
+        throw error
+      }
+    }
+    // Falha de rede ou offset divergente: pergunta ao servidor onde retomar
+    failures += 1
+    if (failures > RESUMABLE_RETRIES) {
+      throw new Error('Erro no upload')
+    }
+    await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** (failures - 1)))
+    offset = await resumableOffset(url)
+  }
+}
+
+// Monta a query string ignorando parâmetros vazios (ex.: limit/cursor da paginação)
+function buildQuery(params) {
+  const query = new URLSearchParams()
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== null) {
+      query.append(key, value)
+    }
+  })
+  return query.toString()
+}
+
 export const api = {
   magazines: {
-    list: (publishedOnly = false) => 
-      request(`/magazines?published_only=${publishedOnly}`),
+    list: (publishedOnly = false, { limit, cursor } = {}) => 
+      request(`/magazines?${buildQuery({ published_only: publishedOnly, limit, cursor })}`),
     
     get: (id) => 
       request(`/magazines/${id}`),
     
+    searchPages: (id, q, { limit, cursor } = {}) => 
+      request(`/magazines/${id}/search?${buildQuery({ q, limit, cursor })}`),
+    
+    thumbUrl: (id, page) => 
+      `${API_BASE}/magazines/${id}/pages/${page}/thumb`,
+    
+    pdfUrl: (id) => 
+      `${API_BASE}/magazines/${id}/pdf`,
+    
     create: (data) => 
       request('/magazines', {
         method: 'POST',
@@ -50,8 +206,8 @@ export const api = {
   },
 
   articles: {
-    list: (publishedOnly = true) => 
-      request(`/articles?published_only=${publishedOnly}`),
+    list: (publishedOnly = true, { limit, cursor } = {}) => 
+      request(`/articles?${buildQuery({ published_only: publishedOnly, limit, cursor })}`),
     
     featured: () => 
       request('/articles/featured'),
@@ -103,8 +259,8 @@ export const api = {
   },
 
   contacts: {
-    list: (unreadOnly = false) => 
-      request(`/contacts?unread_only=${unreadOnly}`),
+    list: (unreadOnly = false, { limit, cursor } = {}) => 
+      request(`/contacts?${buildQuery({ unread_only: unreadOnly, limit, cursor })}`),
     
     get: (id) => 
       request(`/contacts/${id}`),
@@ -127,8 +283,21 @@ export const api = {
       }),
   },
   
+  search: (q, { type, limit, cursor } = {}) => 
+    request(`/search?${buildQuery({ q, type, limit, cursor })}`),
+  
   upload: {
     pdf: async (file) => {
+      if (directUploadAvailable) {
+        const result = await uploadPdfDirect(file)
+        if (result) {
+          return result
+        }
+      }
+      if (file.size > RESUMABLE_CHUNK_SIZE) {
+        return uploadPdfResumable(file)
+      }
+      
       const formData = new FormData()
       formData.append('file', file)
       
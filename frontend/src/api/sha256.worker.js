@@ -0,0 +1,16 @@
+import { Sha256 } from '../lib/sha256'
+
+// Lê o arquivo em partes (file.slice), sem carregá-lo inteiro na memória nem travar a página
+const CHUNK_SIZE = 8 * 1024 * 1024
+
+self.onmessage = async ({ data: file }) => {
+  try {
+    const hash = new Sha256()
+    for (let offset = 0; offset < file.size; offset += CHUNK_SIZE) {
+      hash.update(new Uint8Array(await file.slice(offset, offset + CHUNK_SIZE).arrayBuffer()))
+    }
+    self.postMessage({ sha256: hash.hex() })
+  } catch (error) {
+    self.postMessage({ error: error.message || 'Erro ao calcular o hash do arquivo' })
+  }
+}
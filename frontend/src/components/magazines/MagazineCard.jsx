@@ -1,6 +1,7 @@
 import { motion } from "framer-motion"
 import { Link } from "react-router-dom"
 import { ArrowUpRight } from "lucide-react"
+import { srcSet } from "@/lib/utils"
 
 export default function MagazineCard({ magazine, index }) {
   return (
@@ -13,11 +14,17 @@ export default function MagazineCard({ magazine, index }) {
       <Link to={`/reader?id=${magazine.id}`}>
         <div className="relative aspect-[3/4] overflow-hidden bg-neutral-100">
           {magazine.cover_image ? (
-            <img
-              src={magazine.cover_image}
-              alt={magazine.title}
-              className="w-full h-full object-cover transition-transform duration-700 group-hover:scale-105"
-            />
+            <picture className="block w-full h-full">
+              <source type="image/webp" srcSet={srcSet(magazine.cover_variants, "webp")} sizes="(min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw" />
+              <img
+                src={magazine.cover_image}
+                srcSet={srcSet(magazine.cover_variants, "jpeg")}
+                sizes="(min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw"
+                alt={magazine.title}
+                loading="lazy"
+                className="w-full h-full object-cover transition-transform duration-700 group-hover:scale-105"
+              />
+            </picture>
           ) : (
             <div className="w-full h-full flex items-center justify-center bg-black">
               <span className="text-white text-2xl font-light tracking-[0.3em]">
@@ -4,3 +4,13 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs) {
   return twMerge(clsx(inputs))
 }
+
+// Monta o srcset a partir dos derivados redimensionados de uma imagem (ex.: cover_variants)
+export function srcSet(variants, format) {
+  if (!variants?.length) return undefined
+  return variants
+    .filter(v => v.format === format)
+    .sort((a, b) => a.width - b.width)
+    .map(v => `${v.url} ${v.width}w`)
+    .join(", ")
+}
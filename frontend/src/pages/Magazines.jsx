@@ -2,6 +2,7 @@ import { useQuery } from "@tanstack/react-query"
 import { motion } from "framer-motion"
 import { Link } from "react-router-dom"
 import { api } from "@/api/client"
+import { srcSet } from "@/lib/utils"
 import MagazineGrid from "@/components/magazines/MagazineGrid"
 import SideMenu from "@/components/layout/SideMenu"
 
@@ -27,11 +28,16 @@ export default function Magazines() {
                 transition={{ duration: 0.8, delay: i * 0.1 }}
                 className="relative aspect-[3/4] rounded-sm overflow-hidden"
               >
-                <img
-                  src={mag.cover_image}
-                  alt=""
-                  className="w-full h-full object-cover grayscale hover:grayscale-0 transition-all duration-500"
-                />
+                <picture className="block w-full h-full">
+                  <source type="image/webp" srcSet={srcSet(mag.cover_variants, "webp")} sizes="(min-width: 768px) 16vw, 25vw" />
+                  <img
+                    src={mag.cover_image}
+                    srcSet={srcSet(mag.cover_variants, "jpeg")}
+                    sizes="(min-width: 768px) 16vw, 25vw"
+                    alt=""
+                    className="w-full h-full object-cover grayscale hover:grayscale-0 transition-all duration-500"
+                  />
+                </picture>
               </motion.div>
             )
           ))}
@@ -2,23 +2,35 @@ import { useState, useRef, useEffect, useCallback } from "react"
 import { useQuery } from "@tanstack/react-query"
 import { Link, useSearchParams } from "react-router-dom"
 import { motion } from "framer-motion"
-import { ArrowLeft, ZoomIn, ZoomOut, Maximize2, Download, ChevronLeft, ChevronRight } from "lucide-react"
+import { ArrowLeft, ZoomIn, ZoomOut, Maximize2, Download, ChevronLeft, ChevronRight, Search, X } from "lucide-react"
 import { Button } from "@/components/ui/button"
+import { Input } from "@/components/ui/input"
 import { api } from "@/api/client"
 import { Document, Page, pdfjs } from "react-pdf"
 
 pdfjs.GlobalWorkerOptions.workerSrc = `//unpkg.com/pdfjs-dist@${pdfjs.version}/build/pdf.worker.min.mjs`
 
+// Carrega o PDF sob demanda via requisições Range, sem baixar a edição inteira
+const PDF_OPTIONS = {
+  disableAutoFetch: true,
+  disableStream: true,
+  rangeChunkSize: 256 * 1024,
+}
+
 export default function Reader() {
   const [searchParams] = useSearchParams()
   const magazineId = searchParams.get("id")
   const [numPages, setNumPages] = useState(null)
-  const [pageNumber, setPageNumber] = useState(1)
+  const [pageNumber, setPageNumber] = useState(() => Math.max(parseInt(searchParams.get("page"), 10) || 1, 1))
+  const [searchOpen, setSearchOpen] = useState(false)
+  const [searchInput, setSearchInput] = useState("")
+  const [searchTerm, setSearchTerm] = useState("")
   const [pageHeight, setPageHeight] = useState(null)
   const [pageWidth, setPageWidth] = useState(null)
   const [isMobile, setIsMobile] = useState(false)
   const [scale, setScale] = useState(1)
   const containerRef = useRef(null)
+  const activeThumbRef = useRef(null)
 
   const { data: magazine, isLoading } = useQuery({
     queryKey: ['magazine', magazineId],
@@ -26,8 +38,21 @@ export default function Reader() {
     enabled: !!magazineId,
   })
 
+  // Busca no texto extraído das páginas do PDF
+  const { data: searchResults, isFetching: isSearching } = useQuery({
+    queryKey: ['magazine-search', magazineId, searchTerm],
+    queryFn: () => api.magazines.searchPages(magazineId, searchTerm, { limit: 50 }),
+    enabled: !!magazineId && searchTerm.length > 0,
+  })
+
+  const handleSearch = (e) => {
+    e.preventDefault()
+    setSearchTerm(searchInput.trim())
+  }
+
   const onDocumentLoadSuccess = ({ numPages }) => {
     setNumPages(numPages)
+    setPageNumber(prev => Math.min(prev, numPages))
   }
 
   useEffect(() => {
@@ -49,6 +74,11 @@ export default function Reader() {
     return () => window.removeEventListener("resize", updateDimensions)
   }, [])
 
+  // Mantém a miniatura da página atual visível na faixa de páginas
+  useEffect(() => {
+    activeThumbRef.current?.scrollIntoView({ block: "nearest", inline: "center" })
+  }, [pageNumber])
+
   const goToPrevPage = () => setPageNumber(prev => Math.max(prev - 1, 1))
   const goToNextPage = () => setPageNumber(prev => Math.min(prev + 1, numPages || 1))
   
@@ -107,6 +137,20 @@ export default function Reader() {
           </div>
 
           <div className="flex items-center gap-2">
+            {magazine.text_status === "done" && (
+              <>
+                <Button
+                  variant="ghost"
+                  size="icon"
+                  onClick={() => setSearchOpen(open => !open)}
+                  className="w-9 h-9 text-neutral-500 hover:text-black"
+                  title="Buscar na edição"
+                >
+                  {searchOpen ? <X className="w-4 h-4" /> : <Search className="w-4 h-4" />}
+                </Button>
+                <div className="h-6 w-px bg-neutral-200 mx-2" />
+              </>
+            )}
             <Button
               variant="ghost"
               size="icon"
@@ -180,6 +224,50 @@ export default function Reader() {
         </div>
       </header>
 
+      {/* Busca na edição */}
+      {searchOpen && (
+        <div className="bg-white border-b border-neutral-200 z-40 flex-shrink-0">
+          <div className="max-w-7xl mx-auto px-4 md:px-8 py-3">
+            <form onSubmit={handleSearch} className="flex gap-2">
+              <Input
+                autoFocus
+                value={searchInput}
+                onChange={(e) => setSearchInput(e.target.value)}
+                placeholder="Buscar nesta edição..."
+                className="max-w-md"
+              />
+              <Button type="submit" variant="outline" className="border-black text-black hover:bg-black hover:text-white">
+                Buscar
+              </Button>
+            </form>
+            {searchTerm && (
+              <div className="mt-3 max-h-60 overflow-auto">
+                {isSearching ? (
+                  <p className="text-xs text-neutral-400">Buscando...</p>
+                ) : searchResults?.items.length ? (
+                  <ul className="divide-y divide-neutral-100">
+                    {searchResults.items.map((hit) => (
+                      <li key={hit.page}>
+                        <button
+                          onClick={() => setPageNumber(hit.page)}
+                          className="w-full text-left py-2 text-sm text-neutral-600 hover:text-black"
+                        >
+                          <span className="text-xs tracking-wide text-neutral-400 mr-3">p. {hit.page}</span>
+                          {/* O trecho vem escapado da API, com os termos marcados por <mark> */}
+                          <span dangerouslySetInnerHTML={{ __html: hit.snippet }} />
+                        </button>
+                      </li>
+                    ))}
+                  </ul>
+                ) : (
+                  <p className="text-xs text-neutral-400">Nenhum resultado nesta edição</p>
+                )}
+              </div>
+            )}
+          </div>
+        </div>
+      )}
+
       {/* PDF Viewer */}
       <main ref={containerRef} className={`flex-1 flex items-center justify-center p-4 relative ${isMobile ? 'overflow-hidden' : 'overflow-auto'}`}>
         {/* Seta Esquerda */}
@@ -211,7 +299,8 @@ export default function Reader() {
         >
           {magazine.pdf_url ? (
             <Document
-              file={magazine.pdf_url}
+              file={api.magazines.pdfUrl(magazine.id)}
+              options={PDF_OPTIONS}
               onLoadSuccess={onDocumentLoadSuccess}
               loading={
                 <div className="flex items-center justify-center">
@@ -240,6 +329,28 @@ export default function Reader() {
         </motion.div>
       </main>
 
+      {/* Faixa de páginas: miniaturas leves geradas pelo servidor, carregadas conforme a rolagem */}
+      {magazine.pdf_url && numPages && (
+        <nav className="hidden sm:flex bg-white border-t border-neutral-200 px-4 py-2 gap-2 overflow-x-auto flex-shrink-0">
+          {Array.from({ length: numPages }, (_, i) => i + 1).map((page) => (
+            <button
+              key={page}
+              ref={page === pageNumber ? activeThumbRef : null}
+              onClick={() => setPageNumber(page)}
+              className={`flex-shrink-0 border transition-colors ${page === pageNumber ? "border-black" : "border-transparent hover:border-neutral-300"}`}
+              title={`Página ${page}`}
+            >
+              <img
+                src={api.magazines.thumbUrl(magazine.id, page)}
+                alt={`Página ${page}`}
+                loading="lazy"
+                className="h-20 w-auto bg-neutral-100"
+              />
+            </button>
+          ))}
+        </nav>
+      )}
+
       {/* Mobile Title Bar */}
       <div className="sm:hidden bg-white border-t border-neutral-100 px-4 py-3 flex-shrink-0">
         <p className="text-xs tracking-[0.2em] text-neutral-400 uppercase text-center">